@@ -0,0 +1,501 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .evaluation import stored_evaluations
+from .schemas import EvalOut
+from .storage import BASE, get_session_store
+
+# One row per evaluated answer of every finished interview (and batch
+# screening), kept in SQLite as the durable, indexed record and mirrored
+# into in-memory numpy columns that the ranking/distribution queries
+# aggregate over. Rows outlive session expiry and archival.
+ANALYTICS_ENABLED = os.getenv("ANALYTICS_ENABLED", "1") != "0"
+ANALYTICS_PATH = os.getenv("ANALYTICS_PATH", "analytics.sqlite3")  # "" keeps the index in memory only
+# Dimension recorded for questions that don't carry one (sessions started before dimensions were kept)
+UNKNOWN_DIMENSION = "unspecified"
+
+_ROW_COLUMNS = (
+    "session_id, job_title, job_key, source, turn, question, dimension, is_followup, score, tier, evaluated_at, finished_at"
+)
+
+
+def job_key(job_title: str) -> str:
+    """Job titles are grouped case- and whitespace-insensitively."""
+    return re.sub(r"\s+", " ", job_title.strip()).casefold()
+
+
+def evaluation_rows(
+    session_id: str,
+    state: dict,
+    evaluations: List[Optional[EvalOut]],
+    finished_at: float,
+    source: str = "interview"
+) -> List[tuple]:
+    """
+    One row per turn with an evaluation. Follow-ups are filed under the main
+    question they follow, so per-question figures cover the whole exchange.
+    """
+    dimensions = {q["id"]: q.get("dimension") or UNKNOWN_DIMENSION for q in state.get("main_questions", [])}
+    records = state.get("evaluations", {})
+    rows = []
+    question, dimension = None, UNKNOWN_DIMENSION
+    for i, (turn, evaluation) in enumerate(zip(state["conversation_history"], evaluations)):
+        if not turn.get("is_followup") or question is None:
+            question = turn["question"]
+            dimension = dimensions.get(turn["question_id"], UNKNOWN_DIMENSION)
+        if evaluation is None:
+            continue
+        ok = evaluation.status != "failed"
+        rows.append((
+            session_id, state["job_title"], job_key(state["job_title"]), source, i, question, dimension,
+            int(bool(turn.get("is_followup"))),
+            evaluation.relevancy_score if ok else None,
+            evaluation.tier if ok else "failed",
+            (records.get(str(i)) or {}).get("updated_at") or finished_at,
+            finished_at
+        ))
+    return rows
+
+
+class _Codes:
+    """Dictionary encoding of a string column: value <-> dense int code."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class AnalyticsIndex:
+    """
+    Evaluations across sessions, queryable by job title, dimension and time.
+
+    Writes go to SQLite (table `evaluations`, indexed by job and session).
+    Queries first pull rows added since the last query (by any worker
+    process) into the numpy columns, then filter with boolean masks and
+    aggregate with bincount, so they cost a few passes over contiguous
+    arrays rather than a scan of session files or Python loops per row.
+    Re-recording a session replaces its rows and bumps its generation in
+    `session_generations`, which is how a mirror learns that rows it already
+    pulled are gone, even when the replacement has no rows. Both generations
+    and row ids only grow, so "newer than what was pulled" is one comparison.
+    """
+
+    def __init__(self, path: str = ANALYTICS_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None, timeout=10)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, job_title TEXT NOT NULL, job_key TEXT NOT NULL,"
+            " source TEXT NOT NULL, turn INTEGER NOT NULL, question TEXT NOT NULL, dimension TEXT NOT NULL,"
+            " is_followup INTEGER NOT NULL, score INTEGER, tier TEXT NOT NULL,"
+            " evaluated_at REAL NOT NULL, finished_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS evaluations_job ON evaluations (job_key, finished_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS evaluations_session ON evaluations (session_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_generations (session_id TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS session_generations_generation ON session_generations (generation)"
+        )
+
+        self._sessions, self._jobs, self._dimensions, self._questions, self._sources = (
+            _Codes(), _Codes(), _Codes(), _Codes(), _Codes()
+        )
+        self._job_titles: Dict[int, str] = {}   # job code -> most recently seen spelling
+        self._n = 0
+        self._last_id = 0
+        self._last_generation = 0
+        self._cols = self._allocate(1024)
+        self._session_finished = np.zeros(1024, dtype=np.float64)
+        self.last_refresh_ms = 0.0
+
+    @staticmethod
+    def _allocate(capacity: int) -> Dict[str, np.ndarray]:
+        return {
+            "session": np.zeros(capacity, dtype=np.int32),
+            "job": np.zeros(capacity, dtype=np.int32),
+            "dimension": np.zeros(capacity, dtype=np.int32),
+            "question": np.zeros(capacity, dtype=np.int32),
+            "source": np.zeros(capacity, dtype=np.int8),
+            "followup": np.zeros(capacity, dtype=bool),
+            "score": np.zeros(capacity, dtype=np.int8),    # 0-100; 0 with ok=False for failed evaluations
+            "ok": np.zeros(capacity, dtype=bool),
+            "live": np.zeros(capacity, dtype=bool),
+            "finished_at": np.zeros(capacity, dtype=np.float64),
+        }
+
+    # ── writes ──
+
+    def record_session(
+        self,
+        session_id: str,
+        state: dict,
+        evaluations: List[Optional[EvalOut]],
+        finished_at: Optional[float] = None,
+        source: str = "interview"
+    ) -> int:
+        """Store (or replace) a finished session's evaluations; returns the number of rows."""
+        rows = evaluation_rows(session_id, state, evaluations, finished_at or time.time(), source)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM evaluations WHERE session_id = ?", (session_id,))
+                # (WHERE true: SQLite can't parse INSERT ... SELECT ... ON CONFLICT without a WHERE)
+                self._conn.execute(
+                    "INSERT INTO session_generations (session_id, generation)"
+                    " SELECT ?, COALESCE(MAX(generation), 0) + 1 FROM session_generations WHERE true"
+                    " ON CONFLICT (session_id) DO UPDATE SET generation = excluded.generation", (session_id,)
+                )
+                self._conn.executemany(f"INSERT INTO evaluations ({_ROW_COLUMNS}) VALUES ({', '.join('?' * 12)})", rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def backfill(self, store=None, base=None) -> int:
+        """Record every finished session (one with a report.txt) still in the session store; returns sessions recorded."""
+        store = store or get_session_store()
+        base = base or BASE
+        recorded = 0
+        for session_id in store.list_sessions():
+            report = base / session_id / "report.txt"
+            if not report.exists():
+                continue
+            state = store.load(session_id)
+            if state:
+                source = "batch" if state.get("batch_job_id") else "interview"
+                recorded += bool(self.record_session(
+                    session_id, state, stored_evaluations(state), report.stat().st_mtime, source
+                ))
+        return recorded
+
+    # ── columnar mirror ──
+
+    def refresh(self) -> int:
+        """Pull rows written since the last refresh into the columns; returns how many."""
+        with self._lock:
+            t0 = time.perf_counter()
+            self._conn.execute("BEGIN")    # both reads from one snapshot
+            try:
+                recorded = self._conn.execute(
+                    "SELECT session_id, generation FROM session_generations WHERE generation > ?", (self._last_generation,)
+                ).fetchall()
+                rows = self._conn.execute(
+                    "SELECT id, session_id, job_title, job_key, source, question, dimension, is_followup, score, finished_at"
+                    " FROM evaluations WHERE id > ? ORDER BY id", (self._last_id,)
+                ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+            if recorded:
+                self._supersede([session_id for session_id, _ in recorded])
+                self._last_generation = max(generation for _, generation in recorded)
+            if rows:
+                self._append(rows)
+                self._last_id = rows[-1][0]
+            self.last_refresh_ms = round((time.perf_counter() - t0) * 1000, 3)
+            return len(rows)
+
+    def _supersede(self, session_ids: List[str]) -> None:
+        """Sessions recorded again: the rows already pulled for them are gone from the table."""
+        codes = [self._sessions.codes[s] for s in session_ids if s in self._sessions.codes]
+        if codes:
+            n = self._n
+            self._cols["live"][:n] &= ~np.isin(self._cols["session"][:n], codes)
+
+    def _append(self, rows: list) -> None:
+        n, m = self._n, len(rows)
+        if n + m > len(self._cols["score"]):
+            capacity = max(2 * len(self._cols["score"]), n + m)
+            grown = self._allocate(capacity)
+            for name, col in self._cols.items():
+                grown[name][:n] = col[:n]
+            self._cols = grown
+
+        ids, sessions, titles, jobs, sources, questions, dimensions, followups, scores, finished = zip(*rows)
+        session_codes = np.fromiter(map(self._sessions.encode, sessions), dtype=np.int32, count=m)
+        job_codes = np.fromiter(map(self._jobs.encode, jobs), dtype=np.int32, count=m)
+        for code, title in zip(job_codes.tolist(), titles):
+            self._job_titles[code] = title
+
+        c, sl = self._cols, slice(n, n + m)
+        c["session"][sl] = session_codes
+        c["job"][sl] = job_codes
+        c["dimension"][sl] = np.fromiter(map(self._dimensions.encode, dimensions), dtype=np.int32, count=m)
+        c["question"][sl] = np.fromiter(map(self._questions.encode, questions), dtype=np.int32, count=m)
+        c["source"][sl] = np.fromiter(map(self._sources.encode, sources), dtype=np.int8, count=m)
+        c["followup"][sl] = np.array(followups, dtype=bool)
+        c["ok"][sl] = np.array([s is not None for s in scores], dtype=bool)
+        c["score"][sl] = np.array([s if s is not None else 0 for s in scores], dtype=np.int8)
+        c["live"][sl] = True
+        c["finished_at"][sl] = np.array(finished, dtype=np.float64)
+        self._n = n + m
+
+        if len(self._sessions) > len(self._session_finished):
+            grown = np.zeros(max(2 * len(self._session_finished), len(self._sessions)), dtype=np.float64)
+            grown[:len(self._session_finished)] = self._session_finished
+            self._session_finished = grown
+        self._session_finished[session_codes] = c["finished_at"][sl]
+
+    def _snapshot(self) -> Dict[str, np.ndarray]:
+        """Refresh, then views of the columns as of now; later appends don't change their length."""
+        self.refresh()
+        with self._lock:
+            n = self._n
+            cols = {name: col[:n] for name, col in self._cols.items()}
+            cols["session_finished"] = self._session_finished
+            return cols
+
+    def _mask(
+        self,
+        c: Dict[str, np.ndarray],
+        job_title: Optional[str] = None,
+        dimension: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        followups: bool = True
+    ) -> Optional[np.ndarray]:
+        """Rows matching the filters (live, successfully scored), or None if a filter value is unknown."""
+        mask = c["live"] & c["ok"]
+        for column, codes, value in (("job", self._jobs, job_title and job_key(job_title)),
+                                     ("dimension", self._dimensions, dimension),
+                                     ("source", self._sources, source)):
+            if value:
+                code = codes.codes.get(value)
+                if code is None:
+                    return None
+                mask &= c[column] == code
+        if since is not None:
+            mask &= c["finished_at"] >= since
+        if until is not None:
+            mask &= c["finished_at"] < until
+        if not followups:
+            mask &= ~c["followup"]
+        return mask
+
+    # ── queries ──
+
+    def top_candidates(
+        self,
+        job_title: str,
+        k: int = 10,
+        dimension: Optional[str] = None,
+        min_answers: int = 1,
+        source: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> dict:
+        """
+        The k sessions with the highest average relevancy score for a job,
+        over all answers or one dimension's, with each one's per-dimension
+        averages. Ties go to the session that finished first.
+        """
+        c = self._snapshot()
+        mask = self._mask(c, job_title, None, source, since, until)
+        if mask is None:
+            return {"job_title": job_title, "dimension": dimension, "candidates": 0, "top": []}
+        ranked_mask = mask
+        if dimension:
+            code = self._dimensions.codes.get(dimension)
+            ranked_mask = mask & (c["dimension"] == code) if code is not None else np.zeros_like(mask)
+
+        sessions = c["session"][ranked_mask]
+        size = len(c["session_finished"])
+        counts = np.bincount(sessions, minlength=size)
+        sums = np.bincount(sessions, weights=c["score"][ranked_mask], minlength=size)
+        eligible = np.flatnonzero(counts >= max(min_answers, 1))
+        averages = sums[eligible] / counts[eligible]
+
+        k = min(k, len(eligible))
+        if k <= 0:
+            return {"job_title": job_title, "dimension": dimension, "candidates": int(len(eligible)), "top": []}
+        finished = c["session_finished"][eligible]
+        if k < len(eligible):
+            # Anything tied with the k-th best stays in, so the tie-break below sees it
+            kth = np.partition(averages, len(averages) - k)[len(averages) - k]
+            keep = np.flatnonzero(averages >= kth)
+            eligible, averages, finished = eligible[keep], averages[keep], finished[keep]
+        order = np.lexsort((finished, -averages))[:k]
+        top, top_avg = eligible[order], averages[order]
+
+        # Per-dimension averages of the winners, from one bincount over (winner, dimension) pairs
+        position = np.full(size, -1, dtype=np.int64)
+        position[top] = np.arange(k)
+        rows = np.flatnonzero(mask)
+        rows = rows[position[c["session"][rows]] >= 0]
+        n_dims = max(len(self._dimensions), 1)
+        pair = position[c["session"][rows]] * n_dims + c["dimension"][rows]
+        pair_counts = np.bincount(pair, minlength=k * n_dims).reshape(k, n_dims)
+        pair_sums = np.bincount(pair, weights=c["score"][rows], minlength=k * n_dims).reshape(k, n_dims)
+        answers = pair_counts.sum(axis=1)
+
+        out = []
+        for i, session_code in enumerate(top.tolist()):
+            dims = np.flatnonzero(pair_counts[i])
+            out.append({
+                "session_id": self._sessions.values[session_code],
+                "average_score": round(float(top_avg[i]), 1),
+                "answers": int(answers[i]),
+                "finished_at": float(c["session_finished"][session_code]),
+                "by_dimension": {
+                    self._dimensions.values[d]: round(float(pair_sums[i, d] / pair_counts[i, d]), 1) for d in dims
+                }
+            })
+        return {"job_title": job_title, "dimension": dimension, "candidates": int(np.count_nonzero(counts)), "top": out}
+
+    def score_distribution(
+        self,
+        job_title: Optional[str] = None,
+        dimension: Optional[str] = None,
+        per: str = "answer",
+        bins: int = 10,
+        source: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> dict:
+        """Histogram over 0-100 and percentiles of answer scores, or of each candidate's average (per="candidate")."""
+        if per not in ("answer", "candidate"):
+            raise ValueError(f"per must be 'answer' or 'candidate', not {per!r}")
+        c = self._snapshot()
+        mask = self._mask(c, job_title, dimension, source, since, until)
+        if mask is None:
+            mask = np.zeros_like(c["live"])
+        scores = c["score"][mask]
+        edges = np.linspace(0, 100, bins + 1)
+        result = {"job_title": job_title, "dimension": dimension, "per": per}
+
+        if per == "answer":
+            # Integer scores: one bincount of the 101 possible values gives the histogram and exact percentiles
+            values = np.arange(101)
+            freq = np.bincount(scores, minlength=101).astype(np.float64)
+            total = freq.sum()
+            counts = np.bincount(np.minimum(values * bins // 100, bins - 1), weights=freq, minlength=bins)
+            if total:
+                cumulative = np.cumsum(freq)
+                p25, p50, p75, p90 = np.searchsorted(cumulative, np.array([0.25, 0.5, 0.75, 0.9]) * total)
+                mean = float(values @ freq / total)
+                std = float(np.sqrt(max((values * values) @ freq / total - mean * mean, 0.0)))
+        else:
+            sessions = c["session"][mask]
+            per_session = np.bincount(sessions)
+            averages = np.bincount(sessions, weights=scores)[per_session > 0] / per_session[per_session > 0]
+            total = len(averages)
+            counts, _ = np.histogram(averages, bins=edges)
+            if total:
+                p25, p50, p75, p90 = np.percentile(averages, [25, 50, 75, 90])
+                mean, std = float(averages.mean()), float(averages.std())
+
+        result["count"] = int(total)
+        result["histogram"] = [
+            {"from": round(float(lo), 2), "to": round(float(hi), 2), "count": int(n)}
+            for lo, hi, n in zip(edges[:-1], edges[1:], counts)
+        ]
+        if total:
+            result.update(
+                mean=round(mean, 1), std=round(std, 1),
+                p25=round(float(p25), 1), p50=round(float(p50), 1), p75=round(float(p75), 1), p90=round(float(p90), 1)
+            )
+        return result
+
+    def question_difficulty(
+        self,
+        job_title: Optional[str] = None,
+        dimension: Optional[str] = None,
+        min_answers: int = 5,
+        limit: int = 20,
+        followups: bool = False,
+        source: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> dict:
+        """
+        Main questions from hardest to easiest by mean score of the answers to
+        them (follow-up answers too if `followups`), with spread and the share
+        of answers scoring under 50.
+        """
+        c = self._snapshot()
+        mask = self._mask(c, job_title, dimension, source, since, until, followups=followups)
+        if mask is None:
+            return {"job_title": job_title, "dimension": dimension, "questions": []}
+        questions = c["question"][mask]
+        scores = c["score"][mask]
+        size = len(self._questions)
+        counts = np.bincount(questions, minlength=size)
+        sums = np.bincount(questions, weights=scores, minlength=size)
+        squares = np.bincount(questions, weights=scores.astype(np.int32) ** 2, minlength=size)
+        low = np.bincount(questions[scores < 50], minlength=size)
+
+        eligible = np.flatnonzero(counts >= max(min_answers, 1))
+        means = sums[eligible] / counts[eligible]
+        order = np.argsort(means, kind="stable")[:limit]
+        # A question's dimension: the one some row of it was filed under
+        dimension_of = np.zeros(size, dtype=np.int32)
+        dimension_of[questions] = c["dimension"][mask]
+
+        out = []
+        for i in order.tolist():
+            q = int(eligible[i])
+            mean = means[i]
+            out.append({
+                "question": self._questions.values[q],
+                "dimension": self._dimensions.values[int(dimension_of[q])],
+                "answers": int(counts[q]),
+                "mean_score": round(float(mean), 1),
+                "std": round(float(np.sqrt(max(squares[q] / counts[q] - mean * mean, 0.0))), 1),
+                "share_below_50": round(float(low[q] / counts[q]), 3)
+            })
+        return {"job_title": job_title, "dimension": dimension, "questions": out}
+
+    def jobs(self) -> List[dict]:
+        """Job titles with their number of candidates and scored answers."""
+        c = self._snapshot()
+        mask = self._mask(c)
+        jobs = c["job"][mask]
+        answers = np.bincount(jobs, minlength=len(self._jobs))
+        # Distinct sessions per job, from the distinct (job, session) pairs
+        width = max(len(c["session_finished"]), 1)
+        pairs = np.unique(jobs.astype(np.int64) * width + c["session"][mask])
+        candidates = np.bincount(pairs // width, minlength=len(self._jobs))
+        return [
+            {"job_title": self._job_titles[j], "candidates": int(candidates[j]), "answers": int(answers[j])}
+            for j in np.argsort(-candidates, kind="stable").tolist() if candidates[j]
+        ]
+
+    def stats(self) -> dict:
+        c = self._snapshot()
+        live = int(c["live"].sum())
+        return {
+            "rows": live,
+            "superseded_rows": len(c["live"]) - live,
+            "sessions": int(np.count_nonzero(np.bincount(c["session"][c["live"]]))),
+            "jobs": len(self._jobs),
+            "dimensions": len(self._dimensions),
+            "questions": len(self._questions),
+            "column_bytes": sum(col.nbytes for col in self._cols.values()),
+            "last_refresh_ms": self.last_refresh_ms
+        }
+
+
+def default_analytics_index() -> Optional[AnalyticsIndex]:
+    return AnalyticsIndex() if ANALYTICS_ENABLED else None
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .evaluation import BOOT_ID, eval_record, evaluate_turns, evaluate_turns_tiered
+from .llm_scheduler import Priority, llm_priority
+from .question_bank import build_question_set
+from .report import build_report
+from .schemas import QuestionOut
+from .storage import BASE, new_session_id, report_path, save_conversation_state
+
+# Candidates simulated at once per process, and how fast new ones may start
+# (0 = unpaced). Every LLM call also waits in the shared scheduler at BATCH
+# priority, behind interactive traffic.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_CANDIDATES_PER_MINUTE = float(os.getenv("BATCH_CANDIDATES_PER_MINUTE", "0"))
+BATCH_MAX_RESUMES = int(os.getenv("BATCH_MAX_RESUMES", "500"))
+BATCH_DIR = Path(os.getenv("BATCH_DIR", str(BASE / "batches")))
+# A running job touches its heartbeat file this often. A job that never
+# recorded an end and whose heartbeat is older than three intervals was cut
+# short (its worker was killed) and is reported as "interrupted".
+BATCH_HEARTBEAT_S = float(os.getenv("BATCH_HEARTBEAT_S", "10"))
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+# ─────────────────────────────────────────
+# Results store
+# ─────────────────────────────────────────
+
+def job_dir(job_id: str) -> Path:
+    return BATCH_DIR / job_id
+
+
+def _write_meta(job_id: str, meta: dict) -> None:
+    d = job_dir(job_id)
+    tmp = d / "job.json.tmp"
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, d / "job.json")
+
+
+def create_job(job_id: str, job_title: str, candidates: List[str]) -> None:
+    job_dir(job_id).mkdir(parents=True, exist_ok=True)
+    _write_meta(job_id, {
+        "job_id": job_id,
+        "job_title": job_title,
+        "candidates": candidates,
+        "created_at": time.time(),
+        "status": "running",
+        "owner": BOOT_ID
+    })
+
+
+def end_job(job_id: str, status: str) -> None:
+    """Record how a job ended: "done", or "interrupted" when it was stopped before every candidate finished."""
+    meta, _ = load_job(job_id)
+    if meta:
+        _write_meta(job_id, {**meta, "status": status, "ended_at": time.time()})
+
+
+def touch_heartbeat(job_id: str) -> None:
+    (job_dir(job_id) / "heartbeat").touch()
+
+
+def append_result(job_id: str, result: dict) -> None:
+    """One line per finished candidate; a single O_APPEND write keeps lines whole."""
+    line = (json.dumps(result, separators=(",", ":")) + "\n").encode("utf-8")
+    fd = os.open(job_dir(job_id) / "results.jsonl", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def load_job(job_id: str) -> Tuple[Optional[dict], List[dict]]:
+    """Job metadata and the results recorded so far, in completion order."""
+    d = job_dir(job_id)
+    if not (d / "job.json").exists():
+        return None, []
+    meta = json.loads((d / "job.json").read_text(encoding="utf-8"))
+    results = []
+    if (d / "results.jsonl").exists():
+        with open(d / "results.jsonl", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # line still being written
+    return meta, results
+
+
+# ─────────────────────────────────────────
+# Scheduler
+# ─────────────────────────────────────────
+
+class StartPacer:
+    """Spaces out starts to at most `per_minute` per minute (0 = no pacing)."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_at > now:
+                await asyncio.sleep(self._next_at - now)
+            self._next_at = max(now, self._next_at) + self.interval
+
+
+class BatchScreeningRunner:
+    """
+    Runs simulated interviews for many resumes against one job: generate the
+    questions, let the LLM answer them as the candidate, evaluate every answer
+    and write the report. Each candidate becomes a normal session (so
+    /report/{session_id} works) and one line in the job's results file.
+
+    The simulation answers the main questions only; follow-ups are part of
+    the live conversational flow and add little to a screening score.
+    """
+
+    def __init__(
+        self,
+        llm,
+        resume_parser,
+        concurrency: Optional[int] = None,
+        per_minute: Optional[float] = None,
+        scorer=None,
+        question_bank=None,
+        analytics=None
+    ):
+        self.llm = llm
+        self.resume_parser = resume_parser
+        self.scorer = scorer
+        self.question_bank = question_bank
+        self.analytics = analytics
+        self.semaphore = asyncio.Semaphore(concurrency or BATCH_CONCURRENCY)
+        self.pacer = StartPacer(BATCH_CANDIDATES_PER_MINUTE if per_minute is None else per_minute)
+        self._jobs: Dict[str, asyncio.Task] = {}
+
+    def submit(self, job_title: str, job_description: str, resumes: List[Tuple[str, bytes]]) -> str:
+        """Record the job and start it in the background; returns the job id."""
+        job_id = new_job_id()
+        create_job(job_id, job_title, [name for name, _ in resumes])
+        task = asyncio.create_task(self._run_job(job_id, job_title, job_description, resumes))
+        self._jobs[job_id] = task
+        task.add_done_callback(lambda _: self._jobs.pop(job_id, None))
+        return job_id
+
+    def is_running(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def job_status(self, job_id: str, meta: dict, results: List[dict]) -> str:
+        """
+        "done", "running" or "interrupted". A job started by this process is
+        running while its task is; one started by another worker while its
+        heartbeat is fresh.
+        """
+        if meta.get("status") in ("done", "interrupted"):
+            return meta["status"]
+        if len(results) >= len(meta["candidates"]):
+            return "done"
+        if meta.get("owner") == BOOT_ID:
+            return "running" if self.is_running(job_id) else "interrupted"
+        heartbeat = job_dir(job_id) / "heartbeat"
+        beat = heartbeat.stat().st_mtime if heartbeat.exists() else meta["created_at"]
+        return "running" if time.time() - beat < 3 * BATCH_HEARTBEAT_S else "interrupted"
+
+    async def stop(self) -> None:
+        tasks = list(self._jobs.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_job(self, job_id: str, job_title: str, job_description: str, resumes: List[Tuple[str, bytes]]) -> None:
+        async def one(index: int, filename: str, pdf_bytes: bytes) -> None:
+            await self.pacer.wait()
+            async with self.semaphore:
+                started = time.monotonic()
+                try:
+                    result = await self._screen(job_id, job_title, job_description, pdf_bytes)
+                except Exception as e:
+                    result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+            append_result(job_id, {
+                "index": index,
+                "filename": filename,
+                **result,
+                "elapsed_s": round(time.monotonic() - started, 3),
+                "finished_at": time.time()
+            })
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        status = "interrupted"
+        try:
+            with llm_priority(Priority.BATCH):
+                await asyncio.gather(*(one(i, name, data) for i, (name, data) in enumerate(resumes)))
+            status = "done"
+        finally:
+            heartbeat.cancel()
+            end_job(job_id, status)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            touch_heartbeat(job_id)
+            await asyncio.sleep(BATCH_HEARTBEAT_S)
+
+    async def _screen(self, job_id: str, job_title: str, job_description: str, pdf_bytes: bytes) -> dict:
+        resume_text = await self.resume_parser.extract(pdf_bytes)
+        if not resume_text.strip():
+            raise ValueError("Resume PDF contains no readable text")
+
+        main_questions, question_source = await build_question_set(
+            self.llm, self.question_bank, job_title, job_description, resume_text
+        )
+
+        answers = await asyncio.gather(*(
+            self.llm.answer_question(q["text"], job_title, job_description, resume_text)
+            for q in main_questions
+        ))
+        history = [
+            {"question_id": q["id"], "question": q["text"], "answer": a, "is_followup": False}
+            for q, a in zip(main_questions, answers)
+        ]
+        if self.scorer:
+            evaluations = await evaluate_turns_tiered(self.llm, self.scorer, history, job_title, job_description, resume_text)
+        else:
+            evaluations = await evaluate_turns(self.llm, history, job_title, job_description, resume_text)
+
+        session_id = new_session_id()
+        state = {
+            "job_title": job_title,
+            "job_description": job_description,
+            "resume_text": resume_text,
+            "main_questions": main_questions,
+            "question_source": question_source,
+            "current_main_index": len(main_questions) - 1,
+            "awaiting_followup": False,
+            "followup_counter": 0,
+            "conversation_history": history,
+            "evaluations": {
+                str(i): eval_record("failed", error=e.error) if e.status == "failed" else eval_record("done", result=e)
+                for i, e in enumerate(evaluations)
+            },
+            "batch_job_id": job_id
+        }
+        save_conversation_state(session_id, state)
+        questions_out = [QuestionOut(id=t["question_id"], text=t["question"]) for t in history]
+        report_path(session_id).write_text(build_report(job_title, questions_out, evaluations), encoding="utf-8")
+        if self.analytics:
+            await asyncio.to_thread(self.analytics.record_session, session_id, state, evaluations, source="batch")
+
+        scores = [e.relevancy_score for e in evaluations if e.status == "ok"]
+        return {
+            "status": "done",
+            "session_id": session_id,
+            "average_score": round(sum(scores) / len(scores)) if scores else 0,
+            "evaluated": len(scores),
+            "failed_evaluations": len(evaluations) - len(scores)
+        }
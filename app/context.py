@@ -0,0 +1,309 @@
+import hashlib
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .llm_scheduler import estimate_tokens
+from .skills import get_requirements_extractor
+
+# What goes into prompts. With compaction on, resumes and JDs are normalized
+# and deduplicated, capped to these budgets, evaluations see only the resume
+# sections relevant to the question, and older history turns are summarized.
+# CONTEXT_COMPACTION=0 sends the raw text in the same message layout.
+CONTEXT_COMPACTION = os.getenv("CONTEXT_COMPACTION", "1") != "0"
+CONTEXT_RESUME_MAX_TOKENS = int(os.getenv("CONTEXT_RESUME_MAX_TOKENS", "1500"))
+CONTEXT_JD_MAX_TOKENS = int(os.getenv("CONTEXT_JD_MAX_TOKENS", "1000"))
+CONTEXT_EXCERPT_TOKENS = int(os.getenv("CONTEXT_EXCERPT_TOKENS", "400"))
+CONTEXT_HISTORY_TURNS = int(os.getenv("CONTEXT_HISTORY_TURNS", "4"))       # most recent turns kept verbatim
+CONTEXT_SUMMARY_WORDS = int(os.getenv("CONTEXT_SUMMARY_WORDS", "25"))      # per older turn
+CONTEXT_CACHE_SIZE = int(os.getenv("CONTEXT_CACHE_SIZE", "512"))
+CHUNK_TOKENS = 80
+
+SECTION_HEADINGS = {
+    "summary", "profile", "professional summary", "objective", "about", "about me",
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "education", "skills", "technical skills", "core competencies", "projects", "personal projects",
+    "certifications", "certificates", "publications", "awards", "achievements", "languages",
+    "volunteering", "interests", "responsibilities", "requirements", "qualifications",
+    "what you'll do", "what you will do", "nice to have", "benefits", "about us", "about the role"
+}
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "you", "your", "are", "was", "were", "have", "has",
+    "from", "into", "our", "their", "they", "about", "tell", "time", "when", "what", "how", "which",
+    "describe", "did", "a", "an", "of", "to", "in", "on", "at", "by", "as", "is", "it", "be", "or", "me"
+}
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f\u200b\ufeff]")
+_HYPHEN_BREAK = re.compile(r"(\w)-\n(?=[a-z])")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.I)
+_CONTACT = re.compile(r"@|https?://|www\.|linkedin|github\.com")
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+
+# ─────────────────────────────────────────
+# Token counting
+# ─────────────────────────────────────────
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """The model's tokenizer when tiktoken (and its vocabulary) is available, else None."""
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+# ─────────────────────────────────────────
+# Documents
+# ─────────────────────────────────────────
+
+def normalize_lines(text: str) -> List[str]:
+    """
+    Clean lines of extracted text: NFKC, control characters and page numbers
+    removed, words hyphenated across lines re-joined, whitespace collapsed.
+    Repeats of longer lines (duplicated bullets) and of contact lines (page
+    headers/footers) are dropped; short repeats such as a job title held at
+    two companies are kept.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = _CONTROL_CHARS.sub("", text.replace("\r", "\n").replace("\f", "\n"))
+    text = _HYPHEN_BREAK.sub(r"\1", text)
+
+    lines, seen = [], set()
+    for raw in text.split("\n"):
+        line = " ".join(raw.split())
+        if not line or _PAGE_NUMBER.match(line):
+            continue
+        key = line.lower()
+        if key in seen and (len(key.split()) >= 4 or _CONTACT.search(key)):
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def is_heading(line: str) -> bool:
+    bare = line.strip(" :").lower()
+    if bare in SECTION_HEADINGS:
+        return True
+    letters = [c for c in line if c.isalpha()]
+    return len(line.split()) <= 4 and len(letters) >= 3 and all(c.isupper() for c in letters)
+
+
+def terms(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS}
+
+
+class Document:
+    """
+    A resume or JD split into chunks of a few lines (each tagged with its
+    section heading), with the term statistics used to rank chunks against a
+    question.
+    """
+
+    def __init__(self, text: str):
+        self.lines = normalize_lines(text)
+        self.text = "\n".join(self.lines)
+        self.tokens = count_tokens(self.text)
+        self.chunks: List[Tuple[str, List[str]]] = []      # (heading, lines)
+
+        heading, current, size = "", [], 0
+        for line in self.lines:
+            if is_heading(line):
+                if current:
+                    self.chunks.append((heading, current))
+                heading, current, size = line.strip(" :"), [], 0
+                continue
+            current.append(line)
+            size += estimate_tokens(line)
+            if size >= CHUNK_TOKENS:
+                self.chunks.append((heading, current))
+                current, size = [], 0
+        if current:
+            self.chunks.append((heading, current))
+
+        extractor = get_requirements_extractor()
+        self.chunk_terms = []
+        for _, chunk_lines in self.chunks:
+            chunk_text = "\n".join(chunk_lines)
+            self.chunk_terms.append(terms(chunk_text) | {f"skill:{s}" for s in extractor.find_skills(chunk_text)})
+        self.chunk_tokens = [count_tokens("\n".join(lines)) for _, lines in self.chunks]
+        df: Dict[str, int] = {}
+        for chunk_terms in self.chunk_terms:
+            for term in chunk_terms:
+                df[term] = df.get(term, 0) + 1
+        n = len(self.chunks)
+        self.idf = {term: math.log(1 + n / count) for term, count in df.items()}
+
+    def excerpt(self, query: str, budget: int) -> str:
+        """
+        The chunks most relevant to `query` that fit in `budget` tokens, in
+        document order under their headings. Skill matches count double.
+        The whole document if it already fits.
+        """
+        if self.tokens <= budget or not self.chunks:
+            return self.text
+
+        query_terms = terms(query) | {f"skill:{s}" for s in get_requirements_extractor().find_skills(query)}
+        scores = [
+            sum(self.idf[t] * (2.0 if t.startswith("skill:") else 1.0) for t in query_terms & chunk_terms)
+            for chunk_terms in self.chunk_terms
+        ]
+        ranked = sorted(range(len(self.chunks)), key=lambda i: (-scores[i], i))
+
+        picked, used = [], 0
+        for i in ranked:
+            if used + self.chunk_tokens[i] > budget and picked:
+                continue
+            picked.append(i)
+            used += self.chunk_tokens[i]
+            if used >= budget:
+                break
+
+        out, last_heading = [], None
+        for i in sorted(picked):
+            heading, chunk_lines = self.chunks[i]
+            if heading and heading != last_heading:
+                out.append(heading.upper())
+            last_heading = heading
+            out.extend(chunk_lines)
+        return "\n".join(out)
+
+
+@lru_cache(maxsize=4096)
+def summarize_turn(question: str, answer: str, words: int) -> str:
+    """One line per older turn for the rolling history summary (no LLM call)."""
+    q = question.split()
+    a = answer.split()
+    q_text = " ".join(q[:12]) + ("…" if len(q) > 12 else "")
+    a_text = " ".join(a[:words]) + ("…" if len(a) > words else "")
+    return f"{q_text} -> {a_text}"
+
+
+# ─────────────────────────────────────────
+# Context builder
+# ─────────────────────────────────────────
+
+class ContextBuilder:
+    """
+    Builds the prompt context shared by LLM calls. job_context() (title + JD)
+    and full_context() (title + JD + resume) are serialized once per input and
+    reused byte-for-byte, so every call that sends them starts with the same
+    prefix and provider-side prompt caching can hit: job_context() across all
+    candidates for a posting, full_context() across a session's calls.
+    Per-call text (question, answer, resume excerpt, history) goes after it.
+    """
+
+    def __init__(self, compaction: bool = CONTEXT_COMPACTION, cache_size: int = CONTEXT_CACHE_SIZE):
+        self.compaction = compaction
+        self.cache_size = cache_size
+        self._documents: "OrderedDict[str, Document]" = OrderedDict()
+        self._contexts: "OrderedDict[str, str]" = OrderedDict()
+        self.raw_tokens = 0
+        self.sent_tokens = 0
+
+    def _lru(self, cache: OrderedDict, key: str, build):
+        value = cache.get(key)
+        if value is None:
+            value = build()
+            cache[key] = value
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return value
+
+    def _account(self, raw: str, sent: str) -> str:
+        self.raw_tokens += estimate_tokens(raw) if raw else 0
+        self.sent_tokens += estimate_tokens(sent) if sent else 0
+        return sent
+
+    def document(self, text: str) -> Document:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return self._lru(self._documents, key, lambda: Document(text))
+
+    def job_description(self, job_title: str, job_description: str) -> str:
+        if not self.compaction:
+            return job_description
+        return self.document(job_description).excerpt(job_title + "\n" + job_description, CONTEXT_JD_MAX_TOKENS)
+
+    def resume(self, resume: str, job_title: str, job_description: str) -> str:
+        """The resume capped for whole-resume prompts, favouring what the JD asks for."""
+        if not self.compaction:
+            return resume
+        return self.document(resume).excerpt(job_title + "\n" + job_description, CONTEXT_RESUME_MAX_TOKENS)
+
+    def job_context(self, job_title: str, job_description: str) -> str:
+        key = hashlib.sha256(f"job\0{job_title}\0{job_description}".encode("utf-8")).hexdigest()
+        context = self._lru(self._contexts, key, lambda: json.dumps({
+            "job_title": job_title,
+            "job_description": self.job_description(job_title, job_description)
+        }))
+        return self._account(job_title + job_description, context)
+
+    def full_context(self, job_title: str, job_description: str, resume: str) -> str:
+        key = hashlib.sha256(f"full\0{job_title}\0{job_description}\0{resume}".encode("utf-8")).hexdigest()
+        context = self._lru(self._contexts, key, lambda: json.dumps({
+            "job_title": job_title,
+            "job_description": self.job_description(job_title, job_description),
+            "resume": self.resume(resume, job_title, job_description)
+        }))
+        return self._account(job_title + job_description + resume, context)
+
+    def resume_excerpt(self, resume: str, query: str) -> str:
+        """The resume sections relevant to one question (and answer)."""
+        if not self.compaction:
+            return self._account(resume, resume)
+        return self._account(resume, self.document(resume).excerpt(query, CONTEXT_EXCERPT_TOKENS))
+
+    def history_text(self, conversation_history: list) -> str:
+        """
+        The last CONTEXT_HISTORY_TURNS turns verbatim, older ones one line each.
+        Turn summaries are memoized, so each new turn summarizes one more turn
+        rather than re-reading the whole conversation.
+        """
+        full = [f"Q{i+1}: {t['question']}\nA{i+1}: {t['answer']}\n\n" for i, t in enumerate(conversation_history)]
+        if not self.compaction or len(conversation_history) <= CONTEXT_HISTORY_TURNS:
+            text = "".join(full)
+            return self._account(text, text)
+
+        split = len(conversation_history) - CONTEXT_HISTORY_TURNS
+        older = [
+            f"Q{i+1}: {summarize_turn(t['question'], t['answer'], CONTEXT_SUMMARY_WORDS)}\n"
+            for i, t in enumerate(conversation_history[:split])
+        ]
+        text = "Earlier (summarized):\n" + "".join(older) + "\n" + "".join(full[split:])
+        return self._account("".join(full), text)
+
+    def stats(self) -> dict:
+        return {
+            "compaction": self.compaction,
+            "documents": len(self._documents),
+            "contexts": len(self._contexts),
+            "raw_tokens": self.raw_tokens,
+            "sent_tokens": self.sent_tokens,
+            "saved_ratio": round(1 - self.sent_tokens / self.raw_tokens, 4) if self.raw_tokens else 0.0
+        }
+
+
+_builder: Optional[ContextBuilder] = None
+
+
+def get_context_builder() -> ContextBuilder:
+    global _builder
+    if _builder is None:
+        _builder = ContextBuilder()
+    return _builder
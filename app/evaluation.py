@@ -0,0 +1,576 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .llm_scheduler import Priority, estimate_tokens, llm_priority
+from .locks import session_lock
+from .schemas import EvalOut
+from .tools_eval import (
+    EmbeddingScorer,
+    create_embedding_backend,
+    feedback_for_score,
+    prescreen_justification,
+    prescreen_score
+)
+from .storage import update_conversation_state
+from .tracing import span
+
+# Turn evaluations are independent, so /finish-interview fans them out and
+# only waits for the slowest one instead of one round trip per turn.
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "8"))
+EVAL_TIMEOUT_S = float(os.getenv("EVAL_TIMEOUT_S", "45"))
+
+# "per_turn" - one request per answer, evaluated in the background as the
+#              interview runs
+# "batched"  - all answers in one request per session at /finish-interview
+#              (split into chunks of at most EVAL_BATCH_MAX_TOKENS), so the job
+#              description and resume are sent once instead of once per turn
+EVAL_MODE = os.getenv("EVAL_MODE", "per_turn")
+EVAL_BATCH_MAX_TOKENS = int(os.getenv("EVAL_BATCH_MAX_TOKENS", "24000"))
+EVAL_BATCH_OUTPUT_TOKENS_PER_TURN = 250
+EVAL_BATCH_TIMEOUT_S = float(os.getenv("EVAL_BATCH_TIMEOUT_S", "120"))
+
+# Tiered evaluation: every answer is first scored by the embedding/requirements
+# pre-screen (app/tools_eval.py); only answers whose pre-screen score falls
+# inside [EVAL_TIER_LOW, EVAL_TIER_HIGH] go to the LLM evaluator.
+EVAL_TIERED = os.getenv("EVAL_TIERED", "0") == "1"
+EVAL_TIER_LOW = int(os.getenv("EVAL_TIER_LOW", "20"))
+EVAL_TIER_HIGH = int(os.getenv("EVAL_TIER_HIGH", "85"))
+
+
+def to_eval_out(turn: dict, score_obj: dict) -> EvalOut:
+    return EvalOut(
+        question_id=turn["question_id"],
+        response_text=turn["answer"],
+        relevancy_score=int(score_obj["relevancy_score"]),
+        strengths=score_obj.get("strengths", []),
+        weaknesses=score_obj.get("weaknesses", []),
+        improvement_tips=score_obj.get("improvement_tips", []),
+        justification=score_obj.get("justification", "")
+    )
+
+
+def failed_eval_out(turn: dict, error: str) -> EvalOut:
+    return EvalOut(
+        question_id=turn["question_id"],
+        response_text=turn["answer"],
+        relevancy_score=0,
+        strengths=[],
+        weaknesses=[],
+        improvement_tips=[],
+        justification="",
+        status="failed",
+        error=error
+    )
+
+
+async def evaluate_turn(
+    llm,
+    turn: dict,
+    job_title: str,
+    job_description: str,
+    resume_text: str,
+    timeout: Optional[float] = None
+) -> EvalOut:
+    """
+    Evaluate one Q&A turn. Errors and timeouts are returned as a failed
+    EvalOut rather than raised, so one bad turn never sinks the whole report.
+    """
+    with span("evaluate_turn", question_id=turn.get("question_id")) as s:
+        try:
+            score_obj = await asyncio.wait_for(
+                llm.evaluate_with_tools(
+                    turn["question"],
+                    turn["answer"],
+                    job_title,
+                    job_description,
+                    resume_text
+                ),
+                timeout=timeout or EVAL_TIMEOUT_S
+            )
+            return to_eval_out(turn, score_obj)
+        except asyncio.TimeoutError:
+            s.set(failed="timeout")
+            return failed_eval_out(turn, f"evaluation timed out after {timeout or EVAL_TIMEOUT_S:g}s")
+        except Exception as e:
+            s.set(failed=type(e).__name__)
+            return failed_eval_out(turn, f"{type(e).__name__}: {e}")
+
+
+async def evaluate_turns(
+    llm,
+    turns: List[dict],
+    job_title: str,
+    job_description: str,
+    resume_text: str,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    mode: Optional[str] = None
+) -> List[EvalOut]:
+    """Evaluate all turns, returning results in turn order (per-turn calls run concurrently, bounded)."""
+    if (mode or EVAL_MODE) == "batched":
+        return await evaluate_turns_batched(llm, turns, job_title, job_description, resume_text, concurrency)
+
+    semaphore = asyncio.Semaphore(concurrency or EVAL_CONCURRENCY)
+
+    async def bounded(turn: dict) -> EvalOut:
+        async with semaphore:
+            return await evaluate_turn(llm, turn, job_title, job_description, resume_text, timeout)
+
+    return list(await asyncio.gather(*(bounded(t) for t in turns)))
+
+
+def chunk_turns(turns: List[dict], context_tokens: int, max_tokens: Optional[int] = None) -> List[List[int]]:
+    """Split turn indexes into runs whose prompt plus expected output fits max_tokens."""
+    budget = (max_tokens or EVAL_BATCH_MAX_TOKENS) - context_tokens
+    chunks: List[List[int]] = []
+    used = 0
+    for i, turn in enumerate(turns):
+        cost = estimate_tokens(turn["question"] + turn["answer"]) + EVAL_BATCH_OUTPUT_TOKENS_PER_TURN
+        if chunks and used + cost <= budget:
+            chunks[-1].append(i)
+            used += cost
+        else:
+            chunks.append([i])
+            used = cost
+    return chunks
+
+
+def parse_batch_evaluations(data, turns: List[dict], indexes: List[int]) -> Dict[int, EvalOut]:
+    """
+    Validate a batched response against EvalOut. Returns only the turns whose
+    entry is present and valid; the caller evaluates the rest one by one.
+    """
+    entries = data.get("evaluations") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return {}
+
+    results: Dict[int, EvalOut] = {}
+    for entry in entries:
+        try:
+            i = int(entry["turn"])
+            if i not in indexes or i in results:
+                continue
+            result = EvalOut.model_validate({
+                **{k: entry.get(k) for k in ("strengths", "weaknesses", "improvement_tips")},
+                "question_id": turns[i]["question_id"],
+                "response_text": turns[i]["answer"],
+                "relevancy_score": entry["relevancy_score"],
+                "justification": entry.get("justification", "")
+            })
+        except (KeyError, TypeError, ValueError, ValidationError):
+            continue
+        if 0 <= result.relevancy_score <= 100:
+            results[i] = result
+    return results
+
+
+async def evaluate_turns_batched(
+    llm,
+    turns: List[dict],
+    job_title: str,
+    job_description: str,
+    resume_text: str,
+    concurrency: Optional[int] = None,
+    max_tokens: Optional[int] = None
+) -> List[EvalOut]:
+    """
+    Evaluate turns with one request per chunk instead of one per turn.
+    Turns missing from a response, or whose entry fails validation, fall back
+    to evaluate_turn(); so does a whole chunk whose request fails.
+    """
+    if not turns:
+        return []
+
+    context_tokens = estimate_tokens(job_title + job_description + resume_text)
+    semaphore = asyncio.Semaphore(concurrency or EVAL_CONCURRENCY)
+    results: Dict[int, EvalOut] = {}
+
+    async def run_chunk(indexes: List[int]) -> None:
+        if len(indexes) > 1:
+            batch = [{"turn": i, "question": turns[i]["question"], "answer": turns[i]["answer"]} for i in indexes]
+            with span("evaluate_batch", turns=len(indexes)) as s:
+                try:
+                    async with semaphore:
+                        data = await asyncio.wait_for(
+                            llm.evaluate_turns_batch(batch, job_title, job_description, resume_text),
+                            timeout=EVAL_BATCH_TIMEOUT_S
+                        )
+                    results.update(parse_batch_evaluations(data, turns, indexes))
+                except Exception as e:
+                    s.set(failed=type(e).__name__)  # every turn of this chunk falls back below
+                s.set(fallbacks=sum(1 for i in indexes if i not in results))
+
+        async def fallback(i: int) -> None:
+            async with semaphore:
+                results[i] = await evaluate_turn(llm, turns[i], job_title, job_description, resume_text)
+
+        await asyncio.gather(*(fallback(i) for i in indexes if i not in results))
+
+    await asyncio.gather(*(run_chunk(c) for c in chunk_turns(turns, context_tokens, max_tokens)))
+    return [results[i] for i in range(len(turns))]
+
+
+class EvalTierStats:
+    """Turns each tier decided, and time spent per call to it, for /eval/stats."""
+
+    def __init__(self):
+        self.turns: Dict[str, int] = {"embedding": 0, "llm": 0}
+        self.calls: Dict[str, int] = {"embedding": 0, "llm": 0}
+        self.seconds: Dict[str, float] = {"embedding": 0.0, "llm": 0.0}
+
+    def record(self, tier: str, turns: int, seconds: float) -> None:
+        self.calls[tier] += 1
+        self.turns[tier] += turns
+        self.seconds[tier] += seconds
+
+    def stats(self) -> dict:
+        total = sum(self.turns.values())
+        return {
+            tier: {
+                "turns": self.turns[tier],
+                "share": round(self.turns[tier] / total, 4) if total else 0.0,
+                "calls": self.calls[tier],
+                "avg_ms_per_call": round(1000 * self.seconds[tier] / self.calls[tier], 2) if self.calls[tier] else 0.0
+            }
+            for tier in self.turns
+        }
+
+
+tier_stats = EvalTierStats()
+
+
+def prescreen_eval_out(turn: dict, row: dict, sim_floor: float, sim_ceil: float) -> EvalOut:
+    score = prescreen_score(row, sim_floor, sim_ceil)
+    return EvalOut(
+        question_id=turn["question_id"],
+        response_text=turn["answer"],
+        relevancy_score=score,
+        **feedback_for_score(score),
+        justification=prescreen_justification(row, sim_floor, sim_ceil),
+        tier="embedding"
+    )
+
+
+async def evaluate_turns_tiered(
+    llm,
+    scorer: EmbeddingScorer,
+    turns: List[dict],
+    job_title: str,
+    job_description: str,
+    resume_text: str,
+    mode: Optional[str] = None,
+    low: Optional[int] = None,
+    high: Optional[int] = None,
+    stats: Optional[EvalTierStats] = None
+) -> List[EvalOut]:
+    """
+    Pre-screen every turn in one embeddings pass and keep the clear cases
+    (pre-screen score below `low` or above `high`); send only the uncertain
+    band to evaluate_turns(). If the pre-screen fails, everything goes to the LLM.
+    """
+    low = EVAL_TIER_LOW if low is None else low
+    high = EVAL_TIER_HIGH if high is None else high
+    stats = stats or tier_stats
+    if not turns:
+        return []
+
+    results: Dict[int, EvalOut] = {}
+    t0 = time.perf_counter()
+    try:
+        rows = await scorer.score_turns(turns, job_title, job_description)
+    except Exception:
+        rows = None
+
+    uncertain = list(range(len(turns)))
+    if rows is not None:
+        uncertain = []
+        sim_floor, sim_ceil = scorer.sim_range()
+        for i, row in enumerate(rows):
+            score = prescreen_score(row, sim_floor, sim_ceil)
+            if low <= score <= high:
+                uncertain.append(i)
+            else:
+                results[i] = prescreen_eval_out(turns[i], row, sim_floor, sim_ceil)
+    stats.record("embedding", len(results), time.perf_counter() - t0)
+
+    if uncertain:
+        t0 = time.perf_counter()
+        evaluated = await evaluate_turns(
+            llm, [turns[i] for i in uncertain], job_title, job_description, resume_text, mode=mode
+        )
+        stats.record("llm", len(uncertain), time.perf_counter() - t0)
+        results.update(zip(uncertain, evaluated))
+
+    return [results[i] for i in range(len(turns))]
+
+
+# ─────────────────────────────────────────
+# Background evaluation while the interview is running
+# ─────────────────────────────────────────
+
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "4"))
+
+# Identifies this process in "running" records; a record owned by another
+# boot id was orphaned by a restart and is picked up again.
+BOOT_ID = uuid.uuid4().hex[:12]
+
+
+def eval_record(status: str, result: Optional[EvalOut] = None, error: Optional[str] = None) -> dict:
+    return {
+        "status": status,              # "pending" | "running" | "done" | "failed"
+        "result": result.model_dump() if result else None,
+        "error": error,
+        "owner": BOOT_ID,
+        "updated_at": time.time()
+    }
+
+
+def stored_evaluations(state: dict) -> List[Optional[EvalOut]]:
+    """
+    The outcome recorded for each turn, in order: an EvalOut for finished and
+    failed turns, None for turns not evaluated yet. Never calls the LLM.
+    """
+    records = state.get("evaluations", {})
+    out: List[Optional[EvalOut]] = []
+    for i, turn in enumerate(state["conversation_history"]):
+        rec = records.get(str(i))
+        if rec and rec["status"] == "done":
+            out.append(EvalOut(**rec["result"]))
+        elif rec and rec["status"] == "failed":
+            out.append(failed_eval_out(turn, rec.get("error") or "evaluation failed"))
+        else:
+            out.append(None)
+    return out
+
+
+class EvaluationWorkerPool:
+    """
+    Evaluates answered turns in the background and records the outcome in
+    state["evaluations"][str(turn_index)], so /finish-interview only has to
+    collect results that are already there. In "batched" mode, or when
+    tiered, nothing is evaluated in the background; collect() scores the
+    whole session at once.
+    """
+
+    def __init__(
+        self,
+        llm,
+        workers: Optional[int] = None,
+        mode: Optional[str] = None,
+        scorer: Optional[EmbeddingScorer] = None
+    ):
+        self.llm = llm
+        self.workers = workers or EVAL_WORKERS
+        self.mode = mode or EVAL_MODE
+        if scorer is None and EVAL_TIERED:
+            scorer = EmbeddingScorer(create_embedding_backend(
+                client=getattr(llm, "client", None),
+                scheduler=getattr(llm, "scheduler", None)
+            ))
+        self.scorer = scorer
+        self.queue: "asyncio.Queue[Tuple[str, int]]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._claimed: set = set()
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, session_id: str, turn_index: int) -> None:
+        key = (session_id, turn_index)
+        if self.mode != "per_turn" or self.scorer or key in self._inflight:
+            return
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(key)
+
+    def enqueue_orphans(self, session_id: str, state: dict) -> None:
+        """Re-enqueue pending/running records left behind by a previous process."""
+        for idx, rec in state.get("evaluations", {}).items():
+            if rec["status"] in ("pending", "running") and rec.get("owner") != BOOT_ID:
+                self.enqueue(session_id, int(idx))
+
+    def _claim(self, key: Tuple[str, int]) -> bool:
+        """First caller wins: a queued turn is run by a worker or by collect(), never both."""
+        if key in self._claimed:
+            return False
+        self._claimed.add(key)
+        return True
+
+    def _release(self, key: Tuple[str, int], result: Optional[EvalOut] = None, error: Optional[Exception] = None) -> None:
+        future = self._inflight.pop(key, None)
+        self._claimed.discard(key)
+        if future is not None and not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def _worker(self) -> None:
+        # Nobody waits on these until /finish-interview, which takes over
+        # whatever is still queued at its own priority
+        with llm_priority(Priority.BATCH):
+            while True:
+                key = await self.queue.get()
+                try:
+                    if key in self._inflight and self._claim(key):
+                        try:
+                            self._release(key, result=await self._run(*key))
+                        except asyncio.CancelledError:
+                            self._release(key)    # waiters see no result and evaluate it themselves
+                            raise
+                        except Exception as e:
+                            self._release(key, error=e)
+                finally:
+                    self.queue.task_done()
+
+    async def _run(self, session_id: str, turn_index: int) -> Optional[EvalOut]:
+        def mark_running(state: dict) -> None:
+            if turn_index < len(state["conversation_history"]):
+                state.setdefault("evaluations", {})[str(turn_index)] = eval_record("running")
+
+        with span("eval_worker", session_id=session_id, turn_index=turn_index):
+            async with session_lock(session_id):
+                state = update_conversation_state(session_id, mark_running)
+            if not state or turn_index >= len(state["conversation_history"]):
+                return None
+
+            result = await evaluate_turn(
+                self.llm,
+                state["conversation_history"][turn_index],
+                state["job_title"],
+                state["job_description"],
+                state["resume_text"]
+            )
+            await self._store(session_id, {turn_index: result})
+            return result
+
+    async def _store(self, session_id: str, results: Dict[int, EvalOut]) -> None:
+        def record_results(state: dict) -> None:
+            records = state.setdefault("evaluations", {})
+            for turn_index, result in results.items():
+                if result.status == "failed":
+                    records[str(turn_index)] = eval_record("failed", error=result.error)
+                else:
+                    records[str(turn_index)] = eval_record("done", result=result)
+
+        async with session_lock(session_id):
+            update_conversation_state(session_id, record_results)
+
+    async def collect(self, session_id: str, state: dict) -> List[EvalOut]:
+        """
+        Return one EvalOut per turn, in order. Finished records are reused,
+        turns still being evaluated here are awaited, and anything else
+        (never enqueued, failed, or orphaned by a restart) is evaluated now.
+        """
+        results: List[Optional[EvalOut]] = [None] * len(state["conversation_history"])
+        async for turn_index, result in self.iter_collect(session_id, state):
+            results[turn_index] = result
+        return results
+
+    async def iter_collect(self, session_id: str, state: dict) -> AsyncIterator[Tuple[int, EvalOut]]:
+        """Same as collect(), but yields (turn_index, EvalOut) as soon as each one is ready."""
+        history = state["conversation_history"]
+        records = state.get("evaluations", {})
+        semaphore = asyncio.Semaphore(EVAL_CONCURRENCY)
+        fresh: Dict[int, EvalOut] = {}
+
+        async def evaluate_now(i: int, claimed: bool = False) -> List[Tuple[int, EvalOut]]:
+            try:
+                async with semaphore:
+                    result = await evaluate_turn(
+                        self.llm,
+                        history[i],
+                        state["job_title"],
+                        state["job_description"],
+                        state["resume_text"]
+                    )
+            except BaseException:
+                # Cancelled (e.g. the stream's client went away): un-claim the
+                # turn so the next collect() evaluates it instead of waiting
+                # on a future nobody will resolve; waiters see no result and
+                # evaluate it themselves
+                if claimed:
+                    self._release((session_id, i))
+                raise
+            fresh[i] = result
+            if claimed:
+                self._release((session_id, i), result=result)
+            return [(i, result)]
+
+        async def evaluate_batch(indexes: List[int]) -> List[Tuple[int, EvalOut]]:
+            if self.scorer:
+                results = await evaluate_turns_tiered(
+                    self.llm,
+                    self.scorer,
+                    [history[i] for i in indexes],
+                    state["job_title"],
+                    state["job_description"],
+                    state["resume_text"],
+                    mode=self.mode
+                )
+            else:
+                results = await evaluate_turns_batched(
+                    self.llm,
+                    [history[i] for i in indexes],
+                    state["job_title"],
+                    state["job_description"],
+                    state["resume_text"]
+                )
+            fresh.update(zip(indexes, results))
+            return list(zip(indexes, results))
+
+        async def await_inflight(i: int, future: asyncio.Future) -> List[Tuple[int, EvalOut]]:
+            try:
+                result = await asyncio.shield(future)
+            except Exception:
+                result = None
+            if isinstance(result, EvalOut):
+                return [(i, result)]
+            return await evaluate_now(i)
+
+        ready: List[Tuple[int, EvalOut]] = []
+        tasks: List[asyncio.Task] = []
+        todo: List[int] = []
+        for i in range(len(history)):
+            rec = records.get(str(i))
+            if rec and rec["status"] == "done":
+                ready.append((i, EvalOut(**rec["result"])))
+            elif (session_id, i) in self._inflight:
+                if self._claim((session_id, i)):
+                    # Still queued: run it here rather than wait behind other sessions
+                    tasks.append(asyncio.create_task(evaluate_now(i, claimed=True)))
+                else:
+                    tasks.append(asyncio.create_task(await_inflight(i, self._inflight[(session_id, i)])))
+            else:
+                todo.append(i)
+
+        if (self.mode == "batched" and len(todo) > 1) or (self.scorer and todo):
+            tasks.append(asyncio.create_task(evaluate_batch(todo)))
+        else:
+            tasks.extend(asyncio.create_task(evaluate_now(i)) for i in todo)
+
+        try:
+            for item in ready:
+                yield item
+            for next_done in asyncio.as_completed(tasks):
+                for item in await next_done:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Keep evaluations already paid for even when the caller stopped
+            # early; shielded so a second cancellation can't drop the write
+            if fresh:
+                await asyncio.shield(self._store(session_id, dict(fresh)))
@@ -0,0 +1,344 @@
+import asyncio
+import fcntl
+import gzip
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from .metrics import SESSION_BYTES_RECLAIMED, SESSION_LIFECYCLE
+from .storage import BASE, SESSION_BLOB_GRACE_S, SessionStore, get_session_store
+
+# Background sweep over the session store. Unfinished sessions idle for
+# SESSION_TTL_S are deleted; finished ones (a report was written) idle for
+# SESSION_ARCHIVE_AFTER_S are moved, state and report, into the archive and
+# deleted from the live store. Session directories the store does not know
+# about are left alone unless they are empty (a start that failed early).
+# Resume/JD blobs no remaining session refers to are garbage-collected.
+# Finished sessions still live have their turn log folded into one snapshot
+# (file store), since nothing appends to them any more.
+SESSION_LIFECYCLE_ENABLED = os.getenv("SESSION_LIFECYCLE_ENABLED", "1") != "0"
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", str(7 * 24 * 3600)))
+SESSION_ARCHIVE_AFTER_S = float(os.getenv("SESSION_ARCHIVE_AFTER_S", str(24 * 3600)))
+SESSION_LIFECYCLE_INTERVAL_S = float(os.getenv("SESSION_LIFECYCLE_INTERVAL_S", "3600"))
+# One compressed JSON-lines file per day of completion plus index.sqlite3
+SESSION_ARCHIVE_DIR = Path(os.getenv("SESSION_ARCHIVE_DIR", str(BASE / "_archive")))
+# gzip (stdlib) or zstd (needs the 'zstandard' package)
+SESSION_ARCHIVE_CODEC = os.getenv("SESSION_ARCHIVE_CODEC", "gzip")
+
+SESSION_ID = re.compile(r"^[0-9a-f]{12}$")
+CODEC_SUFFIXES = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def _codec(name: str):
+    """(compress, decompress) for one self-contained frame; frames concatenate into a valid stream."""
+    if name == "gzip":
+        return (lambda data: gzip.compress(data, compresslevel=6, mtime=0)), gzip.decompress
+    if name == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("SESSION_ARCHIVE_CODEC=zstd needs the 'zstandard' package (pip install zstandard).")
+        return zstandard.ZstdCompressor(level=10).compress, zstandard.ZstdDecompressor().decompress
+    raise ValueError(f"Unknown SESSION_ARCHIVE_CODEC {name!r} (expected gzip or zstd)")
+
+
+def tree_bytes(path: Path) -> int:
+    """Total size of the files under path (0 if it doesn't exist)."""
+    total = 0
+    try:
+        entries = list(os.scandir(path))
+    except (FileNotFoundError, NotADirectoryError):
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                total += tree_bytes(Path(entry.path))
+            else:
+                total += entry.stat(follow_symlinks=False).st_size
+        except FileNotFoundError:
+            pass
+    return total
+
+
+class SessionArchive:
+    """
+    Archived sessions, one compressed frame per session appended to the file
+    for its completion day (`zcat sessions-2024-05-01.jsonl.gz` reads them
+    all), and a SQLite index of each frame's file, offset and length so one
+    session is read back with a single seek and decompress.
+    """
+
+    def __init__(self, directory: Path = SESSION_ARCHIVE_DIR, codec: str = SESSION_ARCHIVE_CODEC):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self._compress, _ = _codec(codec)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / "index.sqlite3"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS archived ("
+            " session_id TEXT PRIMARY KEY, file TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL,"
+            " raw_bytes INTEGER NOT NULL, job_title TEXT, finished_at REAL, archived_at REAL NOT NULL)"
+        )
+
+    def add(self, session_id: str, record: dict, finished_at: float) -> int:
+        """Append one session; returns its compressed size."""
+        raw = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        frame = self._compress(raw)
+        day = datetime.fromtimestamp(finished_at, timezone.utc).strftime("%Y-%m-%d")
+        name = f"sessions-{day}{CODEC_SUFFIXES[self.codec]}"
+        with self._lock:
+            with open(self.directory / name, "ab") as fh:
+                offset = fh.seek(0, os.SEEK_END)
+                fh.write(frame)
+                fh.flush()
+                os.fsync(fh.fileno())
+            self._conn.execute(
+                "INSERT OR REPLACE INTO archived VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, name, offset, len(frame), len(raw),
+                 (record.get("state") or {}).get("job_title"), finished_at, time.time())
+            )
+        return len(frame)
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file, offset, length FROM archived WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        name, offset, length = row
+        codec = next(c for c, suffix in CODEC_SUFFIXES.items() if name.endswith(suffix))
+        with open(self.directory / name, "rb") as fh:
+            fh.seek(offset)
+            frame = fh.read(length)
+        return json.loads(_codec(codec)[1](frame))
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions, stored, raw = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(raw_bytes), 0) FROM archived"
+            ).fetchone()
+        files = [p for p in self.directory.iterdir() if any(p.name.endswith(s) for s in CODEC_SUFFIXES.values())]
+        return {
+            "sessions": sessions,
+            "files": len(files),
+            "bytes": sum(p.stat().st_size for p in files),
+            "raw_bytes": raw,
+            "compression_ratio": round(raw / stored, 2) if stored else None
+        }
+
+
+class SessionLifecycleManager:
+    """
+    Runs sweep() in a worker thread every SESSION_LIFECYCLE_INTERVAL_S. With
+    several uvicorn workers only one sweeps at a time (flock on the archive
+    directory); a session written to while it is being swept is skipped.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        base: Path = BASE,
+        archive: Optional[SessionArchive] = None,
+        ttl_s: float = SESSION_TTL_S,
+        archive_after_s: float = SESSION_ARCHIVE_AFTER_S,
+        interval_s: float = SESSION_LIFECYCLE_INTERVAL_S
+    ):
+        self._store = store
+        self.base = Path(base)
+        self._archive = archive
+        self.ttl_s = ttl_s
+        self.archive_after_s = archive_after_s
+        self.interval_s = interval_s
+        self.totals = {
+            "expired": 0, "archived": 0, "orphans_removed": 0, "blobs_removed": 0, "compacted": 0,
+            "reclaimed_bytes": 0, "archive_bytes_added": 0
+        }
+        self.last_sweep: Optional[dict] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def store(self) -> SessionStore:
+        return self._store or get_session_store()
+
+    @property
+    def archive(self) -> SessionArchive:
+        if self._archive is None:
+            self._archive = SessionArchive()
+        return self._archive
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+            await asyncio.sleep(self.interval_s)
+
+    @contextmanager
+    def _sweeping(self):
+        """Yields False if another worker is sweeping."""
+        self.archive.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.archive.directory / ".sweep.lock", "w") as fh:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def sweep(self, now: Optional[float] = None) -> dict:
+        """One pass over every session; returns what it did and the disk usage it saw."""
+        now = time.time() if now is None else now
+        t0 = time.perf_counter()
+        summary = {
+            "expired": 0, "archived": 0, "orphans_removed": 0, "skipped_busy": 0,
+            "blobs_removed": 0, "compacted": 0, "reclaimed_bytes": 0, "archive_bytes_added": 0,
+            "live_sessions": 0, "finished_sessions": 0, "live_bytes": 0,
+            "unmanaged_dirs": 0, "unmanaged_bytes": 0
+        }
+        with self._sweeping() as mine:
+            if not mine:
+                return {**summary, "skipped": "another worker is sweeping"}
+            store = self.store
+            live = set(store.list_sessions())
+            for session_id in sorted(live):
+                self._sweep_session(store, session_id, now, summary)
+            self._sweep_orphans(live, now, summary)
+            self._sweep_blobs(store, now, summary)
+
+        for key in self.totals:
+            self.totals[key] += summary[key]
+        summary["at"] = now
+        summary["seconds"] = round(time.perf_counter() - t0, 3)
+        self.last_sweep = summary
+        return summary
+
+    def _sweep_session(self, store: SessionStore, session_id: str, now: float, summary: dict) -> None:
+        d = self.base / session_id
+        report = d / "report.txt"
+        updated = store.updated_at(session_id)
+        finished_at = report.stat().st_mtime if report.exists() else None
+        last = max((t for t in (updated, finished_at) if t is not None), default=None)
+        if last is None:
+            last = d.stat().st_mtime if d.exists() else now
+        idle = now - last
+
+        if finished_at is not None and idle >= self.archive_after_s:
+            if self._busy(store, session_id, updated, summary):
+                return    # not archived either, or every sweep would append it again
+            state = store.load(session_id)
+            record = {
+                "session_id": session_id,
+                "finished_at": finished_at,
+                "archived_at": now,
+                "state": state,
+                "report": report.read_text(encoding="utf-8")
+            }
+            added = self.archive.add(session_id, record, finished_at)
+            if self._remove(store, session_id, updated, "archived", summary):
+                summary["archive_bytes_added"] += added
+        elif finished_at is None and idle >= self.ttl_s:
+            self._remove(store, session_id, updated, "expired", summary)
+        else:
+            if finished_at is not None and hasattr(store, "compact"):
+                summary["compacted"] += store.compact(session_id)
+            summary["live_sessions"] += 1
+            summary["finished_sessions"] += finished_at is not None
+            summary["live_bytes"] += tree_bytes(d)
+
+    def _busy(self, store: SessionStore, session_id: str, seen_updated: Optional[float], summary: dict) -> bool:
+        if store.updated_at(session_id) != seen_updated:
+            summary["skipped_busy"] += 1   # written to mid-sweep; look again next time
+            return True
+        return False
+
+    def _remove(self, store: SessionStore, session_id: str, seen_updated: Optional[float], event: str, summary: dict) -> bool:
+        if self._busy(store, session_id, seen_updated, summary):
+            return False
+        d = self.base / session_id
+        freed = tree_bytes(d)
+        store.delete(session_id)
+        shutil.rmtree(d, ignore_errors=True)
+        summary[event] += 1
+        summary["reclaimed_bytes"] += freed
+        SESSION_LIFECYCLE.inc((event,))
+        SESSION_BYTES_RECLAIMED.inc((event,), freed)
+        return True
+
+    def _sweep_orphans(self, live: set, now: float, summary: dict) -> None:
+        if not self.base.exists():
+            return
+        for entry in os.scandir(self.base):
+            if not entry.is_dir(follow_symlinks=False) or not SESSION_ID.match(entry.name) or entry.name in live:
+                continue
+            d = Path(entry.path)
+            names = {p.name for p in d.iterdir()}
+            if names <= {".lock"} and now - entry.stat().st_mtime >= self.ttl_s:
+                shutil.rmtree(d, ignore_errors=True)
+                summary["orphans_removed"] += 1
+                SESSION_LIFECYCLE.inc(("orphan_removed",))
+            else:
+                summary["unmanaged_dirs"] += 1
+                summary["unmanaged_bytes"] += tree_bytes(d)
+
+    def _sweep_blobs(self, store: SessionStore, now: float, summary: dict) -> None:
+        blobs = getattr(store, "blobs", None)
+        if blobs is None:
+            return
+        referenced = set()
+        for session_id in store.list_sessions():    # again: sessions may have been created mid-sweep
+            referenced |= store.blob_refs(session_id)
+        removed, freed = blobs.gc(referenced, now - SESSION_BLOB_GRACE_S)
+        summary["blobs_removed"] += removed
+        summary["reclaimed_bytes"] += freed
+        if removed:
+            SESSION_LIFECYCLE.inc(("blob_removed",), removed)
+            SESSION_BYTES_RECLAIMED.inc(("blob_removed",), freed)
+
+    def _has_archive(self) -> bool:
+        """Whether there is an archive to read, without creating one."""
+        return self._archive is not None or (SESSION_ARCHIVE_DIR / "index.sqlite3").exists()
+
+    def archived_session(self, session_id: str) -> Optional[dict]:
+        return self.archive.get(session_id) if self._has_archive() else None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": SESSION_LIFECYCLE_ENABLED,
+            "ttl_s": self.ttl_s,
+            "archive_after_s": self.archive_after_s,
+            "interval_s": self.interval_s,
+            "totals": dict(self.totals),
+            "last_sweep": self.last_sweep,
+            "last_error": self.last_error,
+            "archive": self.archive.stats() if SESSION_LIFECYCLE_ENABLED or self._has_archive() else None
+        }
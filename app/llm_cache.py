@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Identical (model, system prompt, payload) requests — recruiters re-running a
+# candidate, clients retrying after a timeout — are answered from here instead
+# of paying for another completion.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")  # "" keeps the cache in memory only
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "100000"))
+
+
+def cache_key(model: str, system: str, payload: dict) -> str:
+    blob = json.dumps([model, system, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class CacheTier:
+    name = "tier"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": self.size()}
+
+
+class MemoryLRUCache(CacheTier):
+    name = "memory"
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_s: float = LLM_CACHE_TTL_S):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or time.time() - item[1] > self.ttl_s:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache(CacheTier):
+    """
+    On-disk tier. Expired rows are dropped on read; once the table grows past
+    max_rows the least recently used tenth is deleted in one statement.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_rows: int = LLM_CACHE_MAX_ROWS, ttl_s: float = LLM_CACHE_TTL_S):
+        super().__init__()
+        self.max_rows = max_rows
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._rows = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_s:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._rows -= 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if cur.rowcount:
+                self._rows += 1
+            else:
+                self._conn.execute(
+                    "UPDATE llm_cache SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                    (value, now, now, key)
+                )
+            if self._rows > self.max_rows:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (max(1, self.max_rows // 10),)
+                )
+                self._rows = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._rows -= self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._rows = 0
+
+    def size(self) -> int:
+        return self._rows
+
+
+class LLMResponseCache:
+    """
+    Looks tiers up in order (memory first) and copies disk hits back into the
+    faster tiers. Misses are only counted once, across all tiers.
+    """
+
+    def __init__(self, tiers: List[CacheTier]):
+        self.tiers = tiers
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:i]:
+                    faster.set(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def delete(self, key: str) -> None:
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "tiers": {tier.name: tier.stats() for tier in self.tiers}
+        }
+
+
+def default_cache() -> Optional[LLMResponseCache]:
+    if not LLM_CACHE_ENABLED:
+        return None
+    tiers: List[CacheTier] = [MemoryLRUCache()]
+    if LLM_CACHE_PATH:
+        tiers.append(SQLiteCache())
+    return LLMResponseCache(tiers)
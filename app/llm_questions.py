@@ -1,6 +1,30 @@
+import asyncio
 import json
-from openai import OpenAI
 import os
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from .context import ContextBuilder, count_tokens, get_context_builder
+from .llm_cache import LLMResponseCache, cache_key, default_cache
+from .llm_scheduler import LLM_EST_COMPLETION_TOKENS, LLMScheduler, Priority, llm_priority
+from .metrics import current_llm_method, llm_method, record_llm_cache, record_llm_usage
+from .tracing import inject_headers, span
+
+MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# One connection pool is shared by every request made through an
+# OpenAIToolCallingLLM instance; its scheduler caps in-flight completions so a
+# burst of /finish-interview calls can't open hundreds of sockets at once.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "32"))
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "60"))
+
+# Resolves a shared in-flight completion whose caller was cancelled: the
+# other callers waiting on it make the request themselves instead.
+_ABANDONED = object()
 
 QUESTION_GEN_SYSTEM = """You are an expert interviewer.
 
@@ -32,6 +56,20 @@ Instructions:
 9. ID format: short abbreviation + _q# (e.g., "ml_q1", "swe_q2")
 """
 
+RESUME_QUESTION_SYSTEM = """You are an expert interviewer.
+
+Write resume-specific behavioral questions: each one must refer to a concrete
+project, role or claim in the RESUME and relate it to the JOB DESCRIPTION.
+
+Return STRICT JSON ONLY:
+{
+  "questions": [
+    {"id":"cv_q1","text":"Your resume mentions ... Tell me about ..."}
+  ]
+}
+Exactly "count" questions. IDs: cv_q1, cv_q2, ... No markdown, no extra keys.
+"""
+
 ANSWER_GEN_SYSTEM = """You are the candidate.
 Answer the question in 90-140 words.
 Use only information consistent with the resume and job description.
@@ -52,6 +90,26 @@ Return STRICT JSON ONLY:
 No markdown. No extra keys.
 """
 
+EVAL_BATCH_SYSTEM = """You are an interview evaluator.
+Evaluate EACH of the candidate's answers in "turns" on its own merits,
+using the job and resume as shared context.
+
+Return STRICT JSON ONLY:
+{
+  "evaluations": [
+    {
+      "turn": <the turn number from the input>,
+      "relevancy_score": <int 0-100>,
+      "strengths": ["...", "..."],
+      "weaknesses": ["...", "..."],
+      "improvement_tips": ["...", "..."],
+      "justification": "..."
+    }
+  ]
+}
+Exactly one entry per input turn. No markdown. No extra keys.
+"""
+
 FOLLOWUP_SYSTEM = """You are an expert interviewer conducting a conversational interview.
 
 Based on the candidate's answer to the previous question, generate ONE smart follow-up question
@@ -75,105 +133,341 @@ No markdown. No extra keys.
 """
 
 
+CONTEXT_PREAMBLE = "Context shared by the tasks of this interview (JSON):\n"
+
+
+def _usable_questions(questions) -> list:
+    return [q for q in questions if isinstance(q, dict) and q.get("id") and q.get("text")] if isinstance(questions, list) else []
+
+
+def _questions_by_dimension(content: str) -> Dict[str, list]:
+    """{"Dimension": [{"id", "text"}, ...]} keeping only well-formed questions; {} if there are none."""
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        return {}
+    by_dimension = {dimension: _usable_questions(questions) for dimension, questions in data.items()}
+    return {dimension: questions for dimension, questions in by_dimension.items() if questions}
+
+
+def _resume_questions(content: str) -> list:
+    data = json.loads(content)
+    return _usable_questions(data.get("questions")) if isinstance(data, dict) else []
+
+
+def _evaluation(content: str) -> dict:
+    """The evaluation object; raises if it has no usable relevancy_score."""
+    data = json.loads(content)
+    int(data["relevancy_score"])
+    return data
+
+
+def followup_payload(original_question: str, candidate_answer: str, followup_number: int, conversation_history: list) -> dict:
+    return {
+        "conversation_so_far": get_context_builder().history_text(conversation_history),
+        "last_question": original_question,
+        "candidate_answer": candidate_answer,
+        "followup_number": followup_number,
+        "instruction": "Generate ONE follow-up question based specifically on what the candidate just said."
+    }
+
+
+class JsonStringFieldStreamer:
+    """
+    Incrementally pulls the value of one string field out of a JSON object
+    that arrives in arbitrary chunks, so follow-up question text can be
+    streamed to the client while the model is still emitting it.
+    """
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, field: str):
+        self.marker = f'"{field}"'
+        self.buffer = ""
+        self.pos = 0
+        self.state = "seek"  # seek → value → done
+
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        out = []
+        if self.state == "seek":
+            start = self.buffer.find(self.marker)
+            if start < 0:
+                return ""
+            colon = self.buffer.find(":", start + len(self.marker))
+            quote = self.buffer.find('"', colon + 1) if colon >= 0 else -1
+            if quote < 0:
+                return ""
+            self.pos = quote + 1
+            self.state = "value"
+        while self.state == "value" and self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+            if ch == '"':
+                self.state = "done"
+            elif ch == "\\":
+                if self.pos + 1 >= len(self.buffer):
+                    break
+                esc = self.buffer[self.pos + 1]
+                if esc == "u":
+                    if self.pos + 6 > len(self.buffer):
+                        break
+                    out.append(chr(int(self.buffer[self.pos + 2:self.pos + 6], 16)))
+                    self.pos += 6
+                    continue
+                out.append(self._ESCAPES.get(esc, esc))
+                self.pos += 2
+                continue
+            else:
+                out.append(ch)
+            self.pos += 1
+        return "".join(out)
+
+
 class OpenAIToolCallingLLM:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[LLMResponseCache] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        context: Optional[ContextBuilder] = None
+    ):
+        if client is None:
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(LLM_TIMEOUT_S, connect=10.0),
+            )
+            # Retries happen in the scheduler, where they respect the rate limits
+            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client, max_retries=0)
+        self.client = client
+        self.scheduler = scheduler or LLMScheduler(max_concurrency or LLM_MAX_CONCURRENCY)
+        self.cache = cache if cache is not None else default_cache()
+        self.context = context or get_context_builder()
+        # From the provider's usage; cached tokens are prompt-prefix cache hits
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        # Identical cacheable requests already on the wire; later callers await
+        # the first one instead of paying for the same completion twice.
+        self._pending: Dict[str, asyncio.Future] = {}
 
-    async def generate_role_specific_questions(self, job_title: str, job_description: str, resume: str):
+    async def aclose(self) -> None:
+        await self.client.close()
+
+    @staticmethod
+    def _messages(system: str, context: Optional[str], user: str) -> list:
+        """
+        Shared context first, then the task's system prompt, then this call's
+        payload: calls of different kinds over the same context (question
+        generation, batched evaluation chunks; or every per-turn evaluation
+        for a posting) then start with the same bytes, which is what
+        provider-side prompt caching matches on.
+        """
+        messages = []
+        if context:
+            messages.append({"role": "system", "content": CONTEXT_PREAMBLE + context})
+        messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": user})
+        return messages
+
+    async def _chat(
+        self,
+        system: str,
+        payload: dict,
+        json_mode: bool = True,
+        cacheable: bool = False,
+        context: Optional[str] = None,
+        parse: Optional[Callable[[str], Any]] = None
+    ):
+        """
+        The completion for (system, context, payload), passed through `parse`
+        if given. A cacheable completion is only cached once `parse` accepts
+        it and returns something non-empty, so a truncated or unusable
+        answer is asked for again next time instead of replayed for the TTL.
+        """
+        parse = parse or (lambda content: content)
+        if not (cacheable and self.cache):
+            return parse(await self._complete(system, payload, json_mode, context))
+
+        key = cache_key(MODEL, system, {"context": context, "payload": payload} if context else payload)
+        cached = await asyncio.to_thread(self.cache.get, key)    # the disk tier does SQLite I/O
+        record_llm_cache(cached is not None)
+        if cached is not None:
+            try:
+                value = parse(cached)
+            except (ValueError, KeyError, TypeError):
+                value = None
+            if value:
+                return value
+            await asyncio.to_thread(self.cache.delete, key)    # cached before completions were validated
+        while key in self._pending:
+            content = await asyncio.shield(self._pending[key])
+            if content is not _ABANDONED:
+                return parse(content)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            content = await self._complete(system, payload, json_mode, context)
+            future.set_result(content)
+            value = parse(content)
+            if value:
+                await asyncio.to_thread(self.cache.set, key, content)
+            return value
+        except asyncio.CancelledError:
+            # Not future.cancel(): that would cancel every waiter too
+            if not future.done():
+                future.set_result(_ABANDONED)
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                future.exception()  # waiters re-raise it; don't log "never retrieved"
+            raise
+        finally:
+            del self._pending[key]
+
+    async def _complete(self, system: str, payload: dict, json_mode: bool = True, context: Optional[str] = None):
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        messages = self._messages(system, context, json.dumps(payload))
+        estimated = sum(count_tokens(m["content"]) for m in messages) + LLM_EST_COMPLETION_TOKENS
+
+        with span("llm.completion", method=current_llm_method(), estimated_tokens=estimated) as s:
+            headers = inject_headers()
+
+            def call():
+                return self.client.chat.completions.create(model=MODEL, messages=messages, extra_headers=headers, **kwargs)
+
+            resp = await self.scheduler.run(call, estimated)
+            if resp.usage:
+                self.scheduler.record_usage(estimated, resp.usage.total_tokens)
+                self.prompt_tokens += resp.usage.prompt_tokens
+                details = getattr(resp.usage, "prompt_tokens_details", None)
+                cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+                self.cached_prompt_tokens += cached
+                record_llm_usage(resp.usage)
+                s.set(prompt_tokens=resp.usage.prompt_tokens, completion_tokens=resp.usage.completion_tokens, cached_tokens=cached)
+        return resp.choices[0].message.content
+
+    async def _chat_stream(self, system: str, payload: dict, on_delta: Callable[[str], None], json_mode: bool = True):
+        """Like _chat, but calls on_delta with each content chunk as it arrives."""
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        messages = self._messages(system, None, json.dumps(payload))
+        parts = []
+
+        async def call():
+            stream = await self.client.chat.completions.create(
+                model=MODEL, messages=messages, stream=True, extra_headers=inject_headers(), **kwargs
+            )
+            try:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        on_delta(delta)
+            except Exception as e:
+                if parts:
+                    # Text already went out to the client; a retry would repeat it
+                    raise RuntimeError(f"completion stream interrupted: {e}") from e
+                raise
+            return "".join(parts)
+
+        estimated = sum(count_tokens(m["content"]) for m in messages) + LLM_EST_COMPLETION_TOKENS
+        with span("llm.completion", method=current_llm_method(), estimated_tokens=estimated, stream=True):
+            return await self.scheduler.run(call, estimated)
+
+    @llm_method
+    async def generate_questions_by_dimension(self, job_title: str, job_description: str, resume: str):
+        """Questions keyed by role dimension, as the model returns them: {"Dimension": [{"id", "text"}, ...]}."""
+        context = self.context.full_context(job_title, job_description, resume)
         payload = {
-            "job_title": job_title,
-            "job_description": job_description,
-            "resume": resume,
             "instruction": "Analyze BOTH the job title and job description together to identify relevant role dimensions/competencies, then generate 1-3 behavioral questions for each dimension."
         }
 
-        resp = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": QUESTION_GEN_SYSTEM},
-                {"role": "user", "content": json.dumps(payload)}
-            ],
-            response_format={"type": "json_object"}
-        )
+        with llm_priority(Priority.INTERACTIVE, override=False):
+            return await self._chat(
+                QUESTION_GEN_SYSTEM, payload, cacheable=True, context=context, parse=_questions_by_dimension
+            )
 
-        data = json.loads(resp.choices[0].message.content)
+    @llm_method
+    async def generate_role_specific_questions(self, job_title: str, job_description: str, resume: str):
+        by_dimension = await self.generate_questions_by_dimension(job_title, job_description, resume)
+        return [q for questions in by_dimension.values() for q in questions]
 
-        all_questions = []
-        if isinstance(data, dict):
-            for dimension, questions in data.items():
-                if isinstance(questions, list):
-                    all_questions.extend(questions)
+    @llm_method
+    async def generate_resume_questions(self, job_title: str, job_description: str, resume: str, count: int):
+        """A few questions about this candidate's own resume, to mix into a question set reused from the bank."""
+        context = self.context.full_context(job_title, job_description, resume)
+        payload = {"count": count}
 
-        return all_questions
+        with llm_priority(Priority.INTERACTIVE, override=False):
+            questions = await self._chat(
+                RESUME_QUESTION_SYSTEM, payload, cacheable=True, context=context, parse=_resume_questions
+            )
+        return questions[:count]
 
+    @llm_method
     async def generate_followup_question(
         self,
         original_question: str,
         candidate_answer: str,
         followup_number: int,
-        conversation_history: list
+        conversation_history: list,
+        on_token: Optional[Callable[[str], None]] = None
     ):
         """
         Generate a follow-up question based on what the candidate just answered.
         conversation_history: list of {"question": ..., "answer": ...} dicts
+        on_token: if given, the completion is streamed and on_token receives the
+                  question text piece by piece as it is generated
         """
-        history_text = ""
-        for i, turn in enumerate(conversation_history):
-            history_text += f"Q{i+1}: {turn['question']}\nA{i+1}: {turn['answer']}\n\n"
+        payload = followup_payload(original_question, candidate_answer, followup_number, conversation_history)
 
-        payload = {
-            "conversation_so_far": history_text,
-            "last_question": original_question,
-            "candidate_answer": candidate_answer,
-            "followup_number": followup_number,
-            "instruction": "Generate ONE follow-up question based specifically on what the candidate just said."
-        }
+        with llm_priority(Priority.INTERACTIVE, override=False):
+            if on_token is None:
+                return json.loads(await self._chat(FOLLOWUP_SYSTEM, payload))
+
+            streamer = JsonStringFieldStreamer("text")
 
-        resp = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": FOLLOWUP_SYSTEM},
-                {"role": "user", "content": json.dumps(payload)}
-            ],
-            response_format={"type": "json_object"}
-        )
+            def on_delta(delta: str) -> None:
+                text = streamer.feed(delta)
+                if text:
+                    on_token(text)
 
-        return json.loads(resp.choices[0].message.content)
+            return json.loads(await self._chat_stream(FOLLOWUP_SYSTEM, payload, on_delta))
 
+    @llm_method
     async def answer_question(self, question: str, job_title: str, job_description: str, resume: str):
+        context = self.context.job_context(job_title, job_description)
         payload = {
             "question": question,
-            "job_title": job_title,
-            "job_description": job_description,
-            "resume": resume
+            "resume_excerpt": self.context.resume_excerpt(resume, question)
         }
 
-        resp = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": ANSWER_GEN_SYSTEM},
-                {"role": "user", "content": json.dumps(payload)}
-            ]
-        )
-
-        return resp.choices[0].message.content.strip()
+        with llm_priority(Priority.BATCH, override=False):
+            content = await self._chat(ANSWER_GEN_SYSTEM, payload, json_mode=False, context=context)
+        return content.strip()
 
+    @llm_method
     async def evaluate_with_tools(self, question: str, answer: str, job_title: str, job_description: str, resume: str):
+        context = self.context.job_context(job_title, job_description)
         payload = {
             "question": question,
             "answer": answer,
-            "job_title": job_title,
-            "job_description": job_description,
-            "resume": resume
+            "resume_excerpt": self.context.resume_excerpt(resume, question + "\n" + answer)
         }
 
-        resp = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": EVAL_SYSTEM},
-                {"role": "user", "content": json.dumps(payload)}
-            ],
-            response_format={"type": "json_object"}
-        )
+        return await self._chat(EVAL_SYSTEM, payload, cacheable=True, context=context, parse=_evaluation)
+
+    @llm_method
+    async def evaluate_turns_batch(self, turns: list, job_title: str, job_description: str, resume: str):
+        """
+        Evaluate several turns in one request, sending the job description and
+        resume once. turns: list of {"turn": int, "question": ..., "answer": ...}.
+        Returns the parsed JSON as-is; the caller validates it.
+        """
+        context = self.context.full_context(job_title, job_description, resume)
+        payload = {"turns": turns}
 
-        return json.loads(resp.choices[0].message.content)
\ No newline at end of file
+        return await self._chat(EVAL_BATCH_SYSTEM, payload, cacheable=True, context=context, parse=json.loads)
@@ -0,0 +1,270 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+import openai
+
+# Provider limits for the account (0 = unlimited). Prompt tokens are estimated
+# before the call and corrected from the response's usage afterwards.
+LLM_RPM = int(os.getenv("LLM_RPM", "0"))
+LLM_TPM = int(os.getenv("LLM_TPM", "0"))
+LLM_EST_COMPLETION_TOKENS = int(os.getenv("LLM_EST_COMPLETION_TOKENS", "400"))
+
+# 429s, 5xx and connection errors are retried with full-jitter exponential
+# backoff, or after the server's Retry-After when it sends one.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_S = float(os.getenv("LLM_RETRY_BASE_S", "0.5"))
+LLM_RETRY_MAX_S = float(os.getenv("LLM_RETRY_MAX_S", "20"))
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0     # a user is waiting on this call mid-interview
+    DEFAULT = 1         # a user is waiting, but on a bulk result (/finish-interview)
+    BATCH = 2           # nobody is waiting: background evaluation, bulk screening
+
+
+_priority: ContextVar[Optional[Priority]] = ContextVar("llm_priority", default=None)
+
+
+@contextmanager
+def llm_priority(priority: Priority, override: bool = True):
+    """
+    Run LLM calls in this block (and in tasks created from it) at `priority`.
+    With override=False an outer caller's choice wins, which is how each
+    method states its own default without undoing e.g. a batch job's BATCH.
+    """
+    if not override and _priority.get() is not None:
+        yield
+        return
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    priority = _priority.get()
+    return Priority.DEFAULT if priority is None else priority
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token for English prose and JSON; good enough for budgeting."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Holds up to one minute of budget and refills continuously."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.level
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)  # an oversized request waits for a full bucket, not forever
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (or refund, if negative) the difference between estimate and actual usage."""
+        self.level = min(self.capacity, self.level - delta)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+class LLMScheduler:
+    """
+    Single gate in front of the provider. A call waits here until a
+    concurrency slot is free and both the request and token buckets can pay
+    for it; waiters are served strictly by priority, then arrival order, so a
+    burst of background evaluations queues behind interactive follow-ups
+    instead of in front of them. A 429 pauses dispatch for everyone until the
+    provider's Retry-After has passed.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_s: Optional[float] = None,
+        retry_max_s: Optional[float] = None
+    ):
+        rpm = LLM_RPM if rpm is None else rpm
+        tpm = LLM_TPM if tpm is None else tpm
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_s = LLM_RETRY_BASE_S if retry_base_s is None else retry_base_s
+        self.retry_max_s = LLM_RETRY_MAX_S if retry_max_s is None else retry_max_s
+
+        self._waiters: List[tuple] = []     # (priority, seq, tokens, enqueued_at, future)
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.granted: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.rate_limited = 0
+        self._waits: Dict[Priority, Deque[float]] = {p: deque(maxlen=4096) for p in Priority}
+
+    # ── admission ──
+
+    def _delay(self, tokens: int, now: float) -> float:
+        delay = self._paused_until - now
+        if self.requests:
+            delay = max(delay, self.requests.wait_time(1, now))
+        if self.tokens:
+            delay = max(delay, self.tokens.wait_time(tokens, now))
+        return delay
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        while self._waiters and self._in_flight < self.max_concurrency:
+            priority, _, tokens, enqueued_at, future = self._waiters[0]
+            if future.done():  # cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay(tokens, now)
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            self._in_flight += 1
+            self.granted[priority.name.lower()] += 1
+            self._waits[priority].append(now - enqueued_at)
+            future.set_result(None)
+
+    async def _acquire(self, priority: Priority, tokens: int) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), tokens, time.monotonic(), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()  # granted just as we were cancelled
+            raise
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tokens: int, priority: Optional[Priority] = None):
+        await self._acquire(current_priority() if priority is None else priority, tokens)
+        try:
+            yield
+        finally:
+            self._release()
+
+    # ── calls ──
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int, priority: Optional[Priority] = None) -> T:
+        """Run `call` in a slot, retrying transient provider errors with backoff."""
+        priority = current_priority() if priority is None else priority
+        attempt = 0
+        while True:
+            async with self.slot(tokens, priority):
+                try:
+                    return await call()
+                except RETRYABLE_ERRORS as e:
+                    error = e
+
+            attempt += 1
+            if attempt > self.max_retries:
+                raise error
+            delay = retry_after(error)
+            if delay is None:
+                delay = random.uniform(0, min(self.retry_max_s, self.retry_base_s * 2 ** (attempt - 1)))
+            if isinstance(error, openai.RateLimitError):
+                self.rate_limited += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self.retries[priority.name.lower()] += 1
+            await asyncio.sleep(delay)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        if self.tokens:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    # ── metrics ──
+
+    def queue_depth(self) -> Dict[str, int]:
+        depth = Counter(p.name.lower() for p, _, _, _, f in self._waiters if not f.done())
+        return {p.name.lower(): depth[p.name.lower()] for p in Priority}
+
+    def stats(self) -> dict:
+        def summary(waits: Deque[float]) -> dict:
+            if not waits:
+                return {"n": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+            ordered = sorted(waits)
+            pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+            return {
+                "n": len(ordered),
+                "p50_ms": round(pick(0.50) * 1000, 2),
+                "p99_ms": round(pick(0.99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2)
+            }
+
+        now = time.monotonic()
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queue_depth(),
+            "granted": dict(self.granted),
+            "wait": {p.name.lower(): summary(self._waits[p]) for p in Priority},
+            "retries": dict(self.retries),
+            "rate_limited": self.rate_limited,
+            "paused_for_s": round(max(0.0, self._paused_until - now), 3),
+            "rpm_available": round(self.requests.available(now), 1) if self.requests else None,
+            "tpm_available": round(self.tokens.available(now), 1) if self.tokens else None
+        }
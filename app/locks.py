@@ -0,0 +1,18 @@
+import asyncio
+import weakref
+
+# One asyncio.Lock per session that is currently in use. Entries disappear as
+# soon as nobody holds or waits on the lock, so the registry stays small.
+_session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def session_lock(session_id: str) -> asyncio.Lock:
+    """
+    Serialize load → modify → save of one session's state within this process.
+    Usage: `async with session_lock(session_id): ...`
+    """
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[session_id] = lock
+    return lock
@@ -1,25 +1,103 @@
+import asyncio
+import json
 import os
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.responses import FileResponse, PlainTextResponse
+import time
+from typing import List, Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, Form, Header
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 load_dotenv()
 
 from .schemas import (
-    QuestionOut, EvalOut,
+    QuestionOut,
     StartInterviewResponse, SubmitAnswerRequest,
-    NextQuestionResponse, FinishInterviewResponse
+    NextQuestionResponse, PartialAnswerResponse, FinishInterviewResponse,
+    BatchScreenResponse, BatchCandidateResult, BatchJobStatus
 )
 from .storage import (
-    new_session_id, session_dir, report_path,
-    save_conversation_state, load_conversation_state
+    BASE, new_session_id, session_dir, report_path,
+    save_conversation_state, load_conversation_state,
+    load_conversation_state_versioned, compare_and_set_conversation_state,
+    migrate_sessions, SessionConflictError
 )
-from .report import build_report
+from .serialization import get_serializer
+from .report import REPORT_FORMATS, ReportCache, build_report, etag_matches, iter_report, iter_report_sections, report_etag
+from .evaluation import BOOT_ID, EvaluationWorkerPool, eval_record, stored_evaluations, tier_stats
+from .locks import session_lock
 from .llm_questions import OpenAIToolCallingLLM
-from pypdf import PdfReader
-import io
+from .resume_parser import ResumeParser
+from .batch import BATCH_MAX_RESUMES, BatchScreeningRunner, load_job
+from .question_bank import build_question_set, default_question_bank
+from .speculation import SPECULATIVE_FOLLOWUP_ENABLED, FollowupSpeculator
+from .lifecycle import SESSION_LIFECYCLE_ENABLED, SessionLifecycleManager
+from .analytics import default_analytics_index
+from .metrics import (
+    METRICS_ENABLED, REGISTRY, REPORT_REQUESTS, SESSIONS, STAGE_SECONDS, STORAGE_SECONDS,
+    MetricsMiddleware, monitor_event_loop_lag, timer
+)
+from .tracing import TRACING_ENABLED, TracingMiddleware, get_exporter, span
+from .profiling import PROFILE_MAX_SECONDS, ProfilerBusyError, check_admin_token, profile, render_collapsed
+
+llm = OpenAIToolCallingLLM()
+eval_pool = EvaluationWorkerPool(llm)
+resume_parser = ResumeParser()
+question_bank = default_question_bank()
+speculator = FollowupSpeculator(llm)
+lifecycle = SessionLifecycleManager()
+report_cache = ReportCache()
+analytics = default_analytics_index()
+batch_runner = BatchScreeningRunner(
+    llm, resume_parser, scorer=eval_pool.scorer, question_bank=question_bank, analytics=analytics
+)
 
-app = FastAPI(title="Interview Agent - Auto Conversational")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    eval_pool.start()
+    lag_probe = asyncio.create_task(monitor_event_loop_lag()) if METRICS_ENABLED else None
+    if SESSION_LIFECYCLE_ENABLED:
+        lifecycle.start()
+    yield
+    if lag_probe:
+        lag_probe.cancel()
+    await lifecycle.stop()
+    speculator.stop()
+    await batch_runner.stop()
+    await eval_pool.stop()
+    resume_parser.shutdown()
+    await llm.aclose()
+    if TRACING_ENABLED:
+        get_exporter().flush()
+
+
+app = FastAPI(title="Interview Agent - Auto Conversational", lifespan=lifespan)
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.gauge("llm_in_flight", "Completions currently running.", (), lambda: {(): llm.scheduler.stats()["in_flight"]})
+    REGISTRY.gauge(
+        "llm_queued", "Completions waiting for a scheduler slot, by priority.", ("priority",),
+        lambda: {(p,): n for p, n in llm.scheduler.queue_depth().items()}
+    )
+    REGISTRY.gauge("eval_queue_depth", "Turns waiting for a background evaluation worker.", (), lambda: {(): eval_pool.queue.qsize()})
+    REGISTRY.gauge(
+        "speculative_followups_active", "Follow-ups being pre-generated from partial answers.", (),
+        lambda: {(): speculator.stats()["active"]}
+    )
+    REGISTRY.gauge(
+        "session_disk_bytes", "Bytes on disk at the last lifecycle sweep: live sessions, unmanaged directories, archive.",
+        ("kind",),
+        lambda: {} if not lifecycle.last_sweep else {
+            ("live",): lifecycle.last_sweep["live_bytes"],
+            ("unmanaged",): lifecycle.last_sweep["unmanaged_bytes"],
+            ("archive",): lifecycle.archive.stats()["bytes"]
+        }
+    )
+
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,17 +108,233 @@ app.add_middleware(
 )
 
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8080")
-llm = OpenAIToolCallingLLM()
 
 # Only Q1 and Q2 get follow-ups
 QUESTIONS_WITH_FOLLOWUP = {0, 1}
 
+# Compare-and-set attempts per submission when other workers write concurrently,
+# and how long a retry waits on another worker's claim of the same submission.
+SUBMIT_MAX_ATTEMPTS = int(os.getenv("SUBMIT_MAX_ATTEMPTS", "5"))
+SUBMIT_CLAIM_TTL_S = float(os.getenv("SUBMIT_CLAIM_TTL_S", "60"))
+SUBMIT_CLAIM_POLL_S = 0.05
+
+
+def sse(event: str, data) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of the latency, token, cache, storage and session metrics."""
+    if not METRICS_ENABLED:
+        return PlainTextResponse("# metrics disabled (METRICS_ENABLED=0)\n", status_code=404)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/admin/profile")
+async def admin_profile(
+    seconds: float = 10.0,
+    interval_ms: float = 10.0,
+    include_idle: bool = False,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Sample every thread's stack for `seconds` and return the collapsed
+    stacks (`frame;frame;frame count` per line) for flamegraph.pl or
+    speedscope. Requires the ADMIN_TOKEN as the X-Admin-Token header.
+    """
+    allowed = check_admin_token(x_admin_token)
+    if allowed is None:
+        return PlainTextResponse("Profiling disabled (ADMIN_TOKEN is not set)", status_code=404)
+    if not allowed:
+        return PlainTextResponse("Forbidden", status_code=403)
+    if not 0 < seconds <= PROFILE_MAX_SECONDS:
+        raise ValueError(f"seconds must be in (0, {PROFILE_MAX_SECONDS:g}]")
+
+    try:
+        stacks = await profile(seconds, interval_ms, include_idle)
+    except ProfilerBusyError as e:
+        return PlainTextResponse(str(e), status_code=409)
+    return PlainTextResponse(render_collapsed(stacks))
+
 
 @app.get("/health")
 def health():
     return {"ok": True}
 
 
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters of the LLM response cache, overall and per tier."""
+    if not llm.cache:
+        return {"enabled": False}
+    return {"enabled": True, **llm.cache.stats()}
+
+
+@app.get("/llm/stats")
+def llm_stats():
+    """Scheduler queue depth per priority, wait times, retries and rate-limit state; prompt tokens and compaction."""
+    return {
+        **llm.scheduler.stats(),
+        "prompt_tokens": llm.prompt_tokens,
+        "cached_prompt_tokens": llm.cached_prompt_tokens,
+        "context": llm.context.stats()
+    }
+
+
+@app.get("/eval/stats")
+def eval_stats():
+    """Evaluation mode and, when tiered, how many turns each tier decided and how fast."""
+    return {
+        "mode": eval_pool.mode,
+        "tiered": eval_pool.scorer is not None,
+        "tiers": tier_stats.stats(),
+        "embedding": eval_pool.scorer.stats() if eval_pool.scorer else None
+    }
+
+
+@app.get("/question-bank/stats")
+def question_bank_stats():
+    """Roles and questions stored, lookup hit rate and lookup latency."""
+    if not question_bank:
+        return {"enabled": False}
+    return {"enabled": True, **question_bank.stats()}
+
+
+@app.get("/sessions/lifecycle/stats")
+def session_lifecycle_stats():
+    """Expired/archived session totals, the last sweep's disk usage, and archive size."""
+    return lifecycle.stats()
+
+
+@app.post("/admin/sessions/migrate")
+async def admin_sessions_migrate(x_admin_token: Optional[str] = Header(None)):
+    """
+    Re-encode every stored session with the current SESSION_SERIALIZER /
+    SESSION_COMPRESSION (and move resume/JD text into shared blobs) now,
+    instead of on each session's next write.
+    """
+    allowed = check_admin_token(x_admin_token)
+    if allowed is None:
+        return PlainTextResponse("Admin endpoints disabled (ADMIN_TOKEN is not set)", status_code=404)
+    if not allowed:
+        return PlainTextResponse("Forbidden", status_code=403)
+    return {"rewritten": await asyncio.to_thread(migrate_sessions), "encoding": get_serializer().name}
+
+
+@app.get("/reports/stats")
+def report_stats():
+    """Rendered-report cache: entries, bytes and hit rate."""
+    return report_cache.stats()
+
+
+# ─────────────────────────────────────────
+# Cross-session analytics
+# ─────────────────────────────────────────
+
+ANALYTICS_DISABLED = "Analytics disabled (ANALYTICS_ENABLED=0)"
+ANALYTICS_MAX_K = 1000
+
+
+@app.get("/analytics/stats")
+def analytics_stats():
+    """Rows, sessions, jobs and dimensions in the analytics index, and its memory use."""
+    if not analytics:
+        return {"enabled": False}
+    return {"enabled": True, **analytics.stats()}
+
+
+@app.get("/analytics/jobs")
+def analytics_jobs():
+    """Job titles with evaluated candidates, most candidates first."""
+    if not analytics:
+        return PlainTextResponse(ANALYTICS_DISABLED, status_code=404)
+    return analytics.jobs()
+
+
+@app.get("/analytics/top-candidates")
+def analytics_top_candidates(
+    job_title: str,
+    k: int = 10,
+    dimension: Optional[str] = None,
+    min_answers: int = 1,
+    source: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None
+):
+    """
+    The k best candidates for a job by average relevancy score, over all
+    answers or, with `dimension`, that dimension's; each with their
+    per-dimension averages. since/until filter on finish time (unix).
+    """
+    if not analytics:
+        return PlainTextResponse(ANALYTICS_DISABLED, status_code=404)
+    if not 1 <= k <= ANALYTICS_MAX_K:
+        return PlainTextResponse(f"k must be between 1 and {ANALYTICS_MAX_K}", status_code=400)
+    result = analytics.top_candidates(job_title, k, dimension, min_answers, source, since, until)
+    for candidate in result["top"]:
+        candidate["report_url"] = f"{BASE_URL}/report/{candidate['session_id']}"
+    return result
+
+
+@app.get("/analytics/score-distribution")
+def analytics_score_distribution(
+    job_title: Optional[str] = None,
+    dimension: Optional[str] = None,
+    per: str = "answer",
+    bins: int = 10,
+    source: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None
+):
+    """Histogram and percentiles of scores per answer, or per candidate average (per=candidate)."""
+    if not analytics:
+        return PlainTextResponse(ANALYTICS_DISABLED, status_code=404)
+    if per not in ("answer", "candidate") or not 1 <= bins <= 100:
+        return PlainTextResponse("per must be answer or candidate, bins between 1 and 100", status_code=400)
+    return analytics.score_distribution(job_title, dimension, per, bins, source, since, until)
+
+
+@app.get("/analytics/question-difficulty")
+def analytics_question_difficulty(
+    job_title: Optional[str] = None,
+    dimension: Optional[str] = None,
+    min_answers: int = 5,
+    limit: int = 20,
+    followups: bool = False,
+    source: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None
+):
+    """Main questions from hardest to easiest by mean answer score, with spread and share scoring under 50."""
+    if not analytics:
+        return PlainTextResponse(ANALYTICS_DISABLED, status_code=404)
+    return analytics.question_difficulty(job_title, dimension, min_answers, limit, followups, source, since, until)
+
+
+@app.post("/admin/analytics/backfill")
+async def admin_analytics_backfill(x_admin_token: Optional[str] = Header(None)):
+    """Record every finished session still in the session store (e.g. ones finished before analytics existed)."""
+    allowed = check_admin_token(x_admin_token)
+    if allowed is None:
+        return PlainTextResponse("Admin endpoints disabled (ADMIN_TOKEN is not set)", status_code=404)
+    if not allowed:
+        return PlainTextResponse("Forbidden", status_code=403)
+    if not analytics:
+        return PlainTextResponse(ANALYTICS_DISABLED, status_code=404)
+    return {"recorded": await asyncio.to_thread(analytics.backfill)}
+
+
+@app.get("/speculation/stats")
+def speculation_stats():
+    """Speculative follow-ups: hit rate, restarts and tokens spent on discarded speculations."""
+    return speculator.stats()
+
+
 @app.post("/start-interview", response_model=StartInterviewResponse)
 async def start_interview(
     job_title: str = Form(...),
@@ -56,29 +350,38 @@ async def start_interview(
     session_id = new_session_id()
     session_dir(session_id)
 
-    # Extract resume
-    pdf_bytes = await resume_file.read()
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    resume_text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    # Extract resume (off the event loop, cached by content hash)
+    if resume_file.size is not None and resume_file.size > resume_parser.max_bytes:
+        raise ValueError(f"Resume PDF is {resume_file.size} bytes; the limit is {resume_parser.max_bytes}")
+    with span("pdf_read") as s:
+        pdf_bytes = await resume_file.read(resume_parser.max_bytes + 1)
+        s.set(bytes=len(pdf_bytes))
+    with span("resume_extract"):
+        resume_text = await resume_parser.extract(pdf_bytes)
 
     if not resume_text.strip():
         raise ValueError("Resume PDF contains no readable text")
 
-    # Generate all 10 questions
-    qs = await llm.generate_role_specific_questions(job_title, job_description, resume_text)
-    main_questions = [{"id": q["id"], "text": q["text"].strip()} for q in qs[:10]]
+    # Get all 10 questions: reused from a similar role in the bank, or generated
+    with span("question_set") as s:
+        main_questions, question_source = await build_question_set(llm, question_bank, job_title, job_description, resume_text)
+        s.set(source=question_source, questions=len(main_questions))
 
     # Save state
-    save_conversation_state(session_id, {
-        "job_title": job_title,
-        "job_description": job_description,
-        "resume_text": resume_text,
-        "main_questions": main_questions,
-        "current_main_index": 0,
-        "awaiting_followup": False,
-        "followup_counter": 0,
-        "conversation_history": []
-    })
+    with span("save_state", session_id=session_id):
+        save_conversation_state(session_id, {
+            "job_title": job_title,
+            "job_description": job_description,
+            "resume_text": resume_text,
+            "main_questions": main_questions,
+            "question_source": question_source,
+            "current_main_index": 0,
+            "awaiting_followup": False,
+            "followup_counter": 0,
+            "conversation_history": [],
+            "evaluations": {}
+        })
+    SESSIONS.inc(("started",))
 
     first_q = main_questions[0]
     
@@ -92,7 +395,7 @@ async def start_interview(
 
 
 @app.post("/submit-answer", response_model=NextQuestionResponse)
-async def submit_answer(request: SubmitAnswerRequest):
+async def submit_answer(request: SubmitAnswerRequest, idempotency_key: Optional[str] = Header(None)):
     """
     Submit answer → Get next question
     
@@ -102,11 +405,179 @@ async def submit_answer(request: SubmitAnswerRequest):
     - Answer Q2 → get follow-up on Q2
     - Answer follow-up → get Q3
     - Answer Q3-Q10 → get next question (no follow-ups)
+
+    Retries are safe: send the same Idempotency-Key header and the original
+    response comes back. Without the header every request is a new answer.
     """
+    return await _submit_answer(request, idempotency_key)
+
+
+@app.post("/submit-answer/partial", response_model=PartialAnswerResponse)
+async def submit_answer_partial(request: SubmitAnswerRequest):
+    """
+    Optional: post the answer-so-far while the candidate is still typing or
+    speaking (as often as every few words). For Q1 and Q2 the follow-up is
+    generated from it in the background, so the final /submit-answer can
+    return it at once if the final answer is close enough; otherwise it is
+    regenerated as usual.
+    """
+    if not SPECULATIVE_FOLLOWUP_ENABLED:
+        return PartialAnswerResponse(session_id=request.session_id, speculating=False, message="Speculation is disabled.")
+
     state = load_conversation_state(request.session_id)
     if not state:
         raise ValueError(f"Session {request.session_id} not found")
 
+    current_idx = state["current_main_index"]
+    main_question = state["main_questions"][current_idx]
+    if state["awaiting_followup"] or current_idx not in QUESTIONS_WITH_FOLLOWUP or main_question["id"] != request.question_id:
+        return PartialAnswerResponse(
+            session_id=request.session_id, speculating=False, message="No follow-up comes after this question."
+        )
+
+    speculating = speculator.offer(
+        request.session_id,
+        request.question_id,
+        state["followup_counter"] + 1,
+        main_question["text"],
+        request.answer,
+        state["conversation_history"]
+    )
+    return PartialAnswerResponse(
+        session_id=request.session_id,
+        speculating=speculating,
+        message="Follow-up is being prepared." if speculating else "Keep going."
+    )
+
+
+@app.post("/submit-answer/stream")
+async def submit_answer_stream(request: SubmitAnswerRequest, idempotency_key: Optional[str] = Header(None)):
+    """
+    Same as /submit-answer, as Server-Sent Events:
+    - "token":    {"text": ...} pieces of the follow-up question as the LLM writes it
+    - "reset":    {} another writer got there first; discard tokens, they start over
+    - "question": the final NextQuestionResponse
+    - "error":    {"detail": ...} if the submission failed
+    """
+    tokens: asyncio.Queue = asyncio.Queue()
+    RESET = object()
+
+    async def events():
+        # Not cancelled on client disconnect: the answer still gets saved.
+        task = asyncio.create_task(_submit_answer(
+            request, idempotency_key, on_token=tokens.put_nowait, on_retry=lambda: tokens.put_nowait(RESET)
+        ))
+        task.add_done_callback(lambda _: tokens.put_nowait(None))
+        while (text := await tokens.get()) is not None:
+            yield sse("reset", {}) if text is RESET else sse("token", {"text": text})
+        try:
+            yield sse("question", task.result().model_dump())
+        except Exception as e:
+            yield sse("error", {"detail": f"{type(e).__name__}: {e}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _submit_answer(
+    request: SubmitAnswerRequest,
+    idempotency_key: Optional[str] = None,
+    on_token=None,
+    on_retry=None
+) -> NextQuestionResponse:
+    """
+    Apply one answer exactly once.
+
+    - Within this process the session lock serializes submissions.
+    - Across workers the state is written with compare-and-set. Before the
+      LLM call the submission is claimed in the state, so a retry that lands
+      on another worker waits for the first one instead of paying for its own
+      follow-up. A CAS lost to an unrelated write (e.g. an evaluation result)
+      re-applies the transition with the follow-up already generated.
+    - A submission whose key is already in the history (a client retry) gets
+      the stored response back without another LLM call.
+
+    Only submissions with an Idempotency-Key are deduplicated; without one
+    the same text for a repeated question id (e.g. "I don't know" to a
+    reused follow-up id) is a genuine new answer.
+    """
+    key = idempotency_key
+    followups: dict = {}
+    streamed = False
+
+    def emit(text: str) -> None:
+        nonlocal streamed
+        streamed = True
+        on_token(text)
+
+    async with session_lock(request.session_id):
+        attempts = 0
+        deadline = time.monotonic() + SUBMIT_CLAIM_TTL_S
+        while attempts < SUBMIT_MAX_ATTEMPTS:
+            with span("load_state", session_id=request.session_id):
+                state, version = load_conversation_state_versioned(request.session_id)
+            if not state:
+                raise ValueError(f"Session {request.session_id} not found")
+
+            previous = key and next(
+                (t for t in reversed(state["conversation_history"]) if t.get("idempotency_key") == key),
+                None
+            )
+            if previous and previous.get("response"):
+                return NextQuestionResponse(**previous["response"])
+
+            claim = state.get("submission_claim")
+            if (
+                key and claim and claim["key"] == key and claim["owner"] != BOOT_ID
+                and time.time() - claim["at"] < SUBMIT_CLAIM_TTL_S and time.monotonic() < deadline
+            ):
+                # Another worker is already handling this exact submission
+                await asyncio.sleep(SUBMIT_CLAIM_POLL_S)
+                continue
+
+            attempts += 1
+            if key and (not claim or claim["key"] != key or claim["owner"] != BOOT_ID):
+                state["submission_claim"] = {"key": key, "owner": BOOT_ID, "at": time.time()}
+                with span("claim_submission", session_id=request.session_id):
+                    claimed = compare_and_set_conversation_state(request.session_id, state, version)
+                if not claimed:
+                    continue
+                version += 1
+
+            if streamed and on_retry:
+                on_retry()
+                streamed = False
+            response = await _advance_interview(request, state, emit if on_token else None, followups)
+
+            # Keep the response with the turn so a retry can be answered from it
+            if key:
+                turn = state["conversation_history"][-1]
+                state["conversation_history"][-1] = {**turn, "idempotency_key": key, "response": response.model_dump()}
+                state.pop("submission_claim", None)
+
+            with span("save_state", session_id=request.session_id, attempt=attempts) as s:
+                saved = compare_and_set_conversation_state(request.session_id, state, version)
+                s.set(saved=saved)
+            if saved:
+                turn_index = len(state["conversation_history"]) - 1
+                eval_pool.enqueue_orphans(request.session_id, state)
+                eval_pool.enqueue(request.session_id, turn_index)
+                return response
+
+    raise SessionConflictError(
+        f"Session {request.session_id} kept changing; gave up after {SUBMIT_MAX_ATTEMPTS} attempts"
+    )
+
+
+async def _advance_interview(
+    request: SubmitAnswerRequest,
+    state: dict,
+    on_token=None,
+    followups: Optional[dict] = None
+) -> NextQuestionResponse:
+    """
+    Record the answer in `state` and move the interview forward. The caller saves.
+    followups memoizes generated follow-ups across CAS retries of one submission.
+    """
     job_title = state["job_title"]
     job_description = state["job_description"]
     resume_text = state["resume_text"]
@@ -125,6 +596,10 @@ async def submit_answer(request: SubmitAnswerRequest):
         "is_followup": awaiting_followup
     })
 
+    # Evaluated in the background (enqueued once saved) while the interview continues
+    turn_index = len(state["conversation_history"]) - 1
+    state.setdefault("evaluations", {})[str(turn_index)] = eval_record("pending")
+
     # ── CASE 1: Just answered a follow-up OR a question that doesn't get follow-up (Q3+) ──
     # → Move to next main question
     if awaiting_followup or current_idx not in QUESTIONS_WITH_FOLLOWUP:
@@ -133,7 +608,6 @@ async def submit_answer(request: SubmitAnswerRequest):
         if next_idx >= len(main_questions):
             # All done!
             state["awaiting_followup"] = False
-            save_conversation_state(request.session_id, state)
 
             return NextQuestionResponse(
                 session_id=request.session_id,
@@ -148,7 +622,6 @@ async def submit_answer(request: SubmitAnswerRequest):
         # Move to next main question
         state["current_main_index"] = next_idx
         state["awaiting_followup"] = False
-        save_conversation_state(request.session_id, state)
 
         next_q = main_questions[next_idx]
         return NextQuestionResponse(
@@ -166,15 +639,27 @@ async def submit_answer(request: SubmitAnswerRequest):
     state["followup_counter"] += 1
     followup_number = state["followup_counter"]
 
-    followup_q = await llm.generate_followup_question(
-        original_question=main_questions[current_idx]["text"],
-        candidate_answer=request.answer,
-        followup_number=followup_number,
-        conversation_history=state["conversation_history"]
-    )
+    followups = {} if followups is None else followups
+    memo_key = (current_idx, followup_number)
+    if memo_key not in followups:
+        # Pre-generated from a partial answer (/submit-answer/partial), if close enough
+        with span("followup_llm", followup_number=followup_number) as s:
+            followup = None
+            if SPECULATIVE_FOLLOWUP_ENABLED:
+                followup = await speculator.take(
+                    request.session_id, request.question_id, followup_number, request.answer, on_token
+                )
+            s.set(speculative=followup is not None)
+            followups[memo_key] = followup or await llm.generate_followup_question(
+                original_question=main_questions[current_idx]["text"],
+                candidate_answer=request.answer,
+                followup_number=followup_number,
+                conversation_history=state["conversation_history"],
+                on_token=on_token
+            )
+    followup_q = followups[memo_key]
 
     state["awaiting_followup"] = True
-    save_conversation_state(request.session_id, state)
 
     return NextQuestionResponse(
         session_id=request.session_id,
@@ -193,46 +678,33 @@ async def finish_interview(session_id: str = Form(...)):
     Get final evaluation and report.
     Just pass session_id.
     """
-    state = load_conversation_state(session_id)
+    with span("load_state", session_id=session_id):
+        state = load_conversation_state(session_id)
     if not state:
         raise ValueError(f"Session {session_id} not found")
 
     job_title = state["job_title"]
-    job_description = state["job_description"]
-    resume_text = state["resume_text"]
     conversation_history = state["conversation_history"]
 
-    evaluations_out = []
-    questions_out = []
-
-    for turn in conversation_history:
-        q = QuestionOut(id=turn["question_id"], text=turn["question"])
-        questions_out.append(q)
-
-        score_obj = await llm.evaluate_with_tools(
-            turn["question"],
-            turn["answer"],
-            job_title,
-            job_description,
-            resume_text
+    questions_out = [
+        QuestionOut(id=turn["question_id"], text=turn["question"])
+        for turn in conversation_history
+    ]
+    with timer(STAGE_SECONDS, "evaluate"), span("evaluate", turns=len(conversation_history)):
+        evaluations_out = await eval_pool.collect(session_id, state)
+
+    with span("report_build"):
+        report_text = build_report(
+            job_title=job_title,
+            questions=questions_out,
+            evaluations=evaluations_out
         )
-
-        evaluations_out.append(EvalOut(
-            question_id=turn["question_id"],
-            response_text=turn["answer"],
-            relevancy_score=int(score_obj["relevancy_score"]),
-            strengths=score_obj.get("strengths", []),
-            weaknesses=score_obj.get("weaknesses", []),
-            improvement_tips=score_obj.get("improvement_tips", []),
-            justification=score_obj.get("justification", "")
-        ))
-
-    report_text = build_report(
-        job_title=job_title,
-        questions=questions_out,
-        evaluations=evaluations_out
-    )
-    report_path(session_id).write_text(report_text, encoding="utf-8")
+    with timer(STORAGE_SECONDS, "write_report"), span("report_write", bytes=len(report_text)):
+        report_path(session_id).write_text(report_text, encoding="utf-8")
+    if analytics:
+        with span("analytics_record"):
+            await asyncio.to_thread(analytics.record_session, session_id, state, evaluations_out)
+    SESSIONS.inc(("finished",))
 
     return FinishInterviewResponse(
         session_id=session_id,
@@ -243,9 +715,152 @@ async def finish_interview(session_id: str = Form(...)):
     )
 
 
+@app.post("/finish-interview/stream")
+async def finish_interview_stream(session_id: str = Form(...)):
+    """
+    Same as /finish-interview, as Server-Sent Events:
+    - "started":        {"session_id": ..., "total_turns": ...} sent immediately
+    - "evaluation":     {"turn_index": ..., **EvalOut} as soon as each one is ready
+    - "report_section": {"text": ...} header, one per question, then the summary
+    - "done":           {"session_id": ..., "report_url": ...}
+    """
+    state = load_conversation_state(session_id)
+    if not state:
+        raise ValueError(f"Session {session_id} not found")
+
+    conversation_history = state["conversation_history"]
+    questions_out = [
+        QuestionOut(id=turn["question_id"], text=turn["question"])
+        for turn in conversation_history
+    ]
+
+    async def events():
+        yield sse("started", {"session_id": session_id, "total_turns": len(conversation_history)})
+        evaluations_out = [None] * len(conversation_history)
+        async for turn_index, evaluation in eval_pool.iter_collect(session_id, state):
+            evaluations_out[turn_index] = evaluation
+            yield sse("evaluation", {"turn_index": turn_index, **evaluation.model_dump()})
+
+        sections = []
+        for section in iter_report_sections(state["job_title"], questions_out, evaluations_out):
+            sections.append(section)
+            yield sse("report_section", {"text": section})
+        with timer(STORAGE_SECONDS, "write_report"), span("report_write"):
+            report_path(session_id).write_text("\n".join(sections), encoding="utf-8")
+        if analytics:
+            with span("analytics_record"):
+                await asyncio.to_thread(analytics.record_session, session_id, state, evaluations_out)
+        SESSIONS.inc(("finished",))
+
+        yield sse("done", {"session_id": session_id, "report_url": f"{BASE_URL}/report/{session_id}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.post("/batch/screen", response_model=BatchScreenResponse)
+async def batch_screen(
+    job_title: str = Form(...),
+    job_description: str = Form(...),
+    resume_files: List[UploadFile] = File(...)
+):
+    """
+    BULK SCREENING:
+    Upload many resumes for one job → get a job id immediately.
+    Each candidate gets a simulated interview (questions, LLM-generated
+    answers, evaluation, report) in the background; poll GET /batch/{job_id}.
+    """
+    if len(resume_files) > BATCH_MAX_RESUMES:
+        raise ValueError(f"{len(resume_files)} resumes uploaded; the limit is {BATCH_MAX_RESUMES}")
+
+    resumes = []
+    for f in resume_files:
+        if f.size is not None and f.size > resume_parser.max_bytes:
+            raise ValueError(f"{f.filename} is {f.size} bytes; the limit is {resume_parser.max_bytes}")
+        resumes.append((f.filename or f"resume-{len(resumes)}.pdf", await f.read(resume_parser.max_bytes + 1)))
+
+    job_id = batch_runner.submit(job_title, job_description, resumes)
+    return BatchScreenResponse(
+        job_id=job_id,
+        total_candidates=len(resumes),
+        status_url=f"{BASE_URL}/batch/{job_id}",
+        message=f"Screening {len(resumes)} candidates."
+    )
+
+
+@app.get("/batch/{job_id}", response_model=BatchJobStatus)
+def batch_status(job_id: str, offset: int = 0):
+    """Progress of a batch job. Results are in completion order; pass offset to get only new ones."""
+    meta, results = load_job(job_id)
+    if not meta:
+        raise ValueError(f"Batch job {job_id} not found")
+
+    total = len(meta["candidates"])
+    return BatchJobStatus(
+        job_id=job_id,
+        job_title=meta["job_title"],
+        status=batch_runner.job_status(job_id, meta, results),
+        total_candidates=total,
+        completed=sum(1 for r in results if r["status"] == "done"),
+        failed=sum(1 for r in results if r["status"] == "failed"),
+        results=[
+            BatchCandidateResult(
+                **r,
+                report_url=f"{BASE_URL}/report/{r['session_id']}" if r.get("session_id") else None
+            )
+            for r in results[offset:]
+        ]
+    )
+
+
 @app.get("/report/{session_id}")
-def get_report(session_id: str):
-    path = report_path(session_id)
-    if not path.exists():
+def get_report(session_id: str, format: str = "text", if_none_match: Optional[str] = Header(None)):
+    """
+    The report of a finished interview as text, markdown, html or json,
+    rendered from the stored evaluation records (never re-evaluated) and
+    streamed. The ETag is a hash of those records: send it back as
+    If-None-Match to get a 304 until something in the report changes.
+    """
+    if format not in REPORT_FORMATS:
+        return PlainTextResponse(f"Unknown report format {format!r} (expected {', '.join(REPORT_FORMATS)})", status_code=400)
+    _, _, media_type, extension = REPORT_FORMATS[format]
+
+    path = BASE / session_id / "report.txt"
+    if path.exists():
+        state, written = load_conversation_state(session_id), None
+    else:
+        # Finished sessions are moved to the archive after SESSION_ARCHIVE_AFTER_S
+        archived = lifecycle.archived_session(session_id)
+        if archived is None:
+            return PlainTextResponse("Not found", status_code=404)
+        state, written = archived.get("state"), archived.get("report")
+
+    evaluations = stored_evaluations(state) if state else [None]
+    if None in evaluations and format == "text":
+        # Finished before every evaluation was recorded in the session: the written report is all there is
+        REPORT_REQUESTS.inc((format, "stored_file"))
+        if written is not None:
+            return PlainTextResponse(written, headers={"Content-Disposition": 'attachment; filename="report.txt"'})
+        return FileResponse(str(path), media_type="text/plain", filename="report.txt")
+    if not state:
         return PlainTextResponse("Not found", status_code=404)
-    return FileResponse(str(path), media_type="text/plain", filename="report.txt")
\ No newline at end of file
+
+    questions = [QuestionOut(id=turn["question_id"], text=turn["question"]) for turn in state["conversation_history"]]
+    etag = report_etag(format, state["job_title"], questions, evaluations)
+    disposition = "attachment" if format == "text" else "inline"
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'{disposition}; filename="report.{extension}"'
+    }
+    if etag_matches(if_none_match, etag):
+        REPORT_REQUESTS.inc((format, "not_modified"))
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    body = report_cache.get(etag)
+    if body is not None:
+        REPORT_REQUESTS.inc((format, "cache_hit"))
+        return Response(body, media_type=media_type, headers=headers)
+
+    REPORT_REQUESTS.inc((format, "rendered"))
+    chunks = iter_report(format, state["job_title"], questions, evaluations)
+    return StreamingResponse(report_cache.stream(etag, chunks), media_type=media_type, headers=headers)
\ No newline at end of file
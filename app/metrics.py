@@ -0,0 +1,314 @@
+import asyncio
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Sequence
+
+# Prometheus text-format metrics at /metrics. With METRICS_ENABLED=0 the
+# decorators return the function unchanged, the middleware is not installed
+# and timers are a shared no-op context manager.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+# How often the event-loop lag probe wakes up; each wake-up records how late it ran.
+EVENT_LOOP_LAG_INTERVAL_S = float(os.getenv("EVENT_LOOP_LAG_INTERVAL_S", "0.05"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+_NOOP = nullcontext()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> Iterable[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    """Fixed buckets; an observation increments one bucket, cumulative counts are built at render time."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}    # labels -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def count(self, labels: tuple = ()) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> Iterable[str]:
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="%s"' % _number(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge:
+    """Read at scrape time from a callback returning {label values: value}."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], collect: Callable[[], Dict[tuple, float]]):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> Iterable[str]:
+        for labels, value in sorted(self.collect().items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str], collect: Callable[[], Dict[tuple, float]]) -> Gauge:
+        """Registers (or replaces) a callback gauge; the app wires these up once its components exist."""
+        self._metrics.pop(name, None)
+        return self._add(Gauge(name, help, labelnames, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                samples = list(metric.render())
+            except Exception as e:  # a broken gauge callback must not take /metrics down
+                lines.append(f"# {metric.name} unavailable: {type(e).__name__}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency by route template, method and status.", ("route", "method", "status")
+)
+LLM_SECONDS = REGISTRY.histogram("llm_call_duration_seconds", "OpenAIToolCallingLLM method latency.", ("method",))
+LLM_ERRORS = REGISTRY.counter("llm_call_errors_total", "OpenAIToolCallingLLM method failures by error type.", ("method", "error"))
+LLM_PROMPT_TOKENS = REGISTRY.histogram(
+    "llm_prompt_tokens", "Prompt tokens per completion, from the provider's usage.", ("method",), TOKEN_BUCKETS
+)
+LLM_CACHED_PROMPT_TOKENS = REGISTRY.counter(
+    "llm_cached_prompt_tokens_total", "Prompt tokens served from the provider's prefix cache.", ("method",)
+)
+LLM_COMPLETION_TOKENS = REGISTRY.histogram(
+    "llm_completion_tokens", "Completion tokens per completion, from the provider's usage.", ("method",), TOKEN_BUCKETS
+)
+LLM_CACHE = REGISTRY.counter("llm_response_cache_total", "LLM response cache lookups by result.", ("method", "result"))
+STORAGE_SECONDS = REGISTRY.histogram("storage_operation_duration_seconds", "Session store and report file I/O.", ("op",))
+STAGE_SECONDS = REGISTRY.histogram(
+    "stage_duration_seconds", "Pipeline stages: resume parsing, question set, evaluation, report build.", ("stage",)
+)
+REPORT_REQUESTS = REGISTRY.counter(
+    "report_requests_total", "GET /report by format and result (not_modified, cache_hit, rendered, stored_file).", ("format", "result")
+)
+SESSIONS = REGISTRY.counter("interview_sessions_total", "Interview sessions by event (started, finished).", ("event",))
+SESSION_LIFECYCLE = REGISTRY.counter(
+    "session_lifecycle_total", "Sessions (and blobs) removed from the live store by the lifecycle manager, by event.", ("event",)
+)
+SESSION_BYTES_RECLAIMED = REGISTRY.counter(
+    "session_reclaimed_bytes_total", "Bytes freed by the lifecycle manager: expiry, archival, unreferenced blobs.", ("event",)
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a periodic timer: time blocked by sync work.", (), LAG_BUCKETS
+)
+
+_llm_method: ContextVar[str] = ContextVar("llm_method", default="other")
+
+
+def current_llm_method() -> str:
+    return _llm_method.get()
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "t0")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.t0, self.labels)
+
+
+def timer(histogram: Histogram, *labels: str):
+    """`with timer(STAGE_SECONDS, "build_report"): ...`"""
+    return _Timer(histogram, labels) if METRICS_ENABLED else _NOOP
+
+
+def timed(histogram: Histogram, *labels: str):
+    """Decorator form of timer() for sync or async functions."""
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - t0, labels)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - t0, labels)
+        return wrapper
+    return decorate
+
+
+def llm_method(fn):
+    """
+    Time an async OpenAIToolCallingLLM method, count its failures, and label
+    the token and cache metrics recorded by the calls it makes.
+    """
+    if not METRICS_ENABLED:
+        return fn
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = _llm_method.set(name)
+        t0 = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            LLM_ERRORS.inc((name, type(e).__name__))
+            raise
+        finally:
+            LLM_SECONDS.observe(time.perf_counter() - t0, (name,))
+            _llm_method.reset(token)
+    return wrapper
+
+
+def record_llm_usage(usage) -> None:
+    if not METRICS_ENABLED or usage is None:
+        return
+    labels = (_llm_method.get(),)
+    LLM_PROMPT_TOKENS.observe(usage.prompt_tokens or 0, labels)
+    LLM_COMPLETION_TOKENS.observe(usage.completion_tokens or 0, labels)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+    if cached:
+        LLM_CACHED_PROMPT_TOKENS.inc(labels, cached)
+
+
+def record_llm_cache(hit: bool) -> None:
+    if METRICS_ENABLED:
+        LLM_CACHE.inc((_llm_method.get(), "hit" if hit else "miss"))
+
+
+async def monitor_event_loop_lag(interval_s: float = EVENT_LOOP_LAG_INTERVAL_S) -> None:
+    """Run as a task for the app's lifetime; anything that blocks the loop shows up as lag."""
+    while True:
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval_s)
+        EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - t0 - interval_s))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing each request until its response is fully
+    sent (so streaming endpoints include the stream), labelled by route
+    template rather than raw path to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_SECONDS.observe(time.perf_counter() - t0, (path, scope["method"], status))
@@ -0,0 +1,114 @@
+import asyncio
+import hmac
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+# On-demand sampling profiler behind POST /admin/profile. Disabled unless
+# ADMIN_TOKEN is set; callers must send it as the X-Admin-Token header.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_MIN_INTERVAL_MS = 1.0
+
+_profiling = threading.Lock()
+
+# Innermost Python frames of a thread blocked waiting rather than working:
+# the event loop's selector, Condition/Event waits, idle executor workers
+_IDLE_FUNCTIONS = frozenset({"select", "poll", "wait", "_worker", "_wait_for_tstate_lock"})
+
+
+class ProfilerBusyError(RuntimeError):
+    """Another profile is already being taken in this process."""
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename.replace("\\", "/").split("/")
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _collapse(frame, thread_name: str) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(thread_name.replace(";", ":").replace(" ", "_"))
+    return ";".join(reversed(labels))
+
+
+def _record(stacks: Counter, frames: Dict[int, object], include_idle: bool) -> None:
+    names = {t.ident: t.name for t in threading.enumerate()}
+    for ident, frame in frames.items():
+        if not include_idle and frame.f_code.co_name in _IDLE_FUNCTIONS:
+            continue
+        stacks[_collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+
+
+def sample_stacks(seconds: float, interval_ms: float = 10.0, include_idle: bool = False) -> Counter:
+    """
+    Sample every other thread's Python stack for `seconds`, every
+    `interval_ms`, returning {collapsed stack: samples}. Meant to run in a
+    worker thread. Threads that release the GIL often (an event loop
+    polling its selector) are over-sampled at those points, so profile()
+    samples the main thread's event loop with a timer signal instead.
+    """
+    interval = max(interval_ms, PROFILE_MIN_INTERVAL_MS) / 1000
+    me = threading.get_ident()
+    stacks: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frames = sys._current_frames()
+        frames.pop(me, None)
+        _record(stacks, frames, include_idle)
+        time.sleep(interval)
+    return stacks
+
+
+async def profile(seconds: float, interval_ms: float = 10.0, include_idle: bool = False) -> Counter:
+    """
+    Profile the whole process for `seconds` without blocking the event loop.
+    On the main thread (uvicorn's default) a SIGALRM interval timer takes
+    each sample wherever the loop happens to be; elsewhere, or without
+    setitimer, a sampling thread does. Idle stacks (selector, lock and
+    condition waits) are dropped unless include_idle.
+    """
+    if not _profiling.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        if threading.current_thread() is not threading.main_thread() or not hasattr(signal, "setitimer"):
+            return await asyncio.to_thread(sample_stacks, seconds, interval_ms, include_idle)
+
+        stacks: Counter = Counter()
+        main = threading.get_ident()
+
+        def on_alarm(signum, frame):
+            frames = sys._current_frames()
+            frames[main] = frame    # the interrupted frame, not this handler's
+            _record(stacks, frames, include_idle)
+
+        interval = max(interval_ms, PROFILE_MIN_INTERVAL_MS) / 1000
+        previous = signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, interval, interval)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+        return stacks
+    finally:
+        _profiling.release()
+
+
+def render_collapsed(stacks: Dict[str, int]) -> str:
+    """Brendan Gregg's folded format (`a;b;c 42` per line), read by flamegraph.pl, speedscope and inferno."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def check_admin_token(token: Optional[str]) -> Optional[bool]:
+    """None if profiling is disabled, else whether `token` is the admin token."""
+    if not ADMIN_TOKEN:
+        return None
+    return bool(token) and hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
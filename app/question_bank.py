@@ -0,0 +1,255 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import STAGE_SECONDS, timed
+from .skills import get_requirements_extractor
+
+# Generated question sets are kept per role and reused for later postings
+# whose normalized title + JD skills are similar enough.
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "1") != "0"
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "question_bank.sqlite3")  # "" keeps the bank in memory only
+QUESTION_BANK_MIN_SIMILARITY = float(os.getenv("QUESTION_BANK_MIN_SIMILARITY", "0.8"))
+# A shared title is not enough: the JD skill sets must also overlap (Jaccard)
+# by this much, so "Software Engineer" for React/CSS never serves questions
+# stored for a Go/Kafka "Software Engineer"
+QUESTION_BANK_MIN_SKILL_OVERLAP = float(os.getenv("QUESTION_BANK_MIN_SKILL_OVERLAP", "0.4"))
+# Resume-specific questions still generated per candidate on a bank hit, so
+# a reused set (shaped by whichever resume it was first generated for) is
+# mixed with questions about this candidate's own resume (0 = none)
+QUESTION_BANK_RESUME_QUESTIONS = int(os.getenv("QUESTION_BANK_RESUME_QUESTIONS", "3"))
+MAIN_QUESTIONS = 10
+
+TITLE_WEIGHT = 3.0
+SKILL_WEIGHT = 1.0
+SENIORITY_WORDS = {
+    "senior", "sr", "junior", "jr", "lead", "staff", "principal", "head", "chief",
+    "i", "ii", "iii", "iv", "mid", "level", "entry", "associate", "intern"
+}
+TITLE_SYNONYMS = {
+    "eng": "engineer", "engr": "engineer", "engineering": "engineer", "dev": "developer",
+    "ml": "machine learning", "ai": "artificial intelligence", "swe": "software engineer",
+    "sde": "software engineer", "ds": "data scientist", "de": "data engineer", "mle": "machine learning engineer"
+}
+
+
+def normalize_title(job_title: str) -> str:
+    words = []
+    for word in re.findall(r"[a-z0-9+#]+", job_title.lower()):
+        if word in SENIORITY_WORDS:
+            continue
+        words.extend(TITLE_SYNONYMS.get(word, word).split())
+    return " ".join(words)
+
+
+def role_features(job_title: str, job_description: str) -> Dict[str, float]:
+    """Sparse, L2-normalized features: normalized title words (weighted up) and JD skills."""
+    features: Dict[str, float] = {}
+    for word in normalize_title(job_title).split():
+        features[f"t:{word}"] = TITLE_WEIGHT
+    for skill in get_requirements_extractor().extract(job_title, job_description)["skills"]:
+        features[f"s:{skill}"] = SKILL_WEIGHT
+    norm = math.sqrt(sum(w * w for w in features.values())) or 1.0
+    return {f: w / norm for f, w in features.items()}
+
+
+def skill_overlap(a: Dict[str, float], b: Dict[str, float]) -> float:
+    """Jaccard overlap of two roles' JD skills (1.0 when neither lists any)."""
+    skills_a = {f for f in a if f.startswith("s:")}
+    skills_b = {f for f in b if f.startswith("s:")}
+    if not skills_a and not skills_b:
+        return 1.0
+    return len(skills_a & skills_b) / len(skills_a | skills_b)
+
+
+class QuestionBank:
+    """
+    SQLite-backed store of generated questions by role and dimension, with an
+    in-memory inverted index (feature -> roles) over role_features(), so a
+    lookup touches only roles that share a title word or skill.
+    """
+
+    def __init__(
+        self,
+        path: str = QUESTION_BANK_PATH,
+        min_similarity: float = QUESTION_BANK_MIN_SIMILARITY,
+        min_skill_overlap: float = QUESTION_BANK_MIN_SKILL_OVERLAP
+    ):
+        self.min_similarity = min_similarity
+        self.min_skill_overlap = min_skill_overlap
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS qb_roles ("
+            " id INTEGER PRIMARY KEY, title TEXT NOT NULL, title_norm TEXT NOT NULL,"
+            " features TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS qb_questions ("
+            " role_id INTEGER NOT NULL, position INTEGER NOT NULL, dimension TEXT NOT NULL,"
+            " qid TEXT NOT NULL, text TEXT NOT NULL, PRIMARY KEY (role_id, position))"
+        )
+        self._features: Dict[int, Dict[str, float]] = {}
+        self._index: Dict[str, List[int]] = defaultdict(list)
+        self._last_role_id = 0
+        self.lookups = 0
+        self.hits = 0
+        self.stored = 0
+        self.lookup_seconds = 0.0
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Index roles added since the last refresh, including ones written by other workers."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, features FROM qb_roles WHERE id > ? ORDER BY id", (self._last_role_id,)
+            ).fetchall()
+        for role_id, features in rows:
+            self._add_to_index(role_id, json.loads(features))
+
+    def _add_to_index(self, role_id: int, features: Dict[str, float]) -> None:
+        if role_id in self._features:
+            return
+        self._features[role_id] = features
+        for feature in features:
+            self._index[feature].append(role_id)
+        self._last_role_id = max(self._last_role_id, role_id)
+
+    def _best_match(self, features: Dict[str, float]) -> Tuple[Optional[int], float]:
+        """The most similar role that clears both thresholds, or (None, best similarity seen)."""
+        scores: Dict[int, float] = defaultdict(float)
+        for feature, weight in features.items():
+            for role_id in self._index.get(feature, ()):
+                scores[role_id] += weight * self._features[role_id][feature]
+        if not scores:
+            return None, 0.0
+        close = sorted((r for r in scores if scores[r] >= self.min_similarity), key=scores.get, reverse=True)
+        for role_id in close:
+            if skill_overlap(features, self._features[role_id]) >= self.min_skill_overlap:
+                return role_id, scores[role_id]
+        return None, max(scores.values())
+
+    def lookup(self, job_title: str, job_description: str) -> Tuple[Optional[Dict[str, List[dict]]], float]:
+        """Questions by dimension of the most similar stored role, or None below min_similarity."""
+        t0 = time.perf_counter()
+        features = role_features(job_title, job_description)
+        role_id, similarity = self._best_match(features)
+        if role_id is None:
+            self._refresh()
+            role_id, similarity = self._best_match(features)
+
+        questions = None
+        if role_id is not None:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT dimension, qid, text FROM qb_questions WHERE role_id = ? ORDER BY position", (role_id,)
+                ).fetchall()
+            questions = {}
+            for dimension, qid, text in rows:
+                questions.setdefault(dimension, []).append({"id": qid, "text": text})
+
+        self.lookups += 1
+        self.hits += 1 if questions else 0
+        self.lookup_seconds += time.perf_counter() - t0
+        return questions, similarity
+
+    def store(self, job_title: str, job_description: str, by_dimension: Dict[str, List[dict]]) -> int:
+        features = role_features(job_title, job_description)
+        rows = [
+            (dimension, q["id"], q["text"].strip())
+            for dimension, questions in by_dimension.items()
+            for q in questions
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                role_id = self._conn.execute(
+                    "INSERT INTO qb_roles (title, title_norm, features, created_at) VALUES (?, ?, ?, ?)",
+                    (job_title, normalize_title(job_title), json.dumps(features), time.time())
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO qb_questions (role_id, position, dimension, qid, text) VALUES (?, ?, ?, ?, ?)",
+                    [(role_id, i, *row) for i, row in enumerate(rows)]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._add_to_index(role_id, features)
+        self.stored += 1
+        return role_id
+
+    def stats(self) -> dict:
+        with self._lock:
+            roles, questions = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM qb_roles), (SELECT COUNT(*) FROM qb_questions)"
+            ).fetchone()
+        return {
+            "roles": roles,
+            "questions": questions,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.lookups - self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "avg_lookup_ms": round(1000 * self.lookup_seconds / self.lookups, 3) if self.lookups else 0.0,
+            "min_similarity": self.min_similarity,
+            "min_skill_overlap": self.min_skill_overlap
+        }
+
+
+def pick_questions(by_dimension: Dict[str, List[dict]], count: int = MAIN_QUESTIONS) -> List[dict]:
+    """Up to `count` questions in dimension order, each tagged with its dimension; ids made unique."""
+    picked, seen = [], set()
+    for dimension, questions in by_dimension.items():
+        for q in questions:
+            qid = q["id"]
+            n = 2
+            while qid in seen:
+                qid, n = f"{q['id']}_{n}", n + 1
+            seen.add(qid)
+            picked.append({"id": qid, "text": q["text"].strip(), "dimension": q.get("dimension", dimension)})
+            if len(picked) == count:
+                return picked
+    return picked
+
+
+@timed(STAGE_SECONDS, "question_set")
+async def build_question_set(
+    llm,
+    bank: Optional[QuestionBank],
+    job_title: str,
+    job_description: str,
+    resume_text: str,
+    resume_questions: Optional[int] = None
+) -> Tuple[List[dict], str]:
+    """
+    The main questions for an interview and where they came from: "bank"
+    (a similar role's stored set, plus `resume_questions` fresh ones about
+    this resume) or "llm" (generated now, then stored for later postings).
+    """
+    resume_questions = QUESTION_BANK_RESUME_QUESTIONS if resume_questions is None else resume_questions
+    if bank is not None:
+        by_dimension, _ = bank.lookup(job_title, job_description)
+        if by_dimension:
+            extra = []
+            if resume_questions:
+                extra = await llm.generate_resume_questions(job_title, job_description, resume_text, resume_questions)
+            reused = pick_questions(by_dimension, MAIN_QUESTIONS - len(extra))
+            return pick_questions({"bank": reused, "resume": extra}), "bank"
+
+    by_dimension = await llm.generate_questions_by_dimension(job_title, job_description, resume_text)
+    if bank is not None and by_dimension:
+        bank.store(job_title, job_description, by_dimension)
+    return pick_questions(by_dimension), "llm"
+
+
+def default_question_bank() -> Optional[QuestionBank]:
+    return QuestionBank() if QUESTION_BANK_ENABLED else None
@@ -1,6 +1,25 @@
-from typing import List
+import hashlib
+import html
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional
+
+from .metrics import STAGE_SECONDS, timed
 from .schemas import QuestionOut, EvalOut
 
+# Rendered reports kept in memory, keyed by the hash of what they were
+# rendered from (see report_etag), so repeated downloads skip rendering and
+# a changed evaluation can never be served stale.
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "256"))
+# Bump when a renderer's output changes, so cached copies and ETags held by
+# clients are invalidated.
+REPORT_RENDER_VERSION = 1
+
+_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+@timed(STAGE_SECONDS, "build_report")
 def build_report(
     job_title: str,
     questions: List[QuestionOut],
@@ -10,26 +29,39 @@ def build_report(
     Build interview report.
     AI asks questions → Candidate answers → AI evaluates
     """
+    return "\n".join(iter_report_sections(job_title, questions, evaluations))
+
+
+def iter_report_sections(
+    job_title: str,
+    questions: List[QuestionOut],
+    evaluations: List[EvalOut]
+) -> Iterator[str]:
+    """
+    Yield the report one section at a time: header, one block per question,
+    overall summary. Joining the sections with "\\n" gives build_report().
+    """
     
     # Create lookup for evaluations by question ID
-    eval_by_qid = {e.question_id: e for e in evaluations}
+    eval_by_qid = {e.question_id: e for e in evaluations if e is not None}
 
     def bullets(items: List[str]) -> List[str]:
         return [f"  - {x}" for x in items] if items else ["  - (none)"]
     
-    lines = [
+    yield "\n".join([
         "=" * 70,
         "INTERVIEW REPORT",
         "=" * 70,
         f"Role: {job_title}",
         "=" * 70,
         "",
-    ]
+    ])
     
     scores = []
     
     # Loop through each question
     for idx, q in enumerate(questions, 1):
+        lines = []
         lines.append(f"\n{'='*70}")
         lines.append(f"QUESTION {idx}: {q.id.upper()}")
         lines.append(f"{'='*70}")
@@ -41,6 +73,14 @@ def build_report(
         if not evaluation:
             lines.append("\nEvaluation: (not available)")
             lines.append("-" * 70)
+            yield "\n".join(lines)
+            continue
+
+        if evaluation.status == "failed":
+            lines.append(f"\nCandidate Answer:\n{evaluation.response_text}")
+            lines.append(f"\nEvaluation: (failed: {evaluation.error})")
+            lines.append("-" * 70)
+            yield "\n".join(lines)
             continue
 
         # FIXED: This was outside the loop - now it's inside
@@ -50,6 +90,8 @@ def build_report(
         # Add score
         scores.append(evaluation.relevancy_score)
         lines.append(f"\nRelevancy Score: {evaluation.relevancy_score}/100")
+        if evaluation.tier != "llm":
+            lines.append(f"Scored by: {evaluation.tier} pre-screen (no LLM review)")
         
         # Add evaluation details
         lines.append("\nStrengths:")
@@ -64,19 +106,254 @@ def build_report(
         if evaluation.justification:
             lines.append(f"\nJustification:\n{evaluation.justification}")
 
+        yield "\n".join(lines)
+
     # Overall summary
+    summary = report_summary(questions, scores)
+    lines = []
     lines.append("\n" + "=" * 70)
     lines.append("OVERALL SUMMARY")
     lines.append("=" * 70)
     
-    avg = round(sum(scores) / len(scores)) if scores else 0
-    lines.append(f"\nTotal Questions: {len(questions)}")
-    lines.append(f"Average Relevancy Score: {avg}/100")
+    lines.append(f"\nTotal Questions: {summary['total_questions']}")
+    lines.append(f"Average Relevancy Score: {summary['average_score']}/100")
     
     if scores:
-        lines.append(f"Highest Score: {max(scores)}/100")
-        lines.append(f"Lowest Score: {min(scores)}/100")
+        lines.append(f"Highest Score: {summary['highest_score']}/100")
+        lines.append(f"Lowest Score: {summary['lowest_score']}/100")
     
     lines.append("\n" + "=" * 70)
 
-    return "\n".join(lines)
\ No newline at end of file
+    yield "\n".join(lines)
+
+
+def report_summary(questions: List[QuestionOut], scores: List[int]) -> dict:
+    return {
+        "total_questions": len(questions),
+        "scored": len(scores),
+        "average_score": round(sum(scores) / len(scores)) if scores else 0,
+        "highest_score": max(scores) if scores else None,
+        "lowest_score": min(scores) if scores else None
+    }
+
+
+def _paired(questions: List[QuestionOut], evaluations: List[Optional[EvalOut]]):
+    """(number, question, its evaluation or None) in question order, pairing by question id like the text report."""
+    eval_by_qid = {e.question_id: e for e in evaluations if e is not None}
+    for idx, q in enumerate(questions, 1):
+        yield idx, q, eval_by_qid.get(q.id)
+
+
+def _scores(questions: List[QuestionOut], evaluations: List[Optional[EvalOut]]) -> List[int]:
+    return [e.relevancy_score for _, _, e in _paired(questions, evaluations) if e is not None and e.status != "failed"]
+
+
+def iter_markdown_sections(
+    job_title: str,
+    questions: List[QuestionOut],
+    evaluations: List[Optional[EvalOut]]
+) -> Iterator[str]:
+    """The report as Markdown: a title block, one section per question, the summary."""
+
+    def quote(text: str) -> str:
+        return "\n".join(f"> {line}" if line else ">" for line in text.splitlines() or [""])
+
+    def bullets(title: str, items: List[str]) -> str:
+        return f"**{title}**\n\n" + "\n".join(f"- {x}" for x in (items or ["(none)"]))
+
+    yield f"# Interview report\n\n**Role:** {job_title}"
+
+    for idx, q, evaluation in _paired(questions, evaluations):
+        parts = [f"## Question {idx}: {q.id.upper()}", q.text]
+        if evaluation is None:
+            parts.append("*Evaluation: not available*")
+        elif evaluation.status == "failed":
+            parts += ["**Candidate answer**", quote(evaluation.response_text), f"*Evaluation failed: {evaluation.error}*"]
+        else:
+            parts += ["**Candidate answer**", quote(evaluation.response_text), f"**Relevancy score:** {evaluation.relevancy_score}/100"]
+            if evaluation.tier != "llm":
+                parts.append(f"*Scored by: {evaluation.tier} pre-screen (no LLM review)*")
+            parts += [
+                bullets("Strengths", evaluation.strengths),
+                bullets("Weaknesses", evaluation.weaknesses),
+                bullets("Improvement tips", evaluation.improvement_tips)
+            ]
+            if evaluation.justification:
+                parts += ["**Justification**", evaluation.justification]
+        yield "\n\n".join(parts)
+
+    summary = report_summary(questions, _scores(questions, evaluations))
+    lines = [
+        "## Overall summary",
+        "",
+        "| | |",
+        "|---|---|",
+        f"| Total questions | {summary['total_questions']} |",
+        f"| Average relevancy score | {summary['average_score']}/100 |"
+    ]
+    if summary["scored"]:
+        lines.append(f"| Highest score | {summary['highest_score']}/100 |")
+        lines.append(f"| Lowest score | {summary['lowest_score']}/100 |")
+    yield "\n".join(lines) + "\n"
+
+
+def iter_html_sections(
+    job_title: str,
+    questions: List[QuestionOut],
+    evaluations: List[Optional[EvalOut]]
+) -> Iterator[str]:
+    """The report as a standalone HTML page, streamed head first and closed by the summary."""
+    esc = html.escape
+
+    def bullets(title: str, items: List[str]) -> str:
+        return f"<h3>{title}</h3><ul>" + "".join(f"<li>{esc(x)}</li>" for x in (items or ["(none)"])) + "</ul>"
+
+    yield (
+        '<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8">'
+        f"<title>Interview report: {esc(job_title)}</title>"
+        "<style>body{font-family:sans-serif;max-width:50em;margin:auto}"
+        "blockquote{white-space:pre-wrap;border-left:3px solid #ccc;margin:0;padding-left:1em}</style>"
+        f"</head><body>\n<h1>Interview report</h1><p><strong>Role:</strong> {esc(job_title)}</p>"
+    )
+
+    for idx, q, evaluation in _paired(questions, evaluations):
+        parts = [f'<section id="{esc(q.id)}"><h2>Question {idx}: {esc(q.id.upper())}</h2><p>{esc(q.text)}</p>']
+        if evaluation is None:
+            parts.append("<p><em>Evaluation: not available</em></p>")
+        else:
+            parts.append(f"<h3>Candidate answer</h3><blockquote>{esc(evaluation.response_text)}</blockquote>")
+            if evaluation.status == "failed":
+                parts.append(f"<p><em>Evaluation failed: {esc(evaluation.error or '')}</em></p>")
+            else:
+                parts.append(f"<p><strong>Relevancy score:</strong> {evaluation.relevancy_score}/100</p>")
+                if evaluation.tier != "llm":
+                    parts.append(f"<p><em>Scored by: {esc(evaluation.tier)} pre-screen (no LLM review)</em></p>")
+                parts += [
+                    bullets("Strengths", evaluation.strengths),
+                    bullets("Weaknesses", evaluation.weaknesses),
+                    bullets("Improvement tips", evaluation.improvement_tips)
+                ]
+                if evaluation.justification:
+                    parts.append(f"<h3>Justification</h3><p>{esc(evaluation.justification)}</p>")
+        parts.append("</section>")
+        yield "".join(parts)
+
+    summary = report_summary(questions, _scores(questions, evaluations))
+    rows = [("Total questions", summary["total_questions"]), ("Average relevancy score", f"{summary['average_score']}/100")]
+    if summary["scored"]:
+        rows += [("Highest score", f"{summary['highest_score']}/100"), ("Lowest score", f"{summary['lowest_score']}/100")]
+    yield (
+        "<section><h2>Overall summary</h2><table>"
+        + "".join(f"<tr><th>{k}</th><td>{v}</td></tr>" for k, v in rows)
+        + "</table></section>\n</body></html>\n"
+    )
+
+
+def iter_json_sections(
+    job_title: str,
+    questions: List[QuestionOut],
+    evaluations: List[Optional[EvalOut]]
+) -> Iterator[str]:
+    """The report as one JSON document, streamed one question at a time."""
+    yield '{"job_title":' + _encode(job_title) + ',"questions":['
+    for idx, q, evaluation in _paired(questions, evaluations):
+        item = {"number": idx, "id": q.id, "text": q.text, "evaluation": evaluation.model_dump() if evaluation else None}
+        yield ("," if idx > 1 else "") + _encode(item)
+    summary = report_summary(questions, _scores(questions, evaluations))
+    yield '],"summary":' + _encode(summary) + "}"
+
+
+# format -> (renderer, separator between sections, media type, file extension)
+REPORT_FORMATS = {
+    "text": (iter_report_sections, "\n", "text/plain; charset=utf-8", "txt"),
+    "markdown": (iter_markdown_sections, "\n\n", "text/markdown; charset=utf-8", "md"),
+    "html": (iter_html_sections, "\n", "text/html; charset=utf-8", "html"),
+    "json": (iter_json_sections, "", "application/json", "json"),
+}
+
+
+def iter_report(
+    format: str,
+    job_title: str,
+    questions: List[QuestionOut],
+    evaluations: List[Optional[EvalOut]]
+) -> Iterator[str]:
+    """Chunks that concatenate to the whole report in `format`; for "text" that is build_report()."""
+    if format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format {format!r} (expected {', '.join(REPORT_FORMATS)})")
+    renderer, separator = REPORT_FORMATS[format][:2]
+    for i, section in enumerate(renderer(job_title, questions, evaluations)):
+        yield section if i == 0 else separator + section
+
+
+def report_etag(
+    format: str,
+    job_title: str,
+    questions: List[QuestionOut],
+    evaluations: List[Optional[EvalOut]]
+) -> str:
+    """Strong ETag: a hash of everything the report is rendered from, plus the format."""
+    content = json.dumps([
+        REPORT_RENDER_VERSION,
+        format,
+        job_title,
+        [q.model_dump() for q in questions],
+        [e.model_dump() if e else None for e in evaluations]
+    ], sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha256(content.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+class ReportCache:
+    """LRU of rendered reports by ETag."""
+
+    def __init__(self, size: int = REPORT_CACHE_SIZE):
+        self.size = size
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._data.get(etag)
+            if body is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(etag)
+            self.hits += 1
+            return body
+
+    def put(self, etag: str, body: bytes) -> None:
+        if not self.size:
+            return
+        with self._lock:
+            self._data[etag] = body
+            self._data.move_to_end(etag)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def stream(self, etag: str, chunks: Iterator[str]) -> Iterator[bytes]:
+        """Pass rendered chunks through, caching the whole body once the last one is out."""
+        parts = []
+        for chunk in chunks:
+            data = chunk.encode("utf-8")
+            parts.append(data)
+            yield data
+        self.put(etag, b"".join(parts))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": sum(len(b) for b in self._data.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None
+        }
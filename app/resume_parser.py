@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import hashlib
+import io
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from pypdf import PdfReader
+
+from .metrics import STAGE_SECONDS, timer
+
+# pypdf text extraction is pure-Python CPU work; it runs in worker processes
+# so a long resume can't stall the event loop. 0 workers = a thread instead.
+RESUME_PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", "2"))
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "20"))
+RESUME_CACHE_SIZE = int(os.getenv("RESUME_CACHE_SIZE", "512"))
+# A parse still running after this long is abandoned and its worker killed,
+# so a pathological PDF can't hold a pool slot indefinitely.
+RESUME_PARSE_TIMEOUT_S = float(os.getenv("RESUME_PARSE_TIMEOUT_S", "30"))
+
+
+def extract_pdf_text(pdf_bytes: bytes, max_pages: int = RESUME_MAX_PAGES) -> str:
+    """Runs inside a worker process; must stay importable and picklable."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    if len(reader.pages) > max_pages:
+        raise ValueError(f"Resume PDF has {len(reader.pages)} pages; the limit is {max_pages}")
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def terminate_pool(executor: ProcessPoolExecutor) -> None:
+    """Shuts the pool down without waiting and kills its workers, including busy ones."""
+    processes = list((getattr(executor, "_processes", None) or {}).values())    # no public API before 3.14
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+class ResumeParser:
+    """
+    Async front end for extract_pdf_text with size/page limits and a cache of
+    extracted text keyed by SHA-256 of the PDF bytes, so the same resume
+    uploaded for several postings is parsed once. Concurrent uploads of the
+    same file share one parse. A worker that dies takes the pool with it; the
+    pool is then replaced and the parse retried once.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        timeout_s: Optional[float] = None
+    ):
+        self.workers = RESUME_PARSE_WORKERS if workers is None else workers
+        self.max_bytes = max_bytes or RESUME_MAX_BYTES
+        self.max_pages = max_pages or RESUME_MAX_PAGES
+        self.cache_size = RESUME_CACHE_SIZE if cache_size is None else cache_size
+        self.timeout_s = timeout_s or RESUME_PARSE_TIMEOUT_S
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.pool_restarts = 0
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers and self._executor is None:
+            # spawn, not fork: the server process has threads (uvicorn, sqlite, httpx)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _discard(self, executor: Optional[ProcessPoolExecutor]) -> None:
+        """Drops a broken or stuck pool; the next parse starts a fresh one."""
+        if executor is None:
+            return
+        if self._executor is executor:
+            self._executor = None
+            self.pool_restarts += 1
+        # Parses still running there fail with BrokenProcessPool and retry on the new pool
+        terminate_pool(executor)
+
+    async def _parse(self, pdf_bytes: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._pool()
+            future = loop.run_in_executor(executor, extract_pdf_text, pdf_bytes, self.max_pages)
+            try:
+                return await asyncio.wait_for(future, self.timeout_s)
+            except BrokenProcessPool:
+                self._discard(executor)
+                if attempt:
+                    raise
+            except asyncio.TimeoutError:
+                self._discard(executor)
+                raise ValueError(f"Resume PDF took longer than {self.timeout_s:g}s to parse") from None
+
+    async def extract(self, pdf_bytes: bytes) -> str:
+        if len(pdf_bytes) > self.max_bytes:
+            raise ValueError(f"Resume PDF is {len(pdf_bytes)} bytes; the limit is {self.max_bytes}")
+
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        if digest in self._cache:
+            self._cache.move_to_end(digest)
+            self.hits += 1
+            return self._cache[digest]
+        while digest in self._pending:
+            future = self._pending[digest]
+            try:
+                text = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise    # this caller was cancelled
+                continue     # the shared parse was cancelled: parse it here
+            self.hits += 1
+            return text
+
+        self.misses += 1
+        future = asyncio.ensure_future(self._parse(pdf_bytes))
+        self._pending[digest] = future
+        # Runs before any waiter resumes, and even if this caller is cancelled,
+        # so a parse that finishes is cached either way
+        future.add_done_callback(functools.partial(self._parsed, digest))
+        with timer(STAGE_SECONDS, "resume_parse"):
+            return await asyncio.shield(future)
+
+    def _parsed(self, digest: str, future: asyncio.Future) -> None:
+        if self._pending.get(digest) is future:
+            del self._pending[digest]
+        if self.cache_size and not future.cancelled() and future.exception() is None:
+            self._cache[digest] = future.result()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "pool_restarts": self.pool_restarts
+        }
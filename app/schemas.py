@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class QuestionOut(BaseModel):
     id: str
@@ -13,6 +13,9 @@ class EvalOut(BaseModel):
     weaknesses: List[str]
     improvement_tips: List[str]
     justification: str
+    status: str = "ok"              # "ok" | "failed"
+    error: Optional[str] = None
+    tier: str = "llm"               # "llm" | "embedding" (cheap pre-screen, no LLM call)
 
 # ── STREAMLINED ENDPOINTS ──
 
@@ -30,6 +33,12 @@ class SubmitAnswerRequest(BaseModel):
     question_id: str
     answer: str
 
+class PartialAnswerResponse(BaseModel):
+    """Partial answer received → is a follow-up being pre-generated from it?"""
+    session_id: str
+    speculating: bool
+    message: str
+
 class NextQuestionResponse(BaseModel):
     """After submitting answer → get next question or follow-up"""
     session_id: str
@@ -46,4 +55,34 @@ class FinishInterviewResponse(BaseModel):
     evaluations: List[EvalOut]
     report_text: str
     report_url: str
-    message: str
\ No newline at end of file
+    message: str
+# ── BATCH SCREENING ──
+
+class BatchScreenResponse(BaseModel):
+    """Bulk upload accepted → poll status_url for progress"""
+    job_id: str
+    total_candidates: int
+    status_url: str
+    message: str
+
+class BatchCandidateResult(BaseModel):
+    index: int
+    filename: str
+    status: str                     # "done" | "failed"
+    session_id: Optional[str] = None
+    average_score: Optional[int] = None
+    evaluated: int = 0
+    failed_evaluations: int = 0
+    error: Optional[str] = None
+    report_url: Optional[str] = None
+    elapsed_s: float
+    finished_at: float
+
+class BatchJobStatus(BaseModel):
+    job_id: str
+    job_title: str
+    status: str                     # "running" | "done" | "interrupted"
+    total_candidates: int
+    completed: int
+    failed: int
+    results: List[BatchCandidateResult]
@@ -0,0 +1,99 @@
+import gzip
+import json
+import os
+from typing import Union
+
+# How session documents (snapshots, static parts, whole states in the SQLite
+# and Redis stores, blobs) are encoded. json writes compact JSON; msgpack
+# needs the 'msgpack' package. Compression applies to documents of at least
+# SESSION_COMPRESS_MIN_BYTES; zstd needs the 'zstandard' package.
+SESSION_SERIALIZER = os.getenv("SESSION_SERIALIZER", "json")
+SESSION_COMPRESSION = os.getenv("SESSION_COMPRESSION", "none")
+SESSION_COMPRESS_MIN_BYTES = int(os.getenv("SESSION_COMPRESS_MIN_BYTES", "1024"))
+
+# Anything other than plain JSON starts with MAGIC, a format byte and a
+# compression byte, so every document says how to read it: stores can mix
+# old JSON and new binary entries, and settings can change at any time.
+MAGIC = b"\x00S"
+FORMATS = {"json": 1, "msgpack": 2}
+COMPRESSIONS = {"none": 0, "gzip": 1, "zstd": 2}
+
+
+def _optional(module: str, setting: str):
+    try:
+        return __import__(module)
+    except ImportError:
+        raise RuntimeError(f"{setting} needs the '{module}' package (pip install {module}).")
+
+
+class Serializer:
+    """dumps() in the configured format; loads() whatever format a document was written in."""
+
+    def __init__(
+        self,
+        format: str = SESSION_SERIALIZER,
+        compression: str = SESSION_COMPRESSION,
+        compress_min_bytes: int = SESSION_COMPRESS_MIN_BYTES
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown SESSION_SERIALIZER {format!r} (expected json or msgpack)")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown SESSION_COMPRESSION {compression!r} (expected none, gzip or zstd)")
+        self.format = format
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self._msgpack = _optional("msgpack", "SESSION_SERIALIZER=msgpack") if format == "msgpack" else None
+        if compression == "zstd":
+            zstandard = _optional("zstandard", "SESSION_COMPRESSION=zstd")
+            self._zstd_compress = zstandard.ZstdCompressor(level=3).compress
+        self._zstd_decompress = None
+
+    @property
+    def name(self) -> str:
+        return self.format if self.compression == "none" else f"{self.format}+{self.compression}"
+
+    def dumps(self, obj) -> bytes:
+        if self.format == "json":
+            body = json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        else:
+            body = self._msgpack.packb(obj, use_bin_type=True)
+        compression = self.compression if len(body) >= self.compress_min_bytes else "none"
+        if self.format == "json" and compression == "none":
+            return body
+        if compression == "gzip":
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+        elif compression == "zstd":
+            body = self._zstd_compress(body)
+        return MAGIC + bytes((FORMATS[self.format], COMPRESSIONS[compression])) + body
+
+    def loads(self, data: Union[bytes, str]):
+        if isinstance(data, str) or not data.startswith(MAGIC):
+            return json.loads(data)    # compact JSON, or a document from before encodings existed
+        format, compression, body = data[2], data[3], data[4:]
+        if compression == COMPRESSIONS["gzip"]:
+            body = gzip.decompress(body)
+        elif compression == COMPRESSIONS["zstd"]:
+            if self._zstd_decompress is None:
+                self._zstd_decompress = _optional("zstandard", "Reading zstd session data").ZstdDecompressor().decompress
+            body = self._zstd_decompress(body)
+        if format == FORMATS["msgpack"]:
+            msgpack = self._msgpack or _optional("msgpack", "Reading msgpack session data")
+            return msgpack.unpackb(body, raw=False)
+        return json.loads(body)
+
+    def is_current(self, data: Union[bytes, str]) -> bool:
+        """Whether `data` is already in the encoding dumps() would produce (else it is migrated on its next write)."""
+        if isinstance(data, str) or not data.startswith(MAGIC):
+            compact = (b"\n" if isinstance(data, bytes) else "\n") not in data.rstrip()    # not indent=2
+            return compact and self.format == "json" and (self.compression == "none" or len(data) < self.compress_min_bytes)
+        return data[2] == FORMATS[self.format] and data[3] in (COMPRESSIONS[self.compression], COMPRESSIONS["none"])
+
+
+_serializer = None
+
+
+def get_serializer() -> Serializer:
+    global _serializer
+    if _serializer is None:
+        _serializer = Serializer()
+    return _serializer
@@ -0,0 +1,177 @@
+import bisect
+import hashlib
+import json
+import os
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", str(Path(__file__).parent / "data" / "skills_taxonomy.json"))
+REQUIREMENTS_CACHE_SIZE = int(os.getenv("REQUIREMENTS_CACHE_SIZE", "1024"))
+MAX_RESPONSIBILITIES = 12
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: one pass over the text finds every occurrence of
+    every pattern, so matching cost is linear in the text length (plus the
+    number of matches) whatever the number of patterns.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, object]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple[int, object]]] = [[]]   # (pattern length, value)
+
+        for pattern, value in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append((len(pattern), value))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, object]]:
+        """Yield (start, end, value) for every occurrence, in order of `end`."""
+        goto, fail, out = self.goto, self.fail, self.out
+        root = goto[0]
+        state = 0
+        for i, ch in enumerate(text):
+            if state == 0 and ch not in root:
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for length, value in out[state]:
+                    yield i + 1 - length, i + 1, value
+
+
+def _bounded(text: str, start: int, end: int) -> bool:
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills with synonyms, loaded from JSON:
+    {"skills": [{"name": "kubernetes", "category": "devops", "aliases": ["k8s"]}, ...],
+     "responsibility_cues": ["you will", ...]}
+    "match_name": false keeps a too-ambiguous bare name ("go", "r") from matching.
+    """
+
+    def __init__(self, skills: List[dict], responsibility_cues: List[str]):
+        self.categories: Dict[str, str] = {}
+        self.patterns: Dict[str, str] = {}
+        for skill in skills:
+            name = skill["name"].lower()
+            self.categories[name] = skill.get("category", "")
+            if skill.get("match_name", True):
+                self.patterns[name] = name
+            for alias in skill.get("aliases", []):
+                self.patterns.setdefault(alias.lower(), name)
+        self.responsibility_cues = [c.lower() for c in responsibility_cues]
+
+    @classmethod
+    def load(cls, path: str = None) -> "SkillTaxonomy":
+        data = json.loads(Path(path or SKILL_TAXONOMY_PATH).read_text(encoding="utf-8"))
+        return cls(data["skills"], data.get("responsibility_cues", []))
+
+
+class RequirementsExtractor:
+    """
+    extract_requirements() over a taxonomy: skills (synonyms folded into their
+    canonical name, whole words only) and the JD lines that read like
+    responsibilities. Both automatons are built once; results are memoized
+    per (title, JD) hash.
+    """
+
+    def __init__(self, taxonomy: Optional[SkillTaxonomy] = None, cache_size: int = REQUIREMENTS_CACHE_SIZE):
+        self.taxonomy = taxonomy or SkillTaxonomy.load()
+        self.skill_matcher = AhoCorasick(self.taxonomy.patterns.items())
+        self.cue_matcher = AhoCorasick((cue, cue) for cue in self.taxonomy.responsibility_cues)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def find_skills(self, text: str) -> Set[str]:
+        text = text.lower()
+        return {skill for start, end, skill in self.skill_matcher.iter_matches(text) if _bounded(text, start, end)}
+
+    def find_responsibilities(self, job_description: str) -> List[str]:
+        lines = job_description.splitlines()
+        lowered = "\n".join(line.lower() for line in lines)
+        starts, pos = [], 0
+        for line in lines:
+            starts.append(pos)
+            pos += len(line.lower()) + 1
+
+        # A cue must start a word ("own" matches "ownership", not "known")
+        hit_lines = sorted({
+            bisect.bisect_right(starts, start) - 1
+            for start, _, _ in self.cue_matcher.iter_matches(lowered)
+            if start == 0 or not lowered[start - 1].isalnum()
+        })
+
+        responsibilities = []
+        for idx in hit_lines:
+            line = lines[idx].strip()
+            if len(line) > 10:
+                responsibilities.append(line[:220])
+                if len(responsibilities) == MAX_RESPONSIBILITIES:
+                    break
+        return responsibilities
+
+    def extract(self, job_title: str, job_description: str) -> Dict[str, List[str]]:
+        key = hashlib.sha256(f"{job_title}\0{job_description}".encode("utf-8")).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            cached = (
+                tuple(sorted(self.find_skills(job_title + "\n" + job_description))),
+                tuple(self.find_responsibilities(job_description))
+            )
+            self._cache[key] = cached
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return {"skills": list(cached[0]), "responsibilities": list(cached[1])}
+
+    def stats(self) -> dict:
+        return {
+            "skills": len(self.taxonomy.categories),
+            "patterns": len(self.taxonomy.patterns),
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+_extractor: Optional[RequirementsExtractor] = None
+
+
+def get_requirements_extractor() -> RequirementsExtractor:
+    global _extractor
+    if _extractor is None:
+        _extractor = RequirementsExtractor()
+    return _extractor
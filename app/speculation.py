@@ -0,0 +1,209 @@
+import asyncio
+import difflib
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .llm_questions import FOLLOWUP_SYSTEM, followup_payload
+from .llm_scheduler import Priority, estimate_tokens, llm_priority
+
+# Follow-ups for Q1/Q2 can be generated from partial answers the client posts
+# while the candidate is still typing or speaking. A speculation is used for
+# the final answer if the two are at least this similar (word-level diff ratio);
+# a newer partial that has drifted below it restarts the speculation.
+SPECULATIVE_FOLLOWUP_ENABLED = os.getenv("SPECULATIVE_FOLLOWUP_ENABLED", "1") != "0"
+SPECULATIVE_MIN_SIMILARITY = float(os.getenv("SPECULATIVE_MIN_SIMILARITY", "0.85"))
+SPECULATIVE_MIN_WORDS = int(os.getenv("SPECULATIVE_MIN_WORDS", "15"))
+# Each restart throws away a call, so restarts are at least this far apart
+SPECULATIVE_MIN_INTERVAL_S = float(os.getenv("SPECULATIVE_MIN_INTERVAL_S", "1.0"))
+SPECULATIVE_TTL_S = float(os.getenv("SPECULATIVE_TTL_S", "600"))
+SPECULATIVE_MAX_SESSIONS = int(os.getenv("SPECULATIVE_MAX_SESSIONS", "10000"))
+
+
+def answer_words(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def answer_similarity(a: str, b: str) -> float:
+    """Word-level diff ratio: an 80%-complete partial scores ~0.89 against the final answer."""
+    wa, wb = answer_words(a), answer_words(b)
+    if not wa and not wb:
+        return 1.0
+    return difflib.SequenceMatcher(None, wa, wb, autojunk=False).ratio()
+
+
+class Speculation:
+    """One in-flight (or finished) follow-up generated from a partial answer."""
+
+    def __init__(self, key: Tuple[str, int], answer: str, task: asyncio.Task, prompt_tokens: int):
+        self.key = key                  # (question_id, followup_number)
+        self.answer = answer
+        self.task = task
+        self.prompt_tokens = prompt_tokens
+        self.started_at = time.monotonic()
+
+    def tokens_spent(self) -> int:
+        """Estimated cost: the prompt, plus the completion if it finished."""
+        if self.task.done() and not self.task.cancelled() and self.task.exception() is None:
+            return self.prompt_tokens + estimate_tokens(json.dumps(self.task.result()))
+        return self.prompt_tokens
+
+
+class FollowupSpeculator:
+    """
+    At most one speculation per session, kept in this process: a final answer
+    that lands on another worker simply misses and generates as before.
+    Speculative calls run at DEFAULT priority, behind the follow-ups users are
+    actually waiting on but ahead of background evaluation.
+    """
+
+    def __init__(
+        self,
+        llm,
+        min_similarity: float = SPECULATIVE_MIN_SIMILARITY,
+        min_words: int = SPECULATIVE_MIN_WORDS,
+        min_interval_s: float = SPECULATIVE_MIN_INTERVAL_S,
+        ttl_s: float = SPECULATIVE_TTL_S,
+        max_sessions: int = SPECULATIVE_MAX_SESSIONS
+    ):
+        self.llm = llm
+        self.min_similarity = min_similarity
+        self.min_words = min_words
+        self.min_interval_s = min_interval_s
+        self.ttl_s = ttl_s
+        self.max_sessions = max_sessions
+        self._speculations: Dict[str, Speculation] = {}
+
+        self.partials = 0
+        self.started = 0
+        self.restarted = 0
+        self.hits = 0
+        self.misses = 0           # a speculation existed but the final answer diverged (or it failed)
+        self.cold = 0             # no speculation for this follow-up
+        self.wasted_tokens = 0
+        self.hit_wait_seconds = 0.0
+
+    def _discard(self, session_id: str) -> None:
+        spec = self._speculations.pop(session_id, None)
+        if spec is None:
+            return
+        self.wasted_tokens += spec.tokens_spent()
+        spec.task.cancel()
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for session_id, spec in list(self._speculations.items()):
+            if now - spec.started_at > self.ttl_s:
+                self._discard(session_id)
+        while len(self._speculations) >= self.max_sessions:
+            self._discard(next(iter(self._speculations)))
+
+    def offer(
+        self,
+        session_id: str,
+        question_id: str,
+        followup_number: int,
+        original_question: str,
+        partial_answer: str,
+        conversation_history: list
+    ) -> bool:
+        """
+        Start (or restart) speculating on this partial answer. Returns whether a
+        speculation now covers it; a partial close to the current one is a no-op.
+        """
+        self.partials += 1
+        if len(answer_words(partial_answer)) < self.min_words:
+            return False
+
+        key = (question_id, followup_number)
+        spec = self._speculations.get(session_id)
+        if spec is not None and spec.key == key:
+            if answer_similarity(spec.answer, partial_answer) >= self.min_similarity:
+                return True
+            if time.monotonic() - spec.started_at < self.min_interval_s:
+                return False
+            self.restarted += 1
+        self._discard(session_id)
+        self._prune()
+
+        history = conversation_history + [{"question": original_question, "answer": partial_answer}]
+        payload = followup_payload(original_question, partial_answer, followup_number, history)
+
+        async def generate():
+            with llm_priority(Priority.DEFAULT):
+                return await self.llm.generate_followup_question(
+                    original_question=original_question,
+                    candidate_answer=partial_answer,
+                    followup_number=followup_number,
+                    conversation_history=history
+                )
+
+        task = asyncio.create_task(generate())
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())  # failures surface as misses in take()
+        self._speculations[session_id] = Speculation(
+            key, partial_answer, task, estimate_tokens(FOLLOWUP_SYSTEM + json.dumps(payload))
+        )
+        self.started += 1
+        return True
+
+    async def take(
+        self,
+        session_id: str,
+        question_id: str,
+        followup_number: int,
+        answer: str,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Optional[dict]:
+        """
+        The speculated follow-up if it was generated for a close enough version
+        of `answer` (waiting for it if still running), else None.
+        """
+        spec = self._speculations.get(session_id)
+        if spec is None or spec.key != (question_id, followup_number):
+            self.cold += 1
+            return None
+        if answer_similarity(spec.answer, answer) < self.min_similarity:
+            self.misses += 1
+            self._discard(session_id)
+            return None
+
+        del self._speculations[session_id]
+        t0 = time.monotonic()
+        try:
+            followup = await spec.task
+        except Exception:
+            followup = None
+        if not isinstance(followup, dict) or not followup.get("text"):
+            self.misses += 1
+            self.wasted_tokens += spec.tokens_spent()
+            return None
+
+        self.hits += 1
+        self.hit_wait_seconds += time.monotonic() - t0
+        if on_token:
+            on_token(followup["text"])
+        return followup
+
+    def stop(self) -> None:
+        for session_id in list(self._speculations):
+            self._discard(session_id)
+
+    def stats(self) -> dict:
+        resolved = self.hits + self.misses
+        followups = resolved + self.cold
+        return {
+            "enabled": SPECULATIVE_FOLLOWUP_ENABLED,
+            "active": len(self._speculations),
+            "partials": self.partials,
+            "started": self.started,
+            "restarted": self.restarted,
+            "hits": self.hits,
+            "misses": self.misses,
+            "cold": self.cold,
+            "hit_rate": round(self.hits / resolved, 4) if resolved else 0.0,
+            "coverage": round(self.hits / followups, 4) if followups else 0.0,
+            "wasted_tokens": self.wasted_tokens,
+            "avg_hit_wait_ms": round(1000 * self.hit_wait_seconds / self.hits, 2) if self.hits else 0.0
+        }
@@ -1,8 +1,53 @@
+import fcntl
+import hashlib
+import os
+import sqlite3
+import threading
+import time
 import uuid
 import json
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, List, Optional, Tuple
 
-BASE = Path("sessions")
+from .metrics import STORAGE_SECONDS, timed
+from .serialization import Serializer, get_serializer
+
+BASE = Path(os.getenv("SESSIONS_DIR", "sessions"))
+
+# file   - one JSON document per session under sessions/<id>/ (single node)
+# sqlite - one WAL-mode database shared by every worker on the host
+# redis  - any Redis-protocol server, shared across nodes
+SESSION_STORE = os.getenv("SESSION_STORE", "file")
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", str(BASE / "sessions.sqlite3"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# File store turn log: "always" fsyncs every append, "interval" at most once
+# per SESSION_LOG_FSYNC_INTERVAL_S per session, "never" leaves it to the OS.
+SESSION_LOG_FSYNC = os.getenv("SESSION_LOG_FSYNC", "interval")
+SESSION_LOG_FSYNC_INTERVAL_S = float(os.getenv("SESSION_LOG_FSYNC_INTERVAL_S", "1.0"))
+# The log is folded into the snapshot once it outgrows it (and this floor),
+# which keeps both replay cost and amortized bytes per turn bounded.
+SESSION_LOG_COMPACT_MIN_BYTES = int(os.getenv("SESSION_LOG_COMPACT_MIN_BYTES", str(64 * 1024)))
+
+# Written once when the session is created, never part of a turn record.
+STATIC_KEYS = ("job_title", "job_description", "resume_text", "main_questions", "question_source")
+
+# Large immutable texts are stored once per content hash in the store's blob
+# store and referenced from the session as {"$blob": "<sha256>"}, so a JD
+# shared by many candidates is kept once and the SQLite/Redis stores stop
+# rewriting the resume on every turn.
+BLOB_FIELDS = ("resume_text", "job_description")
+SESSION_BLOB_MIN_BYTES = int(os.getenv("SESSION_BLOB_MIN_BYTES", "512"))
+SESSION_BLOB_DIR = Path(os.getenv("SESSION_BLOB_DIR", str(BASE / "_blobs")))
+# Blobs no session refers to are garbage-collected once they have not been
+# put() for this long, so a session being created meanwhile keeps its blobs.
+SESSION_BLOB_GRACE_S = float(os.getenv("SESSION_BLOB_GRACE_S", "3600"))
+
+
+class SessionConflictError(RuntimeError):
+    """A session kept changing underneath a compare-and-set retry loop."""
 
 
 def new_session_id() -> str:
@@ -35,31 +80,875 @@ def load_session_data(session_id: str) -> dict:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+# ─────────────────────────────────────────
+# Blob stores
+# ─────────────────────────────────────────
+
+def blob_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    """
+    Content-addressed, immutable texts. Recently used blobs are kept in
+    memory; gc() deletes those no session references any more.
+
+    Every blob carries the time it was last put(). A put() refreshes it at
+    least every SESSION_BLOB_GRACE_S / 2, so a blob about to be referenced
+    by a new session is never older than the grace period gc() honours.
+    """
+
+    def __init__(self, serializer: Optional[Serializer] = None, cache_size: int = 256):
+        self.serializer = serializer or get_serializer()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, list]" = OrderedDict()    # key -> [text, last refreshed by put()]
+        self._cache_lock = threading.Lock()
+
+    def put(self, text: str) -> str:
+        key = blob_key(text)
+        now = time.time()
+        cached = self._cache.get(key)
+        if cached is None or now - cached[1] >= SESSION_BLOB_GRACE_S / 2:
+            if not self._touch(key, now):
+                self._write(key, self.serializer.dumps(text), now)
+            self._remember(key, text, now)
+        return key
+
+    def get(self, key: str) -> str:
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached[0]
+        data = self._read(key)
+        if data is None:
+            raise KeyError(f"Blob {key} is missing")
+        text = self.serializer.loads(data)
+        self._remember(key, text, 0.0)
+        return text
+
+    def _remember(self, key: str, text: str, refreshed: float) -> None:
+        with self._cache_lock:
+            self._cache[key] = [text, refreshed]
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def gc(self, referenced: set, older_than: float) -> Tuple[int, int]:
+        """Delete unreferenced blobs last put before `older_than` (unix time); returns (count, bytes)."""
+        removed, freed = 0, 0
+        for key, size, touched in self._list():
+            if key not in referenced and touched < older_than:
+                self._delete(key)
+                with self._cache_lock:
+                    self._cache.pop(key, None)
+                removed += 1
+                freed += size
+        return removed, freed
+
+    def _touch(self, key: str, now: float) -> bool:
+        """Refresh a stored blob's timestamp; False if it is not stored."""
+        return False
+
+    def _write(self, key: str, data: bytes, now: float) -> None:
+        raise NotImplementedError
+
+    def _read(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def _list(self) -> List[Tuple[str, int, float]]:
+        """(key, stored bytes, last put) for every blob."""
+        raise NotImplementedError
+
+
+class FileBlobStore(BlobStore):
+    """One file per blob under SESSION_BLOB_DIR/<first two hex digits>/<key>."""
+
+    def __init__(self, directory: Path = None, serializer: Optional[Serializer] = None):
+        super().__init__(serializer)
+        self.directory = Path(directory or SESSION_BLOB_DIR)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _touch(self, key: str, now: float) -> bool:
+        try:
+            os.utime(self._path(key), (now, now))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _write(self, key: str, data: bytes, now: float) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{key}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def _list(self) -> List[Tuple[str, int, float]]:
+        if not self.directory.exists():
+            return []
+        out = []
+        for path in self.directory.glob("??/*"):
+            if path.suffix != ".tmp":
+                st = path.stat()
+                out.append((path.name, st.st_size, st.st_mtime))
+        return out
+
+
+class SQLiteBlobStore(BlobStore):
+    """A blobs table next to the sessions table, sharing its connection and lock."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock, serializer: Optional[Serializer] = None):
+        super().__init__(serializer)
+        self._conn = conn
+        self._lock = lock
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs (key TEXT PRIMARY KEY, data BLOB NOT NULL, touched_at REAL NOT NULL)"
+            )
+
+    def _touch(self, key: str, now: float) -> bool:
+        with self._lock:
+            return self._conn.execute("UPDATE blobs SET touched_at = ? WHERE key = ?", (now, key)).rowcount == 1
+
+    def _write(self, key: str, data: bytes, now: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO blobs VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET touched_at = excluded.touched_at",
+                (key, data, now)
+            )
+
+    def _read(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM blobs WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+
+    def _list(self) -> List[Tuple[str, int, float]]:
+        with self._lock:
+            return list(self._conn.execute("SELECT key, length(data), touched_at FROM blobs"))
+
+
+class RedisBlobStore(BlobStore):
+    """
+    One hash per blob ({"data", "touched_at"}) under `prefix`. A refresh
+    rewrites the whole hash, which is idempotent and can't race a delete.
+    """
+
+    def __init__(self, client, prefix: str = "blob:", serializer: Optional[Serializer] = None):
+        super().__init__(serializer)
+        self.client = client
+        self.prefix = prefix
+
+    def _write(self, key: str, data: bytes, now: float) -> None:
+        self.client.hset(self.prefix + key, mapping={"data": data, "touched_at": now})
+
+    def _read(self, key: str) -> Optional[bytes]:
+        return self.client.hget(self.prefix + key, "data")
+
+    def _delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def _list(self) -> List[Tuple[str, int, float]]:
+        n = len(self.prefix)
+        out = []
+        for k in self.client.scan_iter(match=self.prefix + "*"):
+            data, touched = self.client.hmget(k, "data", "touched_at")
+            if data is not None:
+                out.append(((k.decode() if isinstance(k, bytes) else k)[n:], len(data), float(touched or 0)))
+        return out
+
+
+def externalize_blobs(state: dict, blobs: BlobStore) -> dict:
+    """Shallow copy of `state` with BLOB_FIELDS moved into the blob store."""
+    out = dict(state)
+    for field in BLOB_FIELDS:
+        value = out.get(field)
+        if isinstance(value, str) and len(value) >= SESSION_BLOB_MIN_BYTES:
+            out[field] = {"$blob": blobs.put(value)}
+    return out
+
+
+def resolve_blobs(state: dict, blobs: BlobStore) -> dict:
+    """Replace blob references in `state` with their text, in place."""
+    for field in BLOB_FIELDS:
+        value = state.get(field)
+        if isinstance(value, dict) and "$blob" in value:
+            state[field] = blobs.get(value["$blob"])
+    return state
+
+
+def blob_refs(state: Optional[dict]) -> set:
+    """Blob keys an encoded (not yet resolved) state refers to."""
+    if not state:
+        return set()
+    return {v["$blob"] for v in (state.get(f) for f in BLOB_FIELDS) if isinstance(v, dict) and "$blob" in v}
+
+
+def _has_inline_blobs(state: dict) -> bool:
+    return any(isinstance(state.get(f), str) and len(state[f]) >= SESSION_BLOB_MIN_BYTES for f in BLOB_FIELDS)
+
+
+# ─────────────────────────────────────────
+# Session stores
+# ─────────────────────────────────────────
+
+class SessionStore:
+    """
+    Where conversation state lives. Every successful write bumps the
+    session's version (a missing session is version 0), which is what
+    compare_and_set() checks, so concurrent writers can detect lost updates
+    without holding a lock across an LLM call.
+    """
+
+    def load_versioned(self, session_id: str) -> Tuple[Optional[dict], int]:
+        raise NotImplementedError
+
+    def save(self, session_id: str, state: dict) -> int:
+        """Unconditional write; returns the new version."""
+        raise NotImplementedError
+
+    def compare_and_set(self, session_id: str, state: dict, expected_version: int) -> bool:
+        """Write only if the stored version is still expected_version."""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def list_sessions(self) -> List[str]:
+        raise NotImplementedError
+
+    def updated_at(self, session_id: str) -> Optional[float]:
+        """Unix time of the session's last write, or None if unknown."""
+        raise NotImplementedError
+
+    def blob_refs(self, session_id: str) -> set:
+        """Keys of the blobs the stored session refers to."""
+        raise NotImplementedError
+
+    def rewrite(self, session_id: str) -> bool:
+        """
+        Re-encode a stored session in the current format, keeping its version
+        and updated_at; False if it is gone or was written to meanwhile.
+        """
+        raise NotImplementedError
+
+    def load(self, session_id: str) -> Optional[dict]:
+        return self.load_versioned(session_id)[0]
+
+
+_MISSING = object()
+
+
+def state_delta(old: dict, new: dict) -> dict:
+    """
+    Smallest log record turning `old` into `new`: lists that only grew are
+    extended, dicts that only gained/changed entries are merged, anything
+    else is replaced.
+    """
+    delta: dict = {}
+    for key, value in new.items():
+        before = old.get(key, _MISSING)
+        if before is value or before == value:
+            continue
+        if isinstance(value, list) and isinstance(before, list) and value[:len(before)] == before:
+            delta.setdefault("extend", {})[key] = value[len(before):]
+        elif isinstance(value, dict) and isinstance(before, dict) and before.keys() <= value.keys():
+            delta.setdefault("merge", {})[key] = {
+                k: v for k, v in value.items() if before.get(k, _MISSING) != v
+            }
+        else:
+            delta.setdefault("set", {})[key] = value
+    removed = [k for k in old if k not in new]
+    if removed:
+        delta["unset"] = removed
+    return delta
+
+
+def _copy_state(state: Optional[dict]) -> Optional[dict]:
+    """Copy the top level and its lists/dicts; nested items are shared."""
+    if state is None:
+        return None
+    return {
+        k: list(v) if isinstance(v, list) else dict(v) if isinstance(v, dict) else v
+        for k, v in state.items()
+    }
+
+
+def apply_delta(state: dict, delta: dict) -> None:
+    for key, items in delta.get("extend", {}).items():
+        state.setdefault(key, []).extend(items)
+    for key, entries in delta.get("merge", {}).items():
+        state.setdefault(key, {}).update(entries)
+    for key, value in delta.get("set", {}).items():
+        state[key] = value
+    for key in delta.get("unset", []):
+        state.pop(key, None)
+
+
+class FileSessionStore(SessionStore):
+    """
+    Log-structured layout under sessions/<id>/:
+
+      static.json  job title, JD, resume, main questions — written once
+      state.json   snapshot of everything else, with its version
+      log.jsonl    one delta record per write since the snapshot
+
+    A write appends O(change) bytes instead of rewriting the whole document;
+    once the log is bigger than state.json (and SESSION_LOG_COMPACT_MIN_BYTES)
+    it is folded back into a new snapshot. Loading replays snapshot + log, skipping records already in
+    the snapshot (a crash between snapshot and truncate) and a torn last line
+    (a crash mid-append). Sessions still in the old single
+    conversation_state.json are read as-is and migrated on their next write.
+
+    static.json and state.json hold whatever the serializer writes (compact
+    JSON by default) despite their names, and the resume and JD live in the
+    shared blob store under sessions/_blobs. Files in an older encoding, or
+    with the texts still inline, are rewritten on the session's next write.
+
+    Writers are serialized across processes with flock on a per-session lock
+    file, so CAS holds for several uvicorn workers on one host. The last
+    state seen per session is kept in memory and reused while the files on
+    disk are unchanged, so neither load nor save re-reads the log per turn.
+    Loaded states share nested items with that copy: replace turns and
+    evaluation records, don't mutate them in place.
+    """
+
+    def __init__(
+        self,
+        base: Path = None,
+        fsync: str = None,
+        compact_min_bytes: int = None,
+        cache_size: int = 256,
+        serializer: Optional[Serializer] = None
+    ):
+        self.base = base or BASE
+        self.serializer = serializer or get_serializer()
+        self.blobs = FileBlobStore(self.base / "_blobs" if base else SESSION_BLOB_DIR, self.serializer)
+        self.fsync = fsync or SESSION_LOG_FSYNC
+        self.compact_min_bytes = SESSION_LOG_COMPACT_MIN_BYTES if compact_min_bytes is None else compact_min_bytes
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()    # the lifecycle sweep runs in a worker thread
+        self._last_fsync: dict = {}
+
+    def _dir(self, session_id: str) -> Path:
+        return self.base / session_id
+
+    @contextmanager
+    def _locked(self, session_id: str):
+        d = self._dir(session_id)
+        d.mkdir(parents=True, exist_ok=True)
+        with open(d / ".lock", "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _fingerprint(self, session_id: str) -> Optional[tuple]:
+        d = self._dir(session_id)
+        try:
+            snap = os.stat(d / "state.json")
+        except FileNotFoundError:
+            return None
+        try:
+            log_size = os.stat(d / "log.jsonl").st_size
+        except FileNotFoundError:
+            log_size = 0
+        return snap.st_ino, snap.st_mtime_ns, log_size
+
+    def _replay(self, session_id: str) -> dict:
+        d = self._dir(session_id)
+        legacy = d / "conversation_state.json"
+        if not (d / "state.json").exists():
+            if legacy.exists():
+                state = json.loads(legacy.read_text(encoding="utf-8"))
+                return {"state": state, "version": state.pop("_version", 1), "legacy": True}
+            return {"state": None, "version": 0}
+
+        raw = (d / "state.json").read_bytes()
+        snapshot = self.serializer.loads(raw)
+        version = snapshot.pop("_version")
+        static_raw = (d / "static.json").read_bytes()
+        state = self.serializer.loads(static_raw)
+        stale = not (self.serializer.is_current(raw) and self.serializer.is_current(static_raw)) or _has_inline_blobs(state)
+        refs = blob_refs(state)
+        resolve_blobs(state, self.blobs)
+        state.update(snapshot)
+        log_bytes = 0
+        log = d / "log.jsonl"
+        if log.exists():
+            with open(log, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn append from a crash
+                    if record["v"] <= version:
+                        continue
+                    apply_delta(state, record)
+                    version = record["v"]
+            log_bytes = log.stat().st_size
+        return {
+            "state": state,
+            "version": version,
+            "snapshot_bytes": len(raw),
+            "log_bytes": log_bytes,
+            "blob_refs": refs,
+            "stale": stale
+        }
+
+    def _current(self, session_id: str) -> dict:
+        fp = self._fingerprint(session_id)
+        entry = self._cache.get(session_id)
+        if entry is None or fp is None or entry.get("fp") != fp:
+            entry = self._replay(session_id)
+            entry["fp"] = fp
+            self._remember(session_id, entry)
+        return entry
+
+    def _remember(self, session_id: str, entry: dict) -> None:
+        with self._cache_lock:
+            self._cache[session_id] = entry
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _write_snapshot(self, session_id: str, state: dict, version: int) -> int:
+        d = self._dir(session_id)
+        dynamic = {k: v for k, v in state.items() if k not in STATIC_KEYS}
+        raw = self.serializer.dumps({"_version": version, **dynamic})
+        tmp = d / "state.json.tmp"
+        tmp.write_bytes(raw)
+        os.replace(tmp, d / "state.json")
+        with open(d / "log.jsonl", "w"):
+            pass
+        return len(raw)
+
+    def _write_static(self, session_id: str, state: dict) -> set:
+        """Writes the static part and returns the blobs it refers to."""
+        d = self._dir(session_id)
+        static = externalize_blobs({k: state[k] for k in STATIC_KEYS if k in state}, self.blobs)
+        tmp = d / "static.json.tmp"
+        tmp.write_bytes(self.serializer.dumps(static))
+        os.replace(tmp, d / "static.json")
+        return blob_refs(static)
+
+    def _create(self, session_id: str, state: dict, version: int) -> None:
+        d = self._dir(session_id)
+        refs = self._write_static(session_id, state)
+        snapshot_bytes = self._write_snapshot(session_id, state, version)
+        (d / "conversation_state.json").unlink(missing_ok=True)
+        self._remember(session_id, {
+            "state": _copy_state(state),
+            "version": version,
+            "snapshot_bytes": snapshot_bytes,
+            "log_bytes": 0,
+            "blob_refs": refs,
+            "fp": self._fingerprint(session_id)
+        })
+
+    def _append(self, session_id: str, entry: dict, state: dict) -> int:
+        version = entry["version"] + 1
+        delta = state_delta(entry["state"], state)
+        if any(k in STATIC_KEYS for part in delta.values() for k in part):
+            entry["blob_refs"] = self._write_static(session_id, state)  # rare; keeps compaction from dropping it
+        line = json.dumps({"v": version, **delta}, separators=(",", ":"))
+        with open(self._dir(session_id) / "log.jsonl", "a+b") as fh:
+            end = fh.seek(0, os.SEEK_END)
+            if end:
+                fh.seek(end - 1)
+                if fh.read(1) != b"\n":
+                    fh.write(b"\n")  # fence off a torn line left by a crash
+            fh.write(line.encode("utf-8") + b"\n")
+            entry["log_bytes"] = fh.tell()
+            fh.flush()
+            now = time.monotonic()
+            if self.fsync == "always" or (
+                self.fsync == "interval"
+                and now - self._last_fsync.get(session_id, 0.0) >= SESSION_LOG_FSYNC_INTERVAL_S
+            ):
+                os.fsync(fh.fileno())
+                self._last_fsync[session_id] = now
+
+        # Apply the decoded record so the cached copy never aliases caller objects
+        apply_delta(entry["state"], json.loads(line))
+        entry["version"] = version
+        if entry["log_bytes"] >= max(self.compact_min_bytes, entry["snapshot_bytes"]):
+            entry["snapshot_bytes"] = self._write_snapshot(session_id, entry["state"], version)
+            entry["log_bytes"] = 0
+        entry["fp"] = self._fingerprint(session_id)
+        self._remember(session_id, entry)
+        return version
+
+    def _save_locked(self, session_id: str, state: dict, entry: dict) -> int:
+        if entry["state"] is None or entry.get("legacy") or entry.get("stale"):
+            self._create(session_id, state, entry["version"] + 1)
+            return entry["version"] + 1
+        return self._append(session_id, entry, state)
+
+    def load_versioned(self, session_id: str) -> Tuple[Optional[dict], int]:
+        entry = self._current(session_id)
+        return _copy_state(entry["state"]), entry["version"]
+
+    def save(self, session_id: str, state: dict) -> int:
+        with self._locked(session_id):
+            return self._save_locked(session_id, state, self._current(session_id))
+
+    def compare_and_set(self, session_id: str, state: dict, expected_version: int) -> bool:
+        with self._locked(session_id):
+            entry = self._current(session_id)
+            if entry["version"] != expected_version:
+                return False
+            self._save_locked(session_id, state, entry)
+            return True
+
+    def compact(self, session_id: str) -> bool:
+        """
+        Fold the log into state.json now instead of waiting for the threshold,
+        keeping updated_at; False if there was nothing to fold.
+        """
+        with self._locked(session_id):
+            entry = self._current(session_id)
+            if entry["state"] is None or entry.get("legacy") or not entry["log_bytes"]:
+                return False
+            updated = self.updated_at(session_id)
+            entry["snapshot_bytes"] = self._write_snapshot(session_id, entry["state"], entry["version"])
+            entry["log_bytes"] = 0
+            d = self._dir(session_id)
+            for name in ("state.json", "log.jsonl"):
+                os.utime(d / name, (updated, updated))
+            entry["fp"] = self._fingerprint(session_id)
+            return True
+
+    def rewrite(self, session_id: str) -> bool:
+        with self._locked(session_id):
+            entry = self._current(session_id)
+            if entry["state"] is None:
+                return False
+            if entry.get("legacy") or entry.get("stale"):
+                updated = self.updated_at(session_id)
+                self._create(session_id, entry["state"], entry["version"])
+                d = self._dir(session_id)
+                for name in ("state.json", "log.jsonl"):
+                    os.utime(d / name, (updated, updated))
+                self._current(session_id)    # refresh the cached fingerprint
+            return True
+
+    def blob_refs(self, session_id: str) -> set:
+        return set(self._current(session_id).get("blob_refs", ()))
+
+    def delete(self, session_id: str) -> None:
+        d = self._dir(session_id)
+        with self._locked(session_id):
+            for name in ("static.json", "state.json", "log.jsonl", "conversation_state.json"):
+                (d / name).unlink(missing_ok=True)
+        with self._cache_lock:
+            self._cache.pop(session_id, None)
+        self._last_fsync.pop(session_id, None)
+
+    def list_sessions(self) -> List[str]:
+        return sorted(
+            p.name for p in self.base.iterdir()
+            if p.is_dir() and ((p / "state.json").exists() or (p / "conversation_state.json").exists())
+        ) if self.base.exists() else []
+
+    def updated_at(self, session_id: str) -> Optional[float]:
+        d = self._dir(session_id)
+        mtimes = []
+        for name in ("state.json", "log.jsonl", "conversation_state.json"):
+            try:
+                mtimes.append(os.stat(d / name).st_mtime)
+            except FileNotFoundError:
+                pass
+        return max(mtimes, default=None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    One row per session in a WAL-mode database; CAS is a conditional UPDATE.
+    Rows are written by the serializer with the resume and JD in the blobs
+    table; rows from before that still load and are re-encoded on write.
+    """
+
+    def __init__(self, path: str = None, serializer: Optional[Serializer] = None):
+        path = path or SESSION_SQLITE_PATH
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, state TEXT NOT NULL, version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.serializer = serializer or get_serializer()
+        self.blobs = SQLiteBlobStore(self._conn, self._lock, self.serializer)
+
+    def _encode(self, state: dict) -> bytes:
+        return self.serializer.dumps(externalize_blobs(state, self.blobs))
+
+    def load_versioned(self, session_id: str) -> Tuple[Optional[dict], int]:
+        with self._lock:
+            row = self._conn.execute("SELECT state, version FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None, 0
+        return resolve_blobs(self.serializer.loads(row[0]), self.blobs), row[1]
+
+    def save(self, session_id: str, state: dict) -> int:
+        blob = self._encode(state)
+        with self._lock:
+            row = self._conn.execute(
+                "INSERT INTO sessions (id, state, version, updated_at) VALUES (?, ?, 1, ?)"
+                " ON CONFLICT(id) DO UPDATE SET state = excluded.state, version = version + 1,"
+                " updated_at = excluded.updated_at RETURNING version",
+                (session_id, blob, time.time())
+            ).fetchone()
+        return row[0]
+
+    def compare_and_set(self, session_id: str, state: dict, expected_version: int) -> bool:
+        blob = self._encode(state)
+        with self._lock:
+            if expected_version == 0:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO sessions (id, state, version, updated_at) VALUES (?, ?, 1, ?)",
+                    (session_id, blob, time.time())
+                )
+            else:
+                cur = self._conn.execute(
+                    "UPDATE sessions SET state = ?, version = version + 1, updated_at = ?"
+                    " WHERE id = ? AND version = ?",
+                    (blob, time.time(), session_id, expected_version)
+                )
+        return cur.rowcount == 1
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def list_sessions(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT id FROM sessions ORDER BY id")]
+
+    def updated_at(self, session_id: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT updated_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def blob_refs(self, session_id: str) -> set:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return blob_refs(self.serializer.loads(row[0])) if row else set()
+
+    def rewrite(self, session_id: str) -> bool:
+        state, version = self.load_versioned(session_id)
+        if state is None:
+            return False
+        blob = self._encode(state)
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE sessions SET state = ? WHERE id = ? AND version = ?", (blob, session_id, version)
+            )
+        return cur.rowcount == 1
+
+
+class RedisSessionStore(SessionStore):
+    """
+    One hash per session ({"state", "version"}) on any Redis-protocol server.
+    CAS uses WATCH/MULTI, so it needs no server-side scripting and works
+    against fakeredis in tests and benchmarks. Blobs are hashes under
+    `blob_prefix`, which must not overlap `prefix`.
+    """
+
+    def __init__(self, client=None, prefix: str = "session:", blob_prefix: str = "blob:", serializer: Optional[Serializer] = None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("SESSION_STORE=redis needs the 'redis' package (pip install redis).")
+            client = redis.Redis.from_url(REDIS_URL)
+        self.client = client
+        self.prefix = prefix
+        self.serializer = serializer or get_serializer()
+        self.blobs = RedisBlobStore(client, blob_prefix, self.serializer)
+
+    def _encode(self, state: dict) -> bytes:
+        return self.serializer.dumps(externalize_blobs(state, self.blobs))
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    def load_versioned(self, session_id: str) -> Tuple[Optional[dict], int]:
+        state, version = self.client.hmget(self._key(session_id), "state", "version")
+        if state is None:
+            return None, 0
+        return resolve_blobs(self.serializer.loads(state), self.blobs), int(version)
+
+    def save(self, session_id: str, state: dict) -> int:
+        key = self._key(session_id)
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"state": self._encode(state), "updated_at": time.time()})
+            pipe.hincrby(key, "version", 1)
+            return int(pipe.execute()[1])
+
+    def compare_and_set(self, session_id: str, state: dict, expected_version: int) -> bool:
+        from redis.exceptions import WatchError
+
+        key = self._key(session_id)
+        blob = self._encode(state)
+        with self.client.pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(key)
+                if int(pipe.hget(key, "version") or 0) != expected_version:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.hset(key, mapping={
+                    "state": blob,
+                    "version": expected_version + 1,
+                    "updated_at": time.time()
+                })
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self._key(session_id))
+
+    def list_sessions(self) -> List[str]:
+        n = len(self.prefix)
+        return sorted(
+            (k.decode() if isinstance(k, bytes) else k)[n:]
+            for k in self.client.scan_iter(match=self.prefix + "*")
+        )
+
+    def updated_at(self, session_id: str) -> Optional[float]:
+        value = self.client.hget(self._key(session_id), "updated_at")
+        return float(value) if value is not None else None
+
+    def blob_refs(self, session_id: str) -> set:
+        state = self.client.hget(self._key(session_id), "state")
+        return blob_refs(self.serializer.loads(state)) if state is not None else set()
+
+    def rewrite(self, session_id: str) -> bool:
+        from redis.exceptions import WatchError
+
+        state, version = self.load_versioned(session_id)
+        if state is None:
+            return False
+        key = self._key(session_id)
+        blob = self._encode(state)
+        with self.client.pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(key)
+                if int(pipe.hget(key, "version") or 0) != version:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.hset(key, "state", blob)
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+
+_store: Optional[SessionStore] = None
+
+
+def create_session_store(kind: str = None) -> SessionStore:
+    kind = kind or SESSION_STORE
+    if kind == "file":
+        return FileSessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore()
+    if kind == "redis":
+        return RedisSessionStore()
+    raise ValueError(f"Unknown SESSION_STORE {kind!r} (expected file, sqlite or redis)")
+
+
+def get_session_store() -> SessionStore:
+    global _store
+    if _store is None:
+        _store = create_session_store()
+    return _store
+
+
+def migrate_sessions(store: SessionStore = None) -> int:
+    """Re-encode every stored session in the current format now rather than on its next write."""
+    store = store or get_session_store()
+    return sum(store.rewrite(session_id) for session_id in store.list_sessions())
+
+
 # ─────────────────────────────────────────
 # NEW: Conversation state helpers
 # ─────────────────────────────────────────
 
+@timed(STORAGE_SECONDS, "save")
 def save_conversation_state(session_id: str, state: dict) -> None:
     """
     state = {
         "job_title": str,
         "job_description": str,
         "resume_text": str,
-        "main_questions": [{"id":..., "text":...}, ...],   # all 10 original questions
+        "main_questions": [{"id":..., "text":..., "dimension":...}, ...],   # all 10 original questions
         "current_main_index": int,                           # which main question we're on (0-9)
         "followup_count": int,                               # how many follow-ups asked so far for current q
         "conversation_history": [                            # full Q&A so far
             {"question_id": ..., "question": ..., "answer": ..., "is_followup": bool}
         ],
-        "evaluations": []                                    # filled in at end
+        "evaluations": {                                     # per-turn background evaluation
+            "<turn index>": {"status": "pending|running|done|failed", "result": EvalOut | None, ...}
+        }
     }
     """
-    path = session_dir(session_id) / "conversation_state.json"
-    path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    get_session_store().save(session_id, state)
 
 
+@timed(STORAGE_SECONDS, "load")
 def load_conversation_state(session_id: str) -> dict:
-    path = session_dir(session_id) / "conversation_state.json"
-    if not path.exists():
-        return None
-    return json.loads(path.read_text(encoding="utf-8"))
\ No newline at end of file
+    return get_session_store().load(session_id)
+
+
+@timed(STORAGE_SECONDS, "load_versioned")
+def load_conversation_state_versioned(session_id: str) -> Tuple[Optional[dict], int]:
+    return get_session_store().load_versioned(session_id)
+
+
+@timed(STORAGE_SECONDS, "compare_and_set")
+def compare_and_set_conversation_state(session_id: str, state: dict, expected_version: int) -> bool:
+    """Save only if nobody (in any worker) has written the session since it was loaded."""
+    return get_session_store().compare_and_set(session_id, state, expected_version)
+
+
+@timed(STORAGE_SECONDS, "update")
+def update_conversation_state(session_id: str, mutate: Callable[[dict], None], attempts: int = 5) -> Optional[dict]:
+    """
+    Optimistic read-modify-write: load, apply mutate(state), CAS; on a
+    conflict reload and re-apply. Returns the saved state, or None if the
+    session doesn't exist.
+    """
+    store = get_session_store()
+    for _ in range(attempts):
+        state, version = store.load_versioned(session_id)
+        if state is None:
+            return None
+        mutate(state)
+        if store.compare_and_set(session_id, state, version):
+            return state
+    raise SessionConflictError(f"Session {session_id} kept changing; gave up after {attempts} attempts")
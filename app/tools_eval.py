@@ -1,36 +1,35 @@
+import asyncio
+import hashlib
 import re
 import os
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
 import json
-from openai import OpenAI
 
-def get_client() -> OpenAI:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError(
-            "OPENAI_API_KEY is not set. Set it in your environment before running."
-        )
-    return OpenAI(api_key=api_key)
+import numpy as np
+from openai import AsyncOpenAI
 
-client = get_client
-
-def extract_requirements(job_title: str, job_description: str) -> Dict[str, List[str]]:
-    text = (job_title + "\n" + job_description).lower()
-
-    skills = set(re.findall(
-        r"\b(python|sql|aws|gcp|azure|docker|kubernetes|fastapi|ml|nlp|pytorch|tensorflow|spark|airflow|dbt)\b",
-        text
-    ))
+from .llm_scheduler import LLMScheduler, estimate_tokens
+from .skills import get_requirements_extractor
 
+# "openai" - the provider's embeddings endpoint (EMBEDDING_MODEL)
+# "hashing" - a local feature-hashing embedding: no network, no key, deterministic
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "512"))   # inputs per embeddings request
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "20000"))
+HASHING_EMBEDDING_DIM = int(os.getenv("HASHING_EMBEDDING_DIM", "1024"))
 
-    responsibilities = []
+# Similarity that counts as "unrelated" / "fully on topic" for prescreen_score().
+# Each backend carries its own calibration (sim_floor / sim_ceil); set these to
+# override it. Calibrate with benchmarks/bench_tiered_eval --calibrate.
+EMBEDDING_SIM_FLOOR = os.getenv("EMBEDDING_SIM_FLOOR")
+EMBEDDING_SIM_CEIL = os.getenv("EMBEDDING_SIM_CEIL")
 
-    for line in job_description.splitlines():
-        l = line.strip()
-        if len(l) > 10 and any(k in l.lower() for k in ["responsib", "you will", "build", "design", "deploy", "develop", "own"]):
-            responsibilities.append(l[:220])
 
-    return {"skills": sorted(skills), "responsibilities": responsibilities[:12]}
+def extract_requirements(job_title: str, job_description: str) -> Dict[str, List[str]]:
+    """Skills (canonical taxonomy names) and responsibility lines of a job; see app/skills.py."""
+    return get_requirements_extractor().extract(job_title, job_description)
 
 def build_interview_qa_match_context(
     question: str,
@@ -47,28 +46,153 @@ Skills: {skills}
 Responsibilities: {resps}
 """
 
-def embed(text: str) -> List[float]:
-    resp = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=text
-    )
-    return resp.data[0].embedding
 
-def cosine_sim(a: List[float], b: List[float]) -> float:
-    a = np.array(a, dtype=np.float32)
-    b = np.array(b, dtype=np.float32)
-    denom = (np.linalg.norm(a) * np.linalg.norm(b)) + 1e-12
-    return float(np.dot(a, b) / denom)
+# ─────────────────────────────────────────
+# Embedding backends
+# ─────────────────────────────────────────
 
-def score_relevancy_embeddings(question, candidate_answer, requirements) -> Dict:
-    target_context = build_interview_qa_match_context(question, requirements)
+class EmbeddingBackend:
+    """Turns a list of texts into a (len(texts), dim) float32 matrix, one request per call."""
+    name = "backend"
+    sim_floor, sim_ceil = 0.0, 1.0
 
-    emb_answer = embed(candidate_answer)
-    emb_target = embed(target_context)
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
 
-    sim = cosine_sim(emb_answer, emb_target)
-    score = int(max(0, min(100, round(sim * 100))))
 
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    name = "openai"
+    sim_floor, sim_ceil = 0.15, 0.55    # typical text-embedding-3-small range; not fitted to recorded scores
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        model: str = EMBEDDING_MODEL,
+        scheduler: Optional[LLMScheduler] = None
+    ):
+        if client is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise RuntimeError(
+                    "OPENAI_API_KEY is not set. Set it in your environment or use EMBEDDING_BACKEND=hashing."
+                )
+            client = AsyncOpenAI(api_key=api_key)
+        self.client = client
+        self.model = model
+        self.scheduler = scheduler   # shares the chat client's RPM/TPM budget and retries
+        self.name = f"openai:{model}"
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        def call():
+            return self.client.embeddings.create(model=self.model, input=texts)
+
+        if self.scheduler is None:
+            resp = await call()
+        else:
+            estimated = sum(estimate_tokens(t) for t in texts)
+            resp = await self.scheduler.run(call, estimated)
+            if getattr(resp, "usage", None):
+                self.scheduler.record_usage(estimated, resp.usage.total_tokens)
+        rows = sorted(resp.data, key=lambda d: d.index)
+        return np.asarray([d.embedding for d in rows], dtype=np.float32)
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Signed feature hashing of word unigrams and bigrams with sublinear term
+    frequency. Much weaker than a learned embedding, but it needs nothing
+    outside the process, which is what tests and offline runs want.
+    """
+    sim_floor, sim_ceil = 0.0, 0.2      # bench_tiered_eval --calibrate on benchmarks/fixtures
+
+    def __init__(self, dim: int = HASHING_EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[str, int] = {}
+            for feature in self._features(text):
+                counts[feature] = counts.get(feature, 0) + 1
+            if not counts:
+                continue
+            hashes = np.fromiter(
+                (int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in counts),
+                dtype=np.uint64,
+                count=len(counts)
+            )
+            weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+            signs = np.where(hashes >> np.uint64(63), 1.0, -1.0).astype(np.float32)
+            np.add.at(out[row], (hashes % np.uint64(self.dim)).astype(np.int64), signs * weights)
+        return out
+
+
+def create_embedding_backend(
+    kind: str = None,
+    client: Optional[AsyncOpenAI] = None,
+    scheduler: Optional[LLMScheduler] = None
+) -> EmbeddingBackend:
+    kind = kind or EMBEDDING_BACKEND
+    if kind == "openai":
+        return OpenAIEmbeddingBackend(client, scheduler=scheduler)
+    if kind == "hashing":
+        return HashingEmbeddingBackend()
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {kind!r}")
+
+
+class EmbeddingCache:
+    """Normalized vectors keyed by SHA-256 of (backend, text); LRU-bounded."""
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(backend: str, text: str) -> str:
+        return hashlib.sha256(f"{backend}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        vec = self._data.get(key)
+        if vec is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return vec
+
+    def set(self, key: str, vec: np.ndarray) -> None:
+        self._data[key] = vec
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+# ─────────────────────────────────────────
+# Scoring
+# ─────────────────────────────────────────
+
+def normalize_rows(m: np.ndarray) -> np.ndarray:
+    return m / (np.linalg.norm(m, axis=1, keepdims=True) + 1e-12)
+
+
+def cosine_sim(a: Sequence[float], b: Sequence[float]) -> float:
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    denom = (np.linalg.norm(a) * np.linalg.norm(b)) + 1e-12
+    return float(np.dot(a, b) / denom)
+
+
+def feedback_for_score(score: int) -> Dict[str, List[str]]:
     strengths, weaknesses, tips = [], [], []
 
     if score >= 75:
@@ -87,12 +211,155 @@ def score_relevancy_embeddings(question, candidate_answer, requirements) -> Dict
         ])
 
     return {
-        "relevancy_score": score,
         "strengths": strengths[:4],
         "weaknesses": weaknesses[:4],
         "improvement_tips": tips[:4],
     }
 
+
+def answer_features(answer: str, requirements: Dict[str, List[str]]) -> Dict[str, int]:
+    mentioned = get_requirements_extractor().find_skills(answer)
+    return {
+        "words": len(re.findall(r"\w+", answer)),
+        "skill_hits": len(mentioned.intersection(requirements.get("skills", [])))
+    }
+
+
+# How prescreen_score() blends prescreen_components().
+PRESCREEN_WEIGHTS = {"relevance": 0.4, "coverage": 0.3, "substance": 0.3}
+
+
+def prescreen_components(row: dict, sim_floor: float, sim_ceil: float) -> Dict[str, float]:
+    """
+    The 0-1 parts of prescreen_score() for one score_sessions() row: topical
+    similarity (calibrated between sim_floor and sim_ceil), how many of the
+    job's skills the answer names, and whether it has any substance.
+    """
+    return {
+        "relevance": min(1.0, max(0.0, (row["similarity"] - sim_floor) / (sim_ceil - sim_floor))),
+        "coverage": min(1.0, row["skill_hits"] / 3),
+        "substance": min(1.0, row["words"] / 40),
+    }
+
+
+def prescreen_score(row: dict, sim_floor: float, sim_ceil: float) -> int:
+    """0-100 estimate of the LLM evaluator's score: a weighted blend of prescreen_components()."""
+    c = prescreen_components(row, sim_floor, sim_ceil)
+    return int(round(100 * sum(PRESCREEN_WEIGHTS[k] * v for k, v in c.items())))
+
+
+def prescreen_justification(row: dict, sim_floor: float, sim_ceil: float) -> str:
+    """Explains a prescreen_score() in terms of the three parts it blends."""
+    c, w = prescreen_components(row, sim_floor, sim_ceil), PRESCREEN_WEIGHTS
+    return (
+        f"Pre-screen score {prescreen_score(row, sim_floor, sim_ceil)} without an LLM call: "
+        f"topical relevance {c['relevance']:.2f} (embedding similarity {row['similarity']:.3f} "
+        f"on a {sim_floor:.2f}-{sim_ceil:.2f} scale, weight {w['relevance']}), "
+        f"skill coverage {c['coverage']:.2f} ({row['skill_hits']} of the job's skills named, weight {w['coverage']}), "
+        f"substance {c['substance']:.2f} ({row['words']} words, weight {w['substance']})."
+    )
+
+
+class EmbeddingScorer:
+    """
+    Scores answers by cosine similarity between the answer and a context
+    built from its question and the job requirements. All texts of a call —
+    every turn of one session or of many — are embedded in one batched
+    request (per EMBEDDING_BATCH_SIZE inputs), cache misses only, and the
+    similarities come out of one row-wise matrix product.
+    """
+
+    def __init__(self, backend: Optional[EmbeddingBackend] = None, cache: Optional[EmbeddingCache] = None):
+        self.backend = backend or create_embedding_backend()
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.requests = 0
+
+    def sim_range(self) -> Tuple[float, float]:
+        """(floor, ceil) for prescreen_score(): EMBEDDING_SIM_FLOOR / _CEIL where set, else the backend's."""
+        floor = self.backend.sim_floor if EMBEDDING_SIM_FLOOR is None else float(EMBEDDING_SIM_FLOOR)
+        ceil = self.backend.sim_ceil if EMBEDDING_SIM_CEIL is None else float(EMBEDDING_SIM_CEIL)
+        return floor, ceil
+
+    async def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Row-normalized embeddings of `texts`, in order."""
+        keys = [EmbeddingCache.key(self.backend.name, t) for t in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                continue
+            vec = self.cache.get(key)
+            if vec is None:
+                missing[key] = text
+            else:
+                vectors[key] = vec
+
+        if missing:
+            miss_keys = list(missing)
+            batches = [miss_keys[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(miss_keys), EMBEDDING_BATCH_SIZE)]
+            self.requests += len(batches)
+            matrices = await asyncio.gather(*(self.backend.embed([missing[k] for k in b]) for b in batches))
+            for batch, matrix in zip(batches, matrices):
+                for key, vec in zip(batch, normalize_rows(matrix)):
+                    self.cache.set(key, vec)
+                    vectors[key] = vec
+
+        return np.stack([vectors[k] for k in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
+
+    async def score_sessions(self, sessions: List[dict]) -> List[List[dict]]:
+        """
+        sessions: [{"job_title", "job_description", "turns": [{"question", "answer"}, ...]}, ...]
+        Returns one list of score dicts per session, turns in order.
+        """
+        answers: List[str] = []
+        contexts: List[str] = []
+        features: List[Dict[str, int]] = []
+        for session in sessions:
+            requirements = extract_requirements(session["job_title"], session["job_description"])
+            for turn in session["turns"]:
+                answers.append(turn["answer"])
+                contexts.append(build_interview_qa_match_context(turn["question"], requirements))
+                features.append(answer_features(turn["answer"], requirements))
+        if not answers:
+            return [[] for _ in sessions]
+
+        matrix = await self.embed_texts(answers + contexts)
+        sims = np.einsum("ij,ij->i", matrix[:len(answers)], matrix[len(answers):])
+        scores = np.clip(np.rint(sims * 100), 0, 100).astype(int)
+
+        results, pos = [], 0
+        for session in sessions:
+            rows = []
+            for _ in session["turns"]:
+                score, sim = int(scores[pos]), float(sims[pos])
+                rows.append({
+                    "relevancy_score": score,
+                    **feedback_for_score(score),
+                    "justification": f"Embedding similarity {sim:.3f} between the answer and the question/job requirements ({self.backend.name}).",
+                    "similarity": sim,
+                    **features[pos]
+                })
+                pos += 1
+            results.append(rows)
+        return results
+
+    async def score_turns(self, turns: List[dict], job_title: str, job_description: str) -> List[dict]:
+        sessions = [{"job_title": job_title, "job_description": job_description, "turns": turns}]
+        return (await self.score_sessions(sessions))[0]
+
+    def stats(self) -> dict:
+        return {"backend": self.backend.name, "requests": self.requests, "cache": self.cache.stats()}
+
+
+async def score_relevancy_embeddings(question, candidate_answer, requirements, scorer: Optional[EmbeddingScorer] = None) -> Dict:
+    scorer = scorer or EmbeddingScorer()
+    target_context = build_interview_qa_match_context(question, requirements)
+    emb_answer, emb_target = await scorer.embed_texts([candidate_answer, target_context])
+
+    sim = cosine_sim(emb_answer, emb_target)
+    score = int(max(0, min(100, round(sim * 100))))
+    return {"relevancy_score": score, **feedback_for_score(score)}
+
 if __name__ == "__main__":
     job_title = "Machine Learning Engineer"
     job_description = """
@@ -105,5 +372,5 @@ Responsibilities:
     candidate_answer = "I containerized a model with Docker and deployed it to AWS, adding monitoring and retraining triggers."
 
     reqs = extract_requirements(job_title, job_description)
-    result = score_relevancy_embeddings(question, candidate_answer, reqs)
-    print(json.dumps(result, indent=2))
\ No newline at end of file
+    result = asyncio.run(score_relevancy_embeddings(question, candidate_answer, reqs))
+    print(json.dumps(result, indent=2))
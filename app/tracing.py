@@ -0,0 +1,252 @@
+import json
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Opt-in request tracing. Each sampled request gets a trace whose spans
+# (pipeline stages, storage, LLM calls) are appended to TRACE_FILE as JSON
+# lines. W3C `traceparent` is honoured on the way in, returned on the
+# response and forwarded on outbound LLM requests. With TRACING_ENABLED=0
+# span() returns a shared no-op and the middleware is not installed.
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+# Share of requests without an incoming traceparent that are traced; an
+# incoming one carries the caller's sampling decision.
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+# Spans are buffered and written when their trace's root span ends, or
+# once this many are pending (long-running background work).
+TRACE_FLUSH_SPANS = int(os.getenv("TRACE_FLUSH_SPANS", "512"))
+
+_encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+
+class FileExporter:
+    """Appends finished spans to a JSON-lines file, one write per flush."""
+
+    def __init__(self, path: str = TRACE_FILE, flush_spans: int = TRACE_FLUSH_SPANS):
+        self.path = path
+        self.flush_spans = flush_spans
+        self.exported = 0
+        self._buffer: List[dict] = []
+        self._lock = threading.Lock()
+
+    def export(self, record: dict, flush: bool = False) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            if flush or len(self._buffer) >= self.flush_spans:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(_encode(r) + "\n" for r in self._buffer).encode("utf-8")
+        self.exported += len(self._buffer)
+        self._buffer.clear()
+        # O_APPEND and a single write keep lines from several workers intact
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+
+_exporter: Optional[FileExporter] = None
+
+
+def get_exporter() -> FileExporter:
+    global _exporter
+    if _exporter is None:
+        _exporter = FileExporter()
+    return _exporter
+
+
+def _new_id(hex_chars: int) -> str:
+    return "%0*x" % (hex_chars, random.getrandbits(hex_chars * 4) or 1)
+
+
+class Span:
+    """
+    One timed operation. Use as a context manager: it becomes the parent of
+    spans opened inside it (including in tasks created meanwhile) and is
+    exported when it exits, with status "error" if an exception escaped.
+    """
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attrs", "start", "_t0", "_token", "_root")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, root: bool = False, **attrs):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(16)
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self._root = root
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def __enter__(self):
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._t0
+        _current.reset(self._token)
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "status": "ok" if exc_type is None else "error",
+        }
+        if exc_type is not None:
+            record["error"] = f"{exc_type.__name__}: {exc}"
+        if self.attrs:
+            record["attrs"] = self.attrs
+        get_exporter().export(record, flush=self._root)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def traceparent(self) -> Optional[str]:
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+# The innermost open span; NOOP_SPAN inside an unsampled trace, so nothing under it is recorded
+_current: ContextVar[object] = ContextVar("trace_span", default=None)
+
+
+class _UnsampledRoot(_NoopSpan):
+    """Marks a request that was not sampled for as long as it runs."""
+    __slots__ = ("_token",)
+
+    def __enter__(self):
+        self._token = _current.set(NOOP_SPAN)
+        return self
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        return False
+
+
+def parse_traceparent(value: Optional[str]):
+    """(trace_id, parent span id, sampled) from a W3C traceparent header, or None if it is malformed."""
+    if not value:
+        return None
+    parts = value.strip().lower().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        version, flags = int(parts[0], 16), int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if version == 255 or parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def start_trace(name: str, traceparent: Optional[str] = None, **attrs):
+    """Root span for a request or a unit of background work, continuing `traceparent` if given."""
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    parent = parse_traceparent(traceparent)
+    if parent:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id, sampled = _new_id(32), None, random.random() < TRACE_SAMPLE_RATE
+    if not sampled:
+        return _UnsampledRoot()
+    return Span(name, trace_id, parent_id, root=True, **attrs)
+
+
+def span(name: str, **attrs):
+    """
+    `with span("save_state", session_id=sid) as s: ...` — a child of the
+    current span. Outside any trace it starts one, so background work
+    (evaluation workers, batch screening) is traced too.
+    """
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    parent = _current.get()
+    if parent is None:
+        return start_trace(name, **attrs)
+    if parent is NOOP_SPAN:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, **attrs)
+
+
+def current_span():
+    return _current.get() or NOOP_SPAN
+
+
+def inject_headers() -> Optional[Dict[str, str]]:
+    """traceparent for an outbound request made inside the current span, or None."""
+    parent = _current.get()
+    if parent is None or parent is NOOP_SPAN:
+        return None
+    return {"traceparent": parent.traceparent()}
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening the root span of each HTTP request (named
+    by route template once routing has run) and returning its traceparent
+    as a response header so a slow request can be found in TRACE_FILE.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = None
+        for key, value in scope.get("headers", ()):
+            if key == b"traceparent":
+                incoming = value.decode("latin-1")
+                break
+
+        root = start_trace(scope["method"], incoming, method=scope["method"], path=scope["path"])
+        header = root.traceparent()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set(status=message["status"])
+                if header:
+                    message["headers"] = list(message.get("headers", ())) + [(b"traceparent", header.encode("latin-1"))]
+            await send(message)
+
+        with root:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if isinstance(root, Span):
+                    root.name = f"{scope['method']} {route or 'unmatched'}"
@@ -0,0 +1,111 @@
+"""
+Latency of the analytics queries over a large synthetic evaluation history.
+
+Fills an AnalyticsIndex with `--sessions` finished interviews of `--turns`
+scored answers each, spread over `--jobs` job titles and 6 dimensions,
+loads it into the numpy columns, then times each query endpoint's work
+against the equivalent SQL GROUP BY on the same (indexed) table.
+
+    python -m benchmarks.bench_analytics --sessions 100000 --jobs 20
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.analytics import _ROW_COLUMNS, AnalyticsIndex, job_key
+
+DIMENSIONS = ["ML Engineering", "Data Engineering", "Software Engineering", "Collaboration", "Ownership", "Communication"]
+
+
+def fill(index: AnalyticsIndex, sessions: int, turns: int, jobs: int, seed: int) -> None:
+    rng = random.Random(seed)
+    now = time.time()
+    questions = [[f"Job {j} question {q}?" for q in range(10)] for j in range(jobs)]
+    difficulty = [[rng.uniform(-15, 15) for _ in range(10)] for _ in range(jobs)]
+    rows = []
+    for s in range(sessions):
+        j = s % jobs
+        title = f"Engineer {j}"
+        skill = rng.gauss(65, 12)
+        finished = now - rng.uniform(0, 90 * 86400)
+        for t in range(turns):
+            q = t % 10
+            score = None if rng.random() < 0.01 else max(0, min(100, round(skill + difficulty[j][q] + rng.gauss(0, 10))))
+            rows.append((
+                f"{s:012x}", title, job_key(title), "interview", t, questions[j][q], DIMENSIONS[q % len(DIMENSIONS)],
+                int(t >= 10), score, "llm" if score is not None else "failed", finished, finished
+            ))
+    with index._lock:
+        index._conn.execute("BEGIN")
+        index._conn.executemany(f"INSERT INTO evaluations ({_ROW_COLUMNS}) VALUES ({', '.join('?' * 12)})", rows)
+        index._conn.execute("COMMIT")
+
+
+def time_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    path = Path(tempfile.mkdtemp(prefix="bench-analytics-")) / "analytics.sqlite3"
+    index = AnalyticsIndex(str(path))
+    t0 = time.perf_counter()
+    fill(index, args.sessions, args.turns, args.jobs, args.seed)
+    print(f"inserted {args.sessions * args.turns} rows in {time.perf_counter() - t0:.1f} s "
+          f"({path.stat().st_size / 1e6:.0f} MB on disk)")
+    t0 = time.perf_counter()
+    index.refresh()
+    stats = index.stats()
+    print(f"loaded into columns in {time.perf_counter() - t0:.2f} s: {stats['rows']} rows, "
+          f"{stats['sessions']} sessions, {stats['column_bytes'] / 1e6:.0f} MB of columns")
+
+    job, key = "Engineer 3", job_key("Engineer 3")
+    conn = index._conn
+    cases = [
+        ("top-10 candidates for a job",
+         lambda: index.top_candidates(job, 10),
+         lambda: conn.execute(
+             "SELECT session_id, AVG(score) a FROM evaluations WHERE job_key = ? AND score IS NOT NULL"
+             " GROUP BY session_id ORDER BY a DESC LIMIT 10", (key,)).fetchall()),
+        ("top-10 for a job by dimension",
+         lambda: index.top_candidates(job, 10, dimension="Ownership"),
+         lambda: conn.execute(
+             "SELECT session_id, AVG(score) a FROM evaluations WHERE job_key = ? AND dimension = ? AND score IS NOT NULL"
+             " GROUP BY session_id ORDER BY a DESC LIMIT 10", (key, "Ownership")).fetchall()),
+        ("score distribution, all jobs",
+         lambda: index.score_distribution(),
+         lambda: conn.execute(
+             "SELECT MIN(score / 10, 9), COUNT(*) FROM evaluations WHERE score IS NOT NULL GROUP BY 1").fetchall()),
+        ("candidate-average distribution, one job",
+         lambda: index.score_distribution(job, per="candidate"),
+         lambda: conn.execute(
+             "SELECT MIN(CAST(a / 10 AS INT), 9), COUNT(*) FROM (SELECT AVG(score) a FROM evaluations"
+             " WHERE job_key = ? AND score IS NOT NULL GROUP BY session_id) GROUP BY 1", (key,)).fetchall()),
+        ("question difficulty, all jobs",
+         lambda: index.question_difficulty(limit=20),
+         lambda: conn.execute(
+             "SELECT question, AVG(score) a, COUNT(*) n FROM evaluations WHERE score IS NOT NULL AND is_followup = 0"
+             " GROUP BY question HAVING n >= 5 ORDER BY a LIMIT 20").fetchall()),
+    ]
+    print(f"\n{'query':40} {'columns ms':>11} {'sql ms':>9}")
+    for name, columnar, sql in cases:
+        print(f"{name:40} {time_ms(columnar, args.repeat):11.2f} {time_ms(sql, max(args.repeat // 4, 1)):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
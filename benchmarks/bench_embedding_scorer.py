@@ -0,0 +1,94 @@
+"""
+Embedding pre-screen tier: score every turn of a batch of sessions.
+
+"per-text" replays the old sketch (one embeddings request per string, no
+cache); "batched" is EmbeddingScorer (one request for all texts, one matrix
+product); "cached" repeats the batched run with a warm embedding cache.
+The OpenAI backend runs against the mock server; the hashing backend is
+fully local.
+
+    python -m benchmarks.bench_embedding_scorer --sessions 20 --turns 12 --latency 0.15
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from app.tools_eval import (
+    EmbeddingCache, EmbeddingScorer, HashingEmbeddingBackend, OpenAIEmbeddingBackend,
+    build_interview_qa_match_context, extract_requirements
+)
+from benchmarks.mock_openai import MockOpenAIServer
+
+JOB_TITLE = "Machine Learning Engineer"
+JOB_DESCRIPTION = """Responsibilities:
+- Build and deploy ML models
+- Develop data pipelines in Python and SQL
+- Work with AWS and Docker"""
+
+
+def make_sessions(n: int, turns: int) -> list:
+    return [{
+        "job_title": JOB_TITLE,
+        "job_description": JOB_DESCRIPTION,
+        "turns": [
+            {"question": f"Question {t}: tell me about a model you deployed.",
+             "answer": f"Candidate {s} answer {t}: I containerized a model with Docker and deployed it to AWS."}
+            for t in range(turns)
+        ]
+    } for s in range(n)]
+
+
+async def per_text(backend, sessions: list) -> int:
+    requests = 0
+    for session in sessions:
+        reqs = extract_requirements(session["job_title"], session["job_description"])
+        for turn in session["turns"]:
+            a = (await backend.embed([turn["answer"]]))[0]
+            b = (await backend.embed([build_interview_qa_match_context(turn["question"], reqs)]))[0]
+            float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-12))
+            requests += 2
+    return requests
+
+
+async def run(label: str, backend, sessions: list) -> None:
+    t0 = time.perf_counter()
+    requests = await per_text(backend, sessions)
+    old = time.perf_counter() - t0
+
+    scorer = EmbeddingScorer(backend, EmbeddingCache())
+    t0 = time.perf_counter()
+    await scorer.score_sessions(sessions)
+    batched = time.perf_counter() - t0
+    batched_requests = scorer.requests
+
+    t0 = time.perf_counter()
+    await scorer.score_sessions(sessions)
+    cached = time.perf_counter() - t0
+
+    turns = sum(len(s["turns"]) for s in sessions)
+    print(f"{label:>8}: {turns} turns  per-text={old * 1e3:8.1f} ms ({requests} requests)  "
+          f"batched={batched * 1e3:7.1f} ms ({batched_requests} requests)  cached={cached * 1e3:6.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.15)
+    args = parser.parse_args()
+
+    sessions = make_sessions(args.sessions, args.turns)
+    asyncio.run(run("hashing", HashingEmbeddingBackend(), sessions))
+    with MockOpenAIServer(latency_s=args.latency) as base_url:
+        async def openai_run():
+            client = AsyncOpenAI(api_key="mock", base_url=base_url)
+            await run("openai", OpenAIEmbeddingBackend(client), sessions)
+            await client.close()
+        asyncio.run(openai_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Tokens sent and wall time of evaluating one interview per turn versus in one
+batched request, against the mock server (which bills ~4 characters per
+prompt token and streams output at --token-delay per 4-character chunk, so a
+longer batched answer costs generation time).
+
+    python -m benchmarks.bench_eval_batching --turns 6 12 --resume-tokens 4000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from openai import AsyncOpenAI
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+
+from app.evaluation import evaluate_turns
+from app.llm_questions import OpenAIToolCallingLLM
+from benchmarks.bench_finish_interview import make_turns
+from benchmarks.mock_openai import MockOpenAIServer
+
+JOB_TITLE = "Machine Learning Engineer"
+JOB_DESCRIPTION = "Build and deploy ML models. Develop data pipelines in Python and SQL on AWS. " * 10
+RESUME_LINE = "Built churn models with LightGBM, deployed on AWS with Docker and FastAPI. "
+
+
+async def run(server: MockOpenAIServer, turns: list, resume: str, mode: str) -> dict:
+    app = server.app
+    requests_before, tokens_before = app.state.requests, app.state.prompt_tokens
+    llm = OpenAIToolCallingLLM(client=AsyncOpenAI(api_key="mock", base_url=server.base_url), cache=None)
+    t0 = time.perf_counter()
+    results = await evaluate_turns(llm, turns, JOB_TITLE, JOB_DESCRIPTION, resume, mode=mode)
+    elapsed = time.perf_counter() - t0
+    await llm.aclose()
+    assert all(r.status == "ok" for r in results)
+    return {
+        "requests": app.state.requests - requests_before,
+        "prompt_tokens": app.state.prompt_tokens - tokens_before,
+        "elapsed": elapsed
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, nargs="+", default=[6, 12])
+    parser.add_argument("--resume-tokens", type=int, default=4000)
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    args = parser.parse_args()
+
+    resume = RESUME_LINE * (args.resume_tokens * 4 // len(RESUME_LINE))
+    server = MockOpenAIServer(latency_s=args.latency, token_delay_s=args.token_delay)
+    with server:
+        for n in args.turns:
+            turns = make_turns(n)
+            per_turn = asyncio.run(run(server, turns, resume, "per_turn"))
+            batched = asyncio.run(run(server, turns, resume, "batched"))
+            for label, r in (("per_turn", per_turn), ("batched", batched)):
+                print(f"turns={n:3d} {label:>8}: requests={r['requests']:3d}  "
+                      f"prompt_tokens={r['prompt_tokens']:7d}  elapsed={r['elapsed'] * 1e3:7.0f} ms")
+            print(f"           tokens saved: {1 - batched['prompt_tokens'] / per_turn['prompt_tokens']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
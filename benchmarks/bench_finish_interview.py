@@ -0,0 +1,69 @@
+"""
+Wall time of evaluating one interview with a fixed-latency fake LLM.
+
+Sequential evaluation costs N x latency; the bounded fan-out in
+app.evaluation should land close to 1 x latency once concurrency >= N.
+
+    python -m benchmarks.bench_finish_interview --turns 12 --latency 0.25
+"""
+import argparse
+import asyncio
+import time
+
+from app.evaluation import evaluate_turns
+
+
+class FakeLLM:
+    def __init__(self, latency_s: float, fail_every: int = 0):
+        self.latency_s = latency_s
+        self.fail_every = fail_every
+        self.calls = 0
+
+    async def evaluate_with_tools(self, question, answer, job_title, job_description, resume):
+        self.calls += 1
+        n = self.calls
+        await asyncio.sleep(self.latency_s)
+        if self.fail_every and n % self.fail_every == 0:
+            raise RuntimeError("simulated provider error")
+        return {
+            "relevancy_score": 80,
+            "strengths": ["clear"],
+            "weaknesses": [],
+            "improvement_tips": [],
+            "justification": "fake",
+        }
+
+
+def make_turns(n: int) -> list:
+    return [
+        {"question_id": f"q{i}", "question": f"Question {i}?", "answer": f"Answer {i}.", "is_followup": False}
+        for i in range(n)
+    ]
+
+
+async def timed(turns: list, latency: float, concurrency: int, fail_every: int) -> tuple:
+    llm = FakeLLM(latency, fail_every)
+    t0 = time.perf_counter()
+    evals = await evaluate_turns(llm, turns, "ML Engineer", "JD", "Resume", concurrency=concurrency)
+    return time.perf_counter() - t0, evals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--fail-every", type=int, default=0, help="make every k-th call raise")
+    args = parser.parse_args()
+
+    turns = make_turns(args.turns)
+    print(f"turns={args.turns} latency={args.latency}s (N x latency = {args.turns * args.latency:.2f}s)")
+    for concurrency in (1, 4, args.turns):
+        elapsed, evals = asyncio.run(timed(turns, args.latency, concurrency, args.fail_every))
+        failed = sum(e.status == "failed" for e in evals)
+        in_order = [e.question_id for e in evals] == [t["question_id"] for t in turns]
+        print(f"  concurrency={concurrency:<3} wall={elapsed:.2f}s "
+              f"({elapsed / args.latency:.1f} x latency) failed={failed} in_order={in_order}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Cost of a repeated evaluate_with_tools call: cold (mock LLM round trip),
+warm from the in-memory LRU tier, and warm from the SQLite tier only.
+
+    python -m benchmarks.bench_llm_cache --latency 0.2 --repeats 1000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from openai import AsyncOpenAI
+
+from app.llm_cache import LLMResponseCache, MemoryLRUCache, SQLiteCache
+from app.llm_questions import OpenAIToolCallingLLM
+from benchmarks.mock_openai import MockOpenAIServer
+
+ARGS = (
+    "Tell me about a time you deployed a model to production.",
+    "I containerized a churn model with Docker and deployed it on AWS.",
+    "Machine Learning Engineer",
+    "Build and deploy ML models. Develop data pipelines in Python and SQL. " * 40,
+    "Built churn models with LightGBM, deployed on AWS with Docker and FastAPI. " * 60,
+)
+
+
+async def time_calls(llm: OpenAIToolCallingLLM, repeats: int) -> list:
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        await llm.evaluate_with_tools(*ARGS)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def fmt(samples: list) -> str:
+    med = statistics.median(samples)
+    return f"median={med * 1e6:10.1f} us  (n={len(samples)})"
+
+
+async def run(base_url: str, repeats: int) -> None:
+    memory = MemoryLRUCache()
+    disk = SQLiteCache(os.path.join(tempfile.mkdtemp(), "llm_cache.sqlite3"))
+    cache = LLMResponseCache([memory, disk])
+    llm = OpenAIToolCallingLLM(client=AsyncOpenAI(api_key="mock", base_url=base_url), cache=cache)
+
+    cold = await time_calls(llm, 1)
+    warm_memory = await time_calls(llm, repeats)
+
+    warm_disk = []
+    for _ in range(repeats):
+        memory.clear()
+        warm_disk.extend(await time_calls(llm, 1))
+
+    print("cold (LLM):        ", fmt(cold))
+    print("warm (memory LRU): ", fmt(warm_memory))
+    print("warm (sqlite):     ", fmt(warm_disk))
+    print(f"speedup memory={statistics.median(cold) / statistics.median(warm_memory):,.0f}x "
+          f"sqlite={statistics.median(cold) / statistics.median(warm_disk):,.0f}x")
+    print("stats:", cache.stats())
+    await llm.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args()
+    with MockOpenAIServer(latency_s=args.latency) as base_url:
+        asyncio.run(run(base_url, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Load benchmark for OpenAIToolCallingLLM against the local mock server.
+
+Each simulated session issues the calls one interview makes (question
+generation, two follow-ups, one evaluation per turn) while a ticker task
+measures event-loop lag. `--sync-baseline` replays the same load through the
+blocking `OpenAI` client the class used to wrap, for comparison.
+
+    python -m benchmarks.bench_llm_client --sessions 50 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from openai import AsyncOpenAI, OpenAI
+
+# Every simulated session sends identical payloads; measure the client, not the cache.
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+
+from app.llm_questions import OpenAIToolCallingLLM
+from benchmarks.mock_openai import MockOpenAIServer
+
+JOB_TITLE = "Machine Learning Engineer"
+JOB_DESCRIPTION = "Build and deploy ML models. Develop data pipelines in Python and SQL on AWS."
+RESUME = "Built churn models with LightGBM, deployed on AWS with Docker and FastAPI."
+
+
+class SyncClientLLM(OpenAIToolCallingLLM):
+    """The pre-async behaviour: a blocking client called from inside `async def`."""
+
+    def __init__(self, base_url: str):
+        super().__init__(client=AsyncOpenAI(api_key="mock", base_url=base_url))
+        self.sync_client = OpenAI(api_key="mock", base_url=base_url)
+
+    async def _complete(self, system, payload, json_mode=True):
+        resp = self.sync_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": json.dumps(payload)},
+            ],
+        )
+        return resp.choices[0].message.content
+
+
+async def run_session(llm: OpenAIToolCallingLLM, turns: int) -> int:
+    calls = 1
+    await llm.generate_role_specific_questions(JOB_TITLE, JOB_DESCRIPTION, RESUME)
+    history = []
+    for n in (1, 2):
+        history.append({"question": "Tell me about a project.", "answer": "I built a pipeline."})
+        await llm.generate_followup_question("Tell me about a project.", "I built a pipeline.", n, history)
+        calls += 1
+    await asyncio.gather(*[
+        llm.evaluate_with_tools("Tell me about a project.", "I built a pipeline.", JOB_TITLE, JOB_DESCRIPTION, RESUME)
+        for _ in range(turns)
+    ])
+    return calls + turns
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - t0 - interval)
+    return worst
+
+
+async def run(llm: OpenAIToolCallingLLM, sessions: int, turns: int) -> dict:
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+    t0 = time.perf_counter()
+    calls = await asyncio.gather(*[run_session(llm, turns) for _ in range(sessions)])
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    return {
+        "requests": sum(calls),
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(sum(calls) / elapsed, 1),
+        "max_loop_lag_ms": round(await lag_task * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=12, help="evaluations per session")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock completion latency (s)")
+    parser.add_argument("--sync-baseline", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    with MockOpenAIServer(latency_s=args.latency) as base_url:
+        os.environ["OPENAI_BASE_URL"] = base_url
+        llm = OpenAIToolCallingLLM()
+        print("async client:", asyncio.run(run(llm, args.sessions, args.turns)))
+        if args.sync_baseline:
+            baseline = SyncClientLLM(base_url)
+            print("sync client: ", asyncio.run(run(baseline, args.sessions, args.turns)))
+
+
+if __name__ == "__main__":
+    main()
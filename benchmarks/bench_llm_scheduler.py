@@ -0,0 +1,91 @@
+"""
+Follow-up latency under a burst of background evaluations, with and without
+priority scheduling.
+
+A burst of `--evaluations` evaluate_with_tools calls (BATCH priority, like the
+background evaluation pool) lands at t=0 while `--followups` follow-up
+generations (INTERACTIVE) arrive one every `--interval` seconds. The "fifo"
+run sends the follow-ups at BATCH priority too, which is how every call was
+queued before the scheduler. Both runs go through the same RPM limit and the
+mock server answers a share of requests with 429 + Retry-After.
+
+    python -m benchmarks.bench_llm_scheduler --evaluations 300 --followups 30 --rpm 1200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+
+from app.llm_questions import OpenAIToolCallingLLM
+from app.llm_scheduler import LLMScheduler, Priority, llm_priority
+from benchmarks.mock_openai import MockOpenAIServer
+
+JOB_TITLE = "Machine Learning Engineer"
+JOB_DESCRIPTION = "Build and deploy ML models. Develop data pipelines in Python and SQL on AWS."
+RESUME = "Built churn models with LightGBM, deployed on AWS with Docker and FastAPI."
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(base_url: str, args, prioritized: bool) -> dict:
+    scheduler = LLMScheduler(args.concurrency, rpm=args.rpm, tpm=args.tpm, retry_base_s=0.05)
+    llm = OpenAIToolCallingLLM(
+        client=AsyncOpenAI(api_key="mock", base_url=base_url, max_retries=0),
+        cache=None,
+        scheduler=scheduler
+    )
+
+    async def evaluation() -> None:
+        with llm_priority(Priority.BATCH):
+            await llm.evaluate_with_tools("Tell me about a project.", "I built a pipeline.", JOB_TITLE, JOB_DESCRIPTION, RESUME)
+
+    async def followup(n: int) -> float:
+        await asyncio.sleep(n * args.interval)
+        t0 = time.perf_counter()
+        with llm_priority(Priority.INTERACTIVE if prioritized else Priority.BATCH):
+            await llm.generate_followup_question("Tell me about a project.", "I built a pipeline.", 1, [])
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    evaluations = asyncio.gather(*(evaluation() for _ in range(args.evaluations)))
+    followups = await asyncio.gather(*(followup(n) for n in range(args.followups)))
+    await evaluations
+    makespan = time.perf_counter() - t0
+    stats = scheduler.stats()
+    await llm.aclose()
+    return {"followups": followups, "makespan": makespan, "stats": stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--evaluations", type=int, default=300)
+    parser.add_argument("--followups", type=int, default=30)
+    parser.add_argument("--interval", type=float, default=0.25)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpm", type=int, default=1200)
+    parser.add_argument("--tpm", type=int, default=0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with MockOpenAIServer(latency_s=args.latency, rate_limit_rate=args.rate_limit_rate) as base_url:
+        for label, prioritized in (("fifo", False), ("priority", True)):
+            result = asyncio.run(run(base_url, args, prioritized))
+            lat = result["followups"]
+            print(f"{label:>8}: follow-up p50={statistics.median(lat) * 1e3:7.0f} ms  "
+                  f"p99={percentile(lat, 0.99) * 1e3:7.0f} ms  max={max(lat) * 1e3:7.0f} ms  "
+                  f"evaluation makespan={result['makespan']:5.1f}s")
+            stats = result["stats"]
+            print(f"          retries={stats['retries']} rate_limited={stats['rate_limited']} wait={stats['wait']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Per-call cost of the metrics instrumentation.
+
+Times a trivial sync function bare and under @timed, a trivial coroutine
+bare and under @llm_method, and a trivial endpoint served through
+httpx's ASGI transport with and without MetricsMiddleware. With
+METRICS_ENABLED=0 the decorators return the function itself and the
+middleware is not installed, so the "bare" rows are the disabled cost.
+
+    python -m benchmarks.bench_metrics_overhead --calls 200000 --requests 2000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.metrics import STAGE_SECONDS, MetricsMiddleware, Registry, llm_method, timed
+
+
+def work() -> int:
+    return 1
+
+
+async def async_work() -> int:
+    return 1
+
+
+def per_call_ns(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - t0) / calls * 1e9
+
+
+async def per_await_ns(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        await fn()
+    return (time.perf_counter() - t0) / calls * 1e9
+
+
+async def per_request_us(instrumented: bool, requests: int) -> float:
+    app = FastAPI()
+
+    @app.get("/ping/{n}")
+    def ping(n: int):
+        return {"n": n}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for n in range(50):
+            await client.get(f"/ping/{n}")
+        t0 = time.perf_counter()
+        for n in range(requests):
+            await client.get(f"/ping/{n}")
+    return (time.perf_counter() - t0) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"sync call       bare {per_call_ns(work, args.calls):8.0f} ns   @timed      "
+          f"{per_call_ns(timed(STAGE_SECONDS, 'bench')(work), args.calls):8.0f} ns")
+    bare = asyncio.run(per_await_ns(async_work, args.calls))
+    wrapped = asyncio.run(per_await_ns(llm_method(async_work), args.calls))
+    print(f"coroutine       bare {bare:8.0f} ns   @llm_method {wrapped:8.0f} ns")
+    print(f"HTTP request    bare {asyncio.run(per_request_us(False, args.requests)):8.1f} us   middleware  "
+          f"{asyncio.run(per_request_us(True, args.requests)):8.1f} us")
+
+    registry = Registry()
+    for i in range(20):
+        h = registry.histogram(f"bench_{i}_seconds", "bench", ("route",))
+        for r in range(20):
+            h.observe(0.01 * r, (f"/r{r}",))
+    t0 = time.perf_counter()
+    text = registry.render()
+    print(f"render 400 histogram series: {(time.perf_counter() - t0) * 1e3:.1f} ms, {len(text) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Prompt tokens and LLM time per interview with and without context compaction.
+
+Each of `--sessions` candidates (same posting) runs the calls of a full
+interview against the mock server: question generation, a follow-up after
+Q1 and Q2 (with the growing history), and evaluation of all 12 turns in
+`--eval-mode`. The resume is a realistic two-page extraction (repeated page
+header, duplicated bullets, page numbers) padded with `--resume-jobs` past
+jobs; the mock charges `--prefill` seconds per 1k uncached prompt tokens and
+reports repeated prefixes of 1024+ tokens as cached, like the real API.
+
+    python -m benchmarks.bench_prompt_compaction --sessions 5 --resume-jobs 8 --prefill 0.05
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from openai import AsyncOpenAI
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+
+from app.context import ContextBuilder
+from app.evaluation import evaluate_turns
+from app.llm_questions import OpenAIToolCallingLLM
+from benchmarks.mock_openai import MockOpenAIServer
+
+JOB_TITLE = "Senior Machine Learning Engineer"
+JOB_DESCRIPTION = """About the role
+We are looking for a Senior Machine Learning Engineer to join our growing platform team.
+Responsibilities:
+- Build and deploy ML models to production on AWS with Docker and Kubernetes
+- Develop data pipelines in Python and SQL using Airflow and dbt
+- You will own experiments end to end and communicate results to stakeholders
+- Design monitoring for model drift and data quality in Grafana
+Requirements:
+- 5+ years of experience with Python, PyTorch or TensorFlow, and SQL
+- Experience with MLOps, CI/CD and cloud infrastructure
+Benefits
+- Flexible hours, a learning budget and a home office allowance
+- Generous parental leave and health coverage for you and your family
+We are an equal opportunity employer and value diversity at our company. We do not discriminate
+on the basis of race, religion, color, national origin, gender, sexual orientation, age, marital
+status, veteran status, or disability status.
+"""
+
+HEADER = "Jane Doe | jane.doe@example.com | linkedin.com/in/janedoe | +1 555 123 4567"
+SKILLS = ["Python", "SQL", "PyTorch", "TensorFlow", "Airflow", "dbt", "Docker", "Kubernetes", "AWS",
+          "Spark", "Kafka", "Grafana", "React", "Java", "Tableau", "Excel", "Figma", "Salesforce"]
+BULLETS = [
+    "Built and deployed {s1} models serving {n} requests per day on {s2}",
+    "Designed {s1} data pipelines processing {n} GB per day with {s2}",
+    "Led a team of {k} engineers delivering a {s1} migration to {s2}",
+    "Reduced {s1} infrastructure cost by {k}0% by moving batch jobs to {s2}",
+    "Introduced {s1} dashboards and {s2} alerting used by {k} product teams",
+    "Mentored {k} junior engineers and ran the {s1} reading group",
+]
+
+
+def make_resume(jobs: int, seed: int) -> str:
+    rng = random.Random(seed)
+    lines = [HEADER, "SUMMARY", "Machine learning engineer with experience shipping models and data platforms.", "EXPERIENCE"]
+    for j in range(jobs):
+        lines.append(f"{rng.choice(['Software Engineer', 'Data Engineer', 'ML Engineer'])} - Company {j} (20{10 + j} - 20{11 + j})")
+        for _ in range(4):
+            s1, s2 = rng.sample(SKILLS, 2)
+            bullet = rng.choice(BULLETS).format(s1=s1, s2=s2, n=rng.randint(2, 900), k=rng.randint(2, 9))
+            lines.append(f"- {bullet}")
+            if rng.random() < 0.2:
+                lines.append(f"- {bullet}")          # duplicated bullet, as PDF extraction sometimes does
+        if j == jobs // 2:
+            lines += ["1", HEADER]                   # page break: page number + repeated header
+    lines += ["EDUCATION", "MSc Computer Science, Example University", "SKILLS", ", ".join(SKILLS), "2"]
+    return "\n".join(lines)
+
+
+QUESTIONS = [f"Tell me about a time you {topic}." for topic in (
+    "deployed a model to production", "optimized model performance", "built a data pipeline end to end",
+    "fixed a data quality problem", "designed a scalable service", "debugged a production incident",
+    "disagreed with a stakeholder", "mentored a teammate", "drove a project without being asked",
+    "cut scope to hit a deadline"
+)]
+ANSWER = (
+    "In my last role I containerized a churn model with Docker, deployed it on AWS behind FastAPI and "
+    "added drift monitoring in Grafana, which cut manual retraining work by half and gave the product "
+    "team a weekly view of model quality. I owned the rollout and wrote the runbook."
+)
+
+
+async def interview(llm: OpenAIToolCallingLLM, resume: str, eval_mode: str) -> None:
+    await llm.generate_questions_by_dimension(JOB_TITLE, JOB_DESCRIPTION, resume)
+    history, turns = [], []
+    for i, question in enumerate(QUESTIONS):
+        history.append({"question": question, "answer": ANSWER})
+        turns.append({"question_id": f"q{i}", "question": question, "answer": ANSWER, "is_followup": False})
+        if i < 2:
+            followup = await llm.generate_followup_question(question, ANSWER, i + 1, history)
+            history.append({"question": followup["text"], "answer": ANSWER})
+            turns.append({"question_id": followup["id"], "question": followup["text"], "answer": ANSWER, "is_followup": True})
+    results = await evaluate_turns(llm, turns, JOB_TITLE, JOB_DESCRIPTION, resume, mode=eval_mode)
+    assert all(r.status == "ok" for r in results)
+
+
+async def run(server: MockOpenAIServer, args, compaction: bool) -> dict:
+    app = server.app
+    before = (app.state.requests, app.state.prompt_tokens, app.state.cached_tokens)
+    llm = OpenAIToolCallingLLM(
+        client=AsyncOpenAI(api_key="mock", base_url=server.base_url, max_retries=0),
+        cache=None,
+        context=ContextBuilder(compaction=compaction)
+    )
+    t0 = time.perf_counter()
+    for n in range(args.sessions):
+        await interview(llm, make_resume(args.resume_jobs, seed=n), args.eval_mode)
+    elapsed = time.perf_counter() - t0
+    await llm.aclose()
+    return {
+        "compaction": compaction,
+        "requests": app.state.requests - before[0],
+        "prompt_tokens_per_interview": (app.state.prompt_tokens - before[1]) // args.sessions,
+        "cached_tokens_per_interview": (app.state.cached_tokens - before[2]) // args.sessions,
+        "seconds_per_interview": round(elapsed / args.sessions, 3)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--resume-jobs", type=int, default=8)
+    parser.add_argument("--eval-mode", choices=["per_turn", "batched"], default="per_turn")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--prefill", type=float, default=0.05, help="mock seconds per 1k uncached prompt tokens")
+    args = parser.parse_args()
+
+    results = []
+    for compaction in (False, True):
+        server = MockOpenAIServer(latency_s=args.latency, prefill_s_per_1k=args.prefill)
+        with server:
+            results.append(asyncio.run(run(server, args, compaction)))
+        print(results[-1])
+    raw, compact = results
+    print(f"prompt tokens saved: {1 - compact['prompt_tokens_per_interview'] / raw['prompt_tokens_per_interview']:.0%}  "
+          f"time saved: {1 - compact['seconds_per_interview'] / raw['seconds_per_interview']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Question-set latency and LLM calls for a stream of postings, with and without
+the question bank.
+
+`--postings` postings are drawn from a handful of role families, each posted
+under varied titles ("Senior ML Engineer", "Machine Learning Engineer II")
+with JDs that list overlapping subsets of the family's skills. "llm" generates
+questions for every posting, as start_interview used to; "bank" goes through
+build_question_set, so only the first posting of a family (and any posting
+too far from every stored role) has a full set generated; bank hits only ask
+for `--resume-questions` questions about the resume. First checks that a
+posting with a stored role's title but another family's stack never hits.
+
+    python -m benchmarks.bench_question_bank --postings 300 --latency 0.8
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+
+from app.llm_questions import OpenAIToolCallingLLM
+from app.question_bank import QUESTION_BANK_RESUME_QUESTIONS, QuestionBank, build_question_set
+from benchmarks.mock_openai import MockOpenAIServer
+
+RESUME = "Built churn models with LightGBM, deployed on AWS with Docker and FastAPI."
+
+FAMILIES = {
+    ("Machine Learning Engineer", "ML Engineer", "MLE", "ML Eng"): [
+        "python", "pytorch", "tensorflow", "docker", "kubernetes", "aws", "mlops", "sql", "spark"
+    ],
+    ("Data Scientist", "DS", "Data Scientist, Growth"): [
+        "python", "sql", "statistics", "a/b testing", "pandas", "scikit-learn", "tableau", "machine learning"
+    ],
+    ("Data Engineer", "DE", "Data Engineer, Platform"): [
+        "python", "sql", "airflow", "spark", "kafka", "dbt", "snowflake", "aws"
+    ],
+    ("Backend Engineer", "Backend Developer", "Backend Software Engineer"): [
+        "python", "go", "postgresql", "redis", "docker", "kubernetes", "grpc", "microservices"
+    ],
+    ("Frontend Engineer", "Frontend Developer", "Frontend Software Engineer"): [
+        "javascript", "typescript", "react", "css", "html", "graphql", "webpack", "jest"
+    ],
+    ("DevOps Engineer", "Site Reliability Engineer", "DevOps Eng"): [
+        "kubernetes", "terraform", "aws", "docker", "prometheus", "grafana", "ci/cd", "linux"
+    ],
+}
+SENIORITY = ["", "Senior ", "Sr. ", "Lead ", "Staff ", "Junior "]
+LEVELS = ["", "", " II", " III"]
+
+
+def make_postings(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    postings = []
+    for _ in range(n):
+        titles, skills = rng.choice(list(FAMILIES.items()))
+        title = rng.choice(SENIORITY) + rng.choice(titles) + rng.choice(LEVELS)
+        listed = rng.sample(skills, k=rng.randint(len(skills) - 2, len(skills)))
+        jd = (
+            f"We are hiring a {title}.\n"
+            f"Requirements: {', '.join(listed)}.\n"
+            "You will own projects end to end and work closely with product."
+        )
+        postings.append((title, jd))
+    return postings
+
+
+def jd_for(title: str, skills: list) -> str:
+    return f"We are hiring a {title}.\nRequirements: {', '.join(skills)}.\nYou will own projects end to end."
+
+
+def stack_check(min_similarity: float) -> int:
+    """
+    Same title, different stack: store one family's skills under a generic
+    title, look up every other family's under a near-identical one. Every
+    lookup must miss; returns how many were (wrongly) served.
+    """
+    stacks = list(FAMILIES.values())
+    wrong = best = 0
+    for stored, asked in (("Software Engineer", "Senior Software Engineer"), ("Engineer", "Engineer II")):
+        for i, a in enumerate(stacks):
+            bank = QuestionBank(path="", min_similarity=min_similarity)
+            bank.store(stored, jd_for(stored, a), {"dim": [{"id": "q1", "text": "Q?"}]})
+            for j, b in enumerate(stacks):
+                if i == j:
+                    continue
+                questions, similarity = bank.lookup(asked, jd_for(asked, b))
+                wrong += questions is not None
+                best = max(best, similarity)
+    print(f"same title, different stack: {wrong} served (must be 0); highest title+skill similarity {best:.3f}")
+    return wrong
+
+
+def summary(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] * 1000, 2)
+    }
+
+
+async def run(base_url: str, postings: list, use_bank: bool, args) -> dict:
+    llm = OpenAIToolCallingLLM(
+        client=AsyncOpenAI(api_key="mock", base_url=base_url, max_retries=0),
+        cache=None
+    )
+    bank = QuestionBank(path="", min_similarity=args.min_similarity) if use_bank else None
+    latencies, sources = [], []
+    for title, jd in postings:
+        t0 = time.perf_counter()
+        if bank is None:
+            await llm.generate_role_specific_questions(title, jd, RESUME)
+            source = "llm"
+        else:
+            _, source = await build_question_set(llm, bank, title, jd, RESUME, resume_questions=args.resume_questions)
+        latencies.append(time.perf_counter() - t0)
+        sources.append(source)
+    await llm.aclose()
+    result = {"mode": "bank" if use_bank else "llm", **summary(latencies)}
+    result["bank_hits"] = sources.count("bank")
+    if bank is not None:
+        result["hit_rate"] = bank.stats()["hit_rate"]
+        result["avg_lookup_ms"] = bank.stats()["avg_lookup_ms"]
+        result["roles_stored"] = bank.stats()["roles"]
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--postings", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.8, help="mock seconds per completion")
+    parser.add_argument("--min-similarity", type=float, default=0.8)
+    parser.add_argument("--resume-questions", type=int, default=QUESTION_BANK_RESUME_QUESTIONS, help="fresh resume questions per bank hit")
+    args = parser.parse_args()
+
+    if stack_check(args.min_similarity):
+        raise SystemExit(1)
+    postings = make_postings(args.postings)
+    for use_bank in (False, True):
+        server = MockOpenAIServer(latency_s=args.latency)
+        with server as base_url:
+            result = asyncio.run(run(base_url, postings, use_bank, args))
+            result["llm_calls"] = server.app.state.requests
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
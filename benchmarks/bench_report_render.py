@@ -0,0 +1,70 @@
+"""
+Cost of serving /report/{id}: rendering per format, the ETag hash, a cache hit.
+
+Builds the report inputs of a finished `--turns` interview from stored
+evaluation records the way get_report does, then times a full render in
+each format, computing the content-hash ETag, and a ReportCache lookup.
+
+    python -m benchmarks.bench_report_render --turns 12 --repeat 500
+"""
+import argparse
+import time
+
+from app.evaluation import eval_record, stored_evaluations
+from app.report import REPORT_FORMATS, ReportCache, iter_report, report_etag
+from app.schemas import EvalOut, QuestionOut
+from benchmarks.bench_prompt_compaction import ANSWER
+
+
+def finished_state(turns: int) -> dict:
+    history = [
+        {"question_id": f"q{i}", "question": f"Tell me about a time you shipped project {i}.", "answer": ANSWER, "is_followup": False}
+        for i in range(turns)
+    ]
+    evaluations = {
+        str(i): eval_record("done", EvalOut(
+            question_id=f"q{i}", response_text=ANSWER, relevancy_score=60 + i,
+            strengths=["Concrete example", "Clear ownership"], weaknesses=["Impact not quantified"],
+            improvement_tips=["Quantify the result", "Name the monitoring used"],
+            justification="Relevant and specific, but the business impact is vague."
+        ))
+        for i in range(turns)
+    }
+    return {"job_title": "ML Engineer", "conversation_history": history, "evaluations": evaluations}
+
+
+def time_us(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    state = finished_state(args.turns)
+
+    def inputs():
+        questions = [QuestionOut(id=t["question_id"], text=t["question"]) for t in state["conversation_history"]]
+        return state["job_title"], questions, stored_evaluations(state)
+
+    job_title, questions, evaluations = inputs()
+    cache = ReportCache()
+    print(f"load records -> EvalOut: {time_us(inputs, args.repeat):8.1f} us")
+    print(f"{'format':10} {'bytes':>7} {'render us':>10} {'etag us':>8} {'cache hit us':>13}")
+    for fmt in REPORT_FORMATS:
+        body = "".join(iter_report(fmt, job_title, questions, evaluations)).encode("utf-8")
+        etag = report_etag(fmt, job_title, questions, evaluations)
+        cache.put(etag, body)
+        render = time_us(lambda: "".join(iter_report(fmt, job_title, questions, evaluations)), args.repeat)
+        hashing = time_us(lambda: report_etag(fmt, job_title, questions, evaluations), args.repeat)
+        hit = time_us(lambda: cache.get(etag), args.repeat)
+        print(f"{fmt:10} {len(body):7} {render:10.1f} {hashing:8.1f} {hit:13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Requirements extraction time vs JD size (1 KB .. 1 MB) and taxonomy size.
+
+The Aho-Corasick extractor is run with the shipped taxonomy and with
+synthetic taxonomies of thousands of skills; time per MB should stay flat
+across JD sizes (linear) and across taxonomy sizes. "regex" is the old
+approach generalized: one alternation regex over every skill name.
+
+    python -m benchmarks.bench_requirements_extractor --taxonomy-sizes 2000 20000
+"""
+import argparse
+import random
+import re
+import string
+import time
+
+from app.skills import RequirementsExtractor, SkillTaxonomy
+
+JD_LINES = [
+    "Responsibilities:",
+    "- Build and deploy ML models to production on AWS with Docker and k8s",
+    "- Develop data pipelines in Python and SQL using Airflow and dbt",
+    "- You will own experiments end to end and communicate results to stakeholders",
+    "- Design monitoring for model drift and data quality in Grafana",
+    "Nice to have: PyTorch, scikit-learn, Spark, Kafka, Terraform and CI/CD experience.",
+    "We are a fast-growing team that values ownership, curiosity and clear writing.",
+    "Benefits include flexible hours, a learning budget and a home office allowance.",
+]
+
+
+def make_jd(size: int) -> str:
+    lines, total, rng = [], 0, random.Random(size)
+    while total < size:
+        line = rng.choice(JD_LINES)
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def synthetic_taxonomy(n: int) -> SkillTaxonomy:
+    shipped = SkillTaxonomy.load()
+    rng = random.Random(n)
+    skills = [{"name": name, "aliases": [a for a, c in shipped.patterns.items() if c == name and a != name]}
+              for name in shipped.categories]
+    while len(skills) < n:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+        skills.append({"name": word, "aliases": [word[:4] + "-" + word[4:], word + " framework"]})
+    return SkillTaxonomy(skills, shipped.responsibility_cues)
+
+
+def timed(fn, *args) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--taxonomy-sizes", type=int, nargs="+", default=[2_000, 20_000])
+    parser.add_argument("--regex-max-bytes", type=int, default=100_000, help="skip the slow regex baseline above this")
+    args = parser.parse_args()
+
+    jds = {size: make_jd(size) for size in args.sizes}
+    taxonomies = [("shipped", SkillTaxonomy.load())] + [(str(n), synthetic_taxonomy(n)) for n in args.taxonomy_sizes]
+
+    for label, taxonomy in taxonomies:
+        t0 = time.perf_counter()
+        extractor = RequirementsExtractor(taxonomy, cache_size=0)
+        build = time.perf_counter() - t0
+        names = sorted(taxonomy.patterns, key=len, reverse=True)
+        regex = re.compile(r"\b(?:" + "|".join(map(re.escape, names)) + r")\b")
+        print(f"taxonomy={label:>8} ({len(taxonomy.patterns)} patterns, automaton built in {build * 1e3:.0f} ms)")
+        for size, jd in jds.items():
+            t = timed(extractor.extract, "Machine Learning Engineer", jd)
+            line = f"  {size / 1000:7.0f} KB: aho-corasick={t * 1e3:8.1f} ms ({size / t / 1e6:5.2f} MB/s)"
+            if size <= args.regex_max_bytes:
+                r = timed(regex.findall, jd.lower())
+                line += f"  regex={r * 1e3:8.1f} ms ({size / r / 1e6:5.2f} MB/s)"
+            print(line)
+
+    extractor = RequirementsExtractor()
+    jd = jds[max(jds)]
+    extractor.extract("Machine Learning Engineer", jd)
+    print(f"memoized hit on the {max(jds) / 1000:.0f} KB JD: "
+          f"{timed(extractor.extract, 'Machine Learning Engineer', jd) * 1e3:.2f} ms (SHA-256 of the JD)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Resume extraction throughput over the sample PDFs in sessions/*/resume.pdf
+with 0 (thread), 1..N worker processes, plus event-loop stall while parsing
+and the cost of a cache hit.
+
+    python -m benchmarks.bench_resume_parse --max-workers 4 --rounds 3
+"""
+import argparse
+import asyncio
+import glob
+import os
+import statistics
+import time
+
+from app.resume_parser import ResumeParser
+
+
+def load_pdfs(pattern: str) -> list:
+    pdfs = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "rb") as f:
+            pdfs.append(f.read())
+    return pdfs
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: list) -> None:
+    """Records how late a periodic tick fires; large lags mean a blocked loop."""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - t0 - interval)
+
+
+async def run(pdfs: list, workers: int, rounds: int) -> None:
+    # cache_size=0 so every round really parses
+    parser = ResumeParser(workers=workers, cache_size=0, max_pages=10_000)
+    await parser.extract(pdfs[0])  # warm up the pool (spawn start-up)
+
+    stop, lags = asyncio.Event(), []
+    beat = asyncio.create_task(heartbeat(stop, 0.005, lags))
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(parser.extract(pdf) for pdf in pdfs))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await beat
+    parser.shutdown()
+
+    docs = len(pdfs) * rounds
+    label = "thread" if workers == 0 else f"{workers} proc"
+    print(f"{label:>8}: {docs / elapsed:8.1f} docs/s  elapsed={elapsed:6.2f}s  "
+          f"max loop lag={max(lags, default=0) * 1e3:7.1f} ms")
+
+
+async def run_cached(pdfs: list, repeats: int) -> None:
+    parser = ResumeParser(workers=0)
+    await parser.extract(pdfs[0])
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        await parser.extract(pdfs[0])
+        samples.append(time.perf_counter() - t0)
+    parser.shutdown()
+    print(f"cache hit: median={statistics.median(samples) * 1e6:8.1f} us  (n={repeats})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pattern", default="sessions/*/resume.pdf")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    pdfs = load_pdfs(args.pattern)
+    if not pdfs:
+        raise SystemExit(f"no PDFs match {args.pattern}")
+    print(f"{len(pdfs)} PDFs, {sum(map(len, pdfs)) / 1024:.0f} KiB, cpus={os.cpu_count()}")
+    for workers in range(0, args.max_workers + 1):
+        asyncio.run(run(pdfs, workers, args.rounds))
+    asyncio.run(run_cached(pdfs, 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Bytes per session and encode/decode time of the session encodings.
+
+First encodes one finished interview (resume, JD, 12 answered turns with
+evaluations) with every serializer, next to the indent=2 JSON sessions
+used to be written as. Then runs whole interviews through the SQLite and
+file stores per serializer, with and without resume/JD blob dedup, where
+`--jobs` job descriptions are shared by all candidates.
+msgpack and zstd rows need the 'msgpack' / 'zstandard' packages.
+
+    python -m benchmarks.bench_session_encoding --sessions 200 --jobs 3
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app import storage
+from app.lifecycle import tree_bytes
+from app.serialization import Serializer
+from benchmarks.bench_prompt_compaction import ANSWER, make_resume
+from benchmarks.bench_session_store import JD
+
+TURNS = 12
+SERIALIZERS = [("json", "none"), ("json", "gzip"), ("msgpack", "none"), ("msgpack", "zstd")]
+
+
+def session_state(candidate: int, job: int, turns: int = TURNS) -> dict:
+    state = {
+        "job_title": f"Machine Learning Engineer {job}",
+        "job_description": f"Role {job}.\n" + JD,
+        "resume_text": make_resume(8, seed=candidate),
+        "main_questions": [{"id": f"q{i}", "text": f"Question {i} about deploying models?"} for i in range(10)],
+        "question_source": "llm",
+        "current_main_index": 0,
+        "awaiting_followup": False,
+        "followup_counter": 0,
+        "conversation_history": [],
+        "evaluations": {},
+    }
+    for t in range(turns):
+        add_turn(state, t)
+    return state
+
+
+def add_turn(state: dict, t: int) -> None:
+    qid = f"q{t % 10}"
+    state["conversation_history"] = state["conversation_history"] + [{
+        "question_id": qid, "question": f"Question {t} about deploying models?",
+        "answer": f"Turn {t}: {ANSWER}",
+        "is_followup": t >= 10,
+    }]
+    state["evaluations"] = {**state["evaluations"], f"{qid}:{t}": {
+        "relevancy": 4, "clarity": 3, "depth": 4, "confidence": 3,
+        "feedback": "Concrete and relevant; could quantify the impact and name the monitoring used.",
+    }}
+    state["current_main_index"] = t % 10
+
+
+def time_us(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def available(serializers):
+    for fmt, compression in serializers:
+        try:
+            yield Serializer(fmt, compression)
+        except RuntimeError as e:
+            print(f"  {fmt}+{compression}: skipped ({e})")
+
+
+def encoding_table(repeat: int) -> None:
+    state = session_state(0, 0)
+    legacy = json.dumps(state, indent=2)
+    print(f"{'encoding':16} {'bytes':>8} {'encode us':>10} {'decode us':>10}")
+    print(f"{'json indent=2':16} {len(legacy.encode()):8} "
+          f"{time_us(lambda: json.dumps(state, indent=2), repeat):10.1f} {time_us(lambda: json.loads(legacy), repeat):10.1f}")
+    for ser in available(SERIALIZERS):
+        data = ser.dumps(state)
+        print(f"{ser.name:16} {len(data):8} "
+              f"{time_us(lambda: ser.dumps(state), repeat):10.1f} {time_us(lambda: ser.loads(data), repeat):10.1f}")
+
+
+def run_store(store, sessions: int, jobs: int) -> float:
+    """Creates and plays every session turn by turn; returns ms per turn."""
+    t0 = time.perf_counter()
+    for s in range(sessions):
+        sid = f"{s:012x}"
+        store.save(sid, session_state(s, s % jobs, turns=0))
+        for t in range(TURNS):
+            state, version = store.load_versioned(sid)
+            add_turn(state, t)
+            assert store.compare_and_set(sid, state, version)
+    return (time.perf_counter() - t0) / (sessions * TURNS) * 1000
+
+
+def store_table(sessions: int, jobs: int) -> None:
+    print(f"\n{sessions} sessions x {TURNS} turns, {jobs} shared JDs")
+    print(f"{'store':8} {'encoding':16} {'dedup':6} {'bytes/session':>14} {'ms/turn':>8}")
+    min_bytes = storage.SESSION_BLOB_MIN_BYTES
+    for ser in available(SERIALIZERS):
+        for dedup in (False, True):
+            storage.SESSION_BLOB_MIN_BYTES = min_bytes if dedup else 1 << 62
+            tmp = Path(tempfile.mkdtemp(prefix="bench-encoding-"))
+            db = tmp / "sessions.sqlite3"
+            sqlite = storage.SQLiteSessionStore(str(db), serializer=ser)
+            ms = run_store(sqlite, sessions, jobs)
+            sqlite._conn.execute("VACUUM")
+            sqlite._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            size = sum(os.path.getsize(p) for p in tmp.glob("sessions.sqlite3*"))
+            print(f"{'sqlite':8} {ser.name:16} {str(dedup):6} {size / sessions:14.0f} {ms:8.3f}")
+
+            files = storage.FileSessionStore(tmp / "files", serializer=ser)
+            ms = run_store(files, sessions, jobs)
+            print(f"{'file':8} {ser.name:16} {str(dedup):6} {tree_bytes(tmp / 'files') / sessions:14.0f} {ms:8.3f}")
+    storage.SESSION_BLOB_MIN_BYTES = min_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=3, help="distinct job descriptions shared by the candidates")
+    parser.add_argument("--repeat", type=int, default=200, help="encode/decode repetitions per encoding")
+    args = parser.parse_args()
+
+    encoding_table(args.repeat)
+    store_table(args.sessions, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
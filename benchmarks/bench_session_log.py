@@ -0,0 +1,90 @@
+"""
+Write amplification and per-turn latency as an interview gets longer:
+the old whole-document rewrite (json.dumps(state, indent=2) every turn)
+versus FileSessionStore's static file + append-only turn log.
+
+Bytes written are read from /proc/self/io (wchar), so this needs Linux.
+
+    python -m benchmarks.bench_session_log --turns 200 --fsync never
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from app.storage import FileSessionStore
+from benchmarks.bench_session_store import initial_state
+
+CHECKPOINTS = (10, 50, 100, 200, 400)
+
+
+def wchar() -> int:
+    for line in open("/proc/self/io"):
+        if line.startswith("wchar:"):
+            return int(line.split()[1])
+    return 0
+
+
+def add_turn(state: dict, t: int) -> None:
+    state["conversation_history"].append({
+        "question_id": f"q{t}", "question": f"Question {t}?",
+        "answer": "I deployed a churn model on AWS and cut retraining time in half. " * 3,
+        "is_followup": False,
+    })
+    state["evaluations"][str(t)] = {"status": "pending", "result": None, "error": None}
+    state["current_main_index"] = t
+
+
+class RewriteStore:
+    """The pre-log behaviour of save/load_conversation_state."""
+
+    def __init__(self, base: Path):
+        self.base = base
+
+    def load(self, sid: str) -> dict:
+        return json.loads((self.base / sid / "conversation_state.json").read_text(encoding="utf-8"))
+
+    def save(self, sid: str, state: dict) -> None:
+        d = self.base / sid
+        d.mkdir(parents=True, exist_ok=True)
+        (d / "conversation_state.json").write_text(json.dumps(state, indent=2), encoding="utf-8")
+
+
+def run(store, turns: int) -> list:
+    rows = []
+    store.save("s", initial_state())
+    window_t, window_b, n = 0.0, 0, 0
+    for t in range(1, turns + 1):
+        b0, t0 = wchar(), time.perf_counter()
+        state = store.load("s")
+        add_turn(state, t)
+        store.save("s", state)
+        window_t += time.perf_counter() - t0
+        window_b += wchar() - b0
+        n += 1
+        if t in CHECKPOINTS:
+            rows.append((t, window_t / n * 1000, window_b / n))
+            window_t, window_b, n = 0.0, 0, 0
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--fsync", default="never", choices=("always", "interval", "never"))
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-log-"))
+    stores = {
+        "rewrite": RewriteStore(tmp / "rewrite"),
+        f"log (fsync={args.fsync})": FileSessionStore(tmp / "log", fsync=args.fsync),
+    }
+    for name, store in stores.items():
+        print(name)
+        for turn, ms, nbytes in run(store, args.turns):
+            print(f"  turns {turn:>4}: {ms:7.3f} ms/turn  {nbytes:10,.0f} bytes written/turn")
+
+
+if __name__ == "__main__":
+    main()
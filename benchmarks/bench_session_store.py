@@ -0,0 +1,88 @@
+"""
+Per-turn write latency and throughput of the session store backends.
+
+Each simulated interview creates a session (JD + ~30 KB resume) and then
+runs the /submit-answer cycle once per turn: load, append a turn, CAS back.
+
+    python -m benchmarks.bench_session_store --sessions 50 --turns 12
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.bench_session_store --real-redis
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.storage import FileSessionStore, RedisSessionStore, SQLiteSessionStore
+
+RESUME = "Built churn models with LightGBM, deployed on AWS with Docker and FastAPI.\n" * 400
+JD = "Build and deploy ML models. Develop data pipelines in Python and SQL.\n" * 40
+
+
+def initial_state() -> dict:
+    return {
+        "job_title": "Machine Learning Engineer",
+        "job_description": JD,
+        "resume_text": RESUME,
+        "main_questions": [{"id": f"q{i}", "text": f"Question {i}?"} for i in range(10)],
+        "current_main_index": 0,
+        "awaiting_followup": False,
+        "followup_counter": 0,
+        "conversation_history": [],
+        "evaluations": {},
+    }
+
+
+def run(store, sessions: int, turns: int) -> dict:
+    latencies = []
+    t0 = time.perf_counter()
+    for s in range(sessions):
+        sid = f"bench{s:06d}"
+        store.save(sid, initial_state())
+        for t in range(turns):
+            t1 = time.perf_counter()
+            state, version = store.load_versioned(sid)
+            state["conversation_history"].append({
+                "question_id": f"q{t}", "question": f"Question {t}?",
+                "answer": "I deployed a churn model on AWS and cut retraining time in half. " * 3,
+                "is_followup": False,
+            })
+            state["current_main_index"] = t
+            assert store.compare_and_set(sid, state, version)
+            latencies.append(time.perf_counter() - t1)
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "turns_per_s": round(len(latencies) / elapsed),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--real-redis", action="store_true", help="use REDIS_URL instead of fakeredis")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-store-"))
+    stores = {
+        "file": FileSessionStore(tmp / "files"),
+        "sqlite": SQLiteSessionStore(str(tmp / "sessions.sqlite3")),
+    }
+    if args.real_redis:
+        stores["redis"] = RedisSessionStore()
+    else:
+        try:
+            import fakeredis
+            stores["redis (fakeredis)"] = RedisSessionStore(fakeredis.FakeRedis())
+        except ImportError:
+            print("fakeredis not installed; skipping the redis backend")
+
+    for name, store in stores.items():
+        print(f"{name:<18}", run(store, args.sessions, args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Visible follow-up latency with and without speculative pre-generation.
+
+`--candidates` candidates answer Q1 concurrently, typing `--words` words at
+`--wpm` words per minute and posting the answer-so-far every `--partial-every`
+seconds (the mock server's latency is the follow-up generation time). A
+`--rewrite-rate` share of them rewrite the second half of their answer just
+before submitting, so the speculation must be thrown away. "baseline" posts
+no partials; latency is measured from the final submission to having the
+follow-up question.
+
+    python -m benchmarks.bench_speculative_followup --candidates 40 --latency 1.0 --wpm 600
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+
+from app.llm_questions import OpenAIToolCallingLLM
+from app.speculation import FollowupSpeculator
+from benchmarks.mock_openai import MockOpenAIServer
+
+QUESTION = "Tell me about a machine learning system you took to production."
+VOCAB = (
+    "model pipeline data features training deployed docker aws latency drift monitoring "
+    "team stakeholders metrics experiment rollout retraining airflow python sql accuracy "
+    "customers churn dashboard alerts batch streaming kafka api fastapi tests review"
+).split()
+
+
+def make_answer(rng: random.Random, n: int) -> list:
+    return [rng.choice(VOCAB) for _ in range(n)]
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def candidate(n: int, llm, speculator, args, speculate: bool) -> float:
+    rng = random.Random(n)
+    words = make_answer(rng, args.words)
+    seconds_per_word = 60.0 / args.wpm
+    session_id = f"s{n}"
+
+    typed, next_partial = 0, args.partial_every
+    t_start = time.perf_counter()
+    while typed < len(words):
+        await asyncio.sleep(seconds_per_word)
+        typed += 1
+        if speculate and time.perf_counter() - t_start >= next_partial:
+            next_partial += args.partial_every
+            speculator.offer(session_id, "ml_q1", 1, QUESTION, " ".join(words[:typed]), [])
+
+    if rng.random() < args.rewrite_rate:
+        half = len(words) // 2
+        words = words[:half] + make_answer(rng, len(words) - half)
+    answer = " ".join(words)
+
+    t0 = time.perf_counter()
+    followup = await speculator.take(session_id, "ml_q1", 1, answer) if speculate else None
+    if followup is None:
+        history = [{"question": QUESTION, "answer": answer}]
+        await llm.generate_followup_question(QUESTION, answer, 1, history)
+    return time.perf_counter() - t0
+
+
+async def run(base_url: str, args, speculate: bool) -> dict:
+    llm = OpenAIToolCallingLLM(
+        client=AsyncOpenAI(api_key="mock", base_url=base_url, max_retries=0),
+        cache=None
+    )
+    speculator = FollowupSpeculator(llm, min_similarity=args.min_similarity, min_interval_s=args.min_interval)
+    latencies = await asyncio.gather(*(candidate(n, llm, speculator, args, speculate) for n in range(args.candidates)))
+    await llm.aclose()
+
+    result = {
+        "mode": "speculative" if speculate else "baseline",
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1)
+    }
+    if speculate:
+        stats = speculator.stats()
+        for k in ("started", "restarted", "hits", "misses", "hit_rate", "wasted_tokens"):
+            result[k] = stats[k]
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=1.0, help="mock seconds per completion")
+    parser.add_argument("--words", type=int, default=120)
+    parser.add_argument("--wpm", type=float, default=600, help="typing speed (sped up to keep the run short)")
+    parser.add_argument("--partial-every", type=float, default=0.5, help="seconds between partial posts")
+    parser.add_argument("--min-similarity", type=float, default=0.85, help="partial vs final answer to reuse")
+    parser.add_argument("--min-interval", type=float, default=1.0, help="minimum seconds between restarts")
+    parser.add_argument("--rewrite-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    for speculate in (False, True):
+        server = MockOpenAIServer(latency_s=args.latency)
+        with server as base_url:
+            result = asyncio.run(run(base_url, args, speculate))
+            result["llm_calls"] = server.app.state.requests
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Time-to-first-byte of the SSE endpoints versus their blocking counterparts.
+
+Runs the mock OpenAI backend with a time-to-first-token and per-chunk delay,
+serves app.main in a background uvicorn, and compares:
+  /submit-answer          vs /submit-answer/stream     (follow-up generation)
+  /finish-interview       vs /finish-interview/stream  (evaluations + report)
+
+    python -m benchmarks.bench_streaming --latency 0.3 --token-delay 0.03
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.mock_openai import BackgroundServer, MockOpenAIServer
+
+REPO = Path(__file__).resolve().parent.parent
+SAMPLE_RESUME = next(REPO.glob("sessions/*/resume.pdf"))
+
+
+async def start(client: httpx.AsyncClient) -> dict:
+    r = await client.post(
+        "/start-interview",
+        data={"job_title": "Machine Learning Engineer", "job_description": "Build and deploy ML models in Python."},
+        files={"resume_file": ("resume.pdf", SAMPLE_RESUME.read_bytes(), "application/pdf")},
+    )
+    r.raise_for_status()
+    return r.json()
+
+
+async def timed_post(client: httpx.AsyncClient, url: str, **kwargs) -> tuple:
+    """Return (ttfb, total, body) for a request, reading the body as a stream."""
+    t0 = time.perf_counter()
+    ttfb = None
+    chunks = []
+    async with client.stream("POST", url, **kwargs) as r:
+        r.raise_for_status()
+        async for chunk in r.aiter_text():
+            if ttfb is None:
+                ttfb = time.perf_counter() - t0
+            chunks.append(chunk)
+    return ttfb, time.perf_counter() - t0, "".join(chunks)
+
+
+async def run(base_url: str) -> None:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        for label, suffix in (("blocking", ""), ("stream  ", "/stream")):
+            session = await start(client)
+            sid, q = session["session_id"], session["question"]
+            answer = {"session_id": sid, "question_id": q["id"], "answer": "I deployed a churn model on AWS."}
+            ttfb, total, _ = await timed_post(client, f"/submit-answer{suffix}", json=answer)
+            print(f"{label} follow-up: ttfb={ttfb * 1000:7.1f} ms  total={total * 1000:7.1f} ms")
+
+            # Answer the rest without timing, then finish right away.
+            r = await client.post("/submit-answer", json={**answer, "question_id": "followup_q1"})
+            while not r.json()["interview_complete"]:
+                q = r.json()["question"]
+                r = await client.post("/submit-answer", json={**answer, "question_id": q["id"]})
+            ttfb, total, _ = await timed_post(client, f"/finish-interview{suffix}", data={"session_id": sid})
+            print(f"{label} finish:    ttfb={ttfb * 1000:7.1f} ms  total={total * 1000:7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3, help="mock time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.03, help="mock time per chunk (s)")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench-streaming-"))
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    with MockOpenAIServer(latency_s=args.latency, token_delay_s=args.token_delay) as llm_url:
+        os.environ["OPENAI_BASE_URL"] = llm_url
+        from app.main import app
+        with BackgroundServer(app) as app_url:
+            asyncio.run(run(app_url))
+
+
+if __name__ == "__main__":
+    main()
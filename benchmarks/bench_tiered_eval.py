@@ -0,0 +1,134 @@
+"""
+Tiered evaluation on the fixture set in benchmarks/fixtures/eval_fixtures.json.
+
+Each fixture turn carries a hand-assigned reference score
+(`reference_score`, what a reviewer expects the LLM evaluator to give it; not
+recorded LLM output). A fake LLM replays those scores with fixed latency, so
+the run measures what the pre-screen changes: how many LLM calls it saves and
+how far it moves the average score. Uses the offline hashing embedding backend
+with the similarity range the scorer would use in production (the backend's
+calibration unless EMBEDDING_SIM_FLOOR / _CEIL are set); exits non-zero if the
+call reduction or the score tolerance target is missed.
+
+--calibrate instead prints the range these fixtures suggest for the backend:
+the median similarity of answers scored <= 30 as the floor and of answers
+scored >= 75 as the ceiling, with the pre-screen MAE against the reference
+scores under the current and the suggested range.
+
+    python -m benchmarks.bench_tiered_eval --latency 0.3 --min-reduction 0.5 --tolerance 5
+    python -m benchmarks.bench_tiered_eval --calibrate
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from app.evaluation import EvalTierStats, evaluate_turns, evaluate_turns_tiered
+from app.tools_eval import EmbeddingScorer, HashingEmbeddingBackend, prescreen_score
+
+FIXTURES = Path(__file__).parent / "fixtures" / "eval_fixtures.json"
+
+
+class FixtureLLM:
+    def __init__(self, turns: list, latency_s: float):
+        self.scores = {t["answer"]: t["reference_score"] for t in turns}
+        self.latency_s = latency_s
+        self.calls = 0
+
+    async def evaluate_with_tools(self, question, answer, job_title, job_description, resume):
+        self.calls += 1
+        await asyncio.sleep(self.latency_s)
+        return {
+            "relevancy_score": self.scores[answer],
+            "strengths": [],
+            "weaknesses": [],
+            "improvement_tips": [],
+            "justification": "fixture",
+        }
+
+
+async def run(fixture: dict, args) -> dict:
+    turns = fixture["turns"]
+    job = (fixture["job_title"], fixture["job_description"], "")
+
+    baseline_llm = FixtureLLM(turns, args.latency)
+    t0 = time.perf_counter()
+    baseline = await evaluate_turns(baseline_llm, turns, *job, mode="per_turn")
+    baseline_s = time.perf_counter() - t0
+
+    tiered_llm = FixtureLLM(turns, args.latency)
+    stats = EvalTierStats()
+    scorer = EmbeddingScorer(HashingEmbeddingBackend())
+    t0 = time.perf_counter()
+    tiered = await evaluate_turns_tiered(
+        tiered_llm, scorer, turns, *job, mode="per_turn", low=args.low, high=args.high, stats=stats
+    )
+    tiered_s = time.perf_counter() - t0
+
+    cheap = [(b.relevancy_score, t.relevancy_score) for b, t in zip(baseline, tiered) if t.tier != "llm"]
+    return {
+        "turns": len(turns),
+        "baseline_calls": baseline_llm.calls,
+        "tiered_calls": tiered_llm.calls,
+        "baseline_avg": statistics.mean(e.relevancy_score for e in baseline),
+        "tiered_avg": statistics.mean(e.relevancy_score for e in tiered),
+        "prescreen_mae": statistics.mean(abs(a - b) for a, b in cheap) if cheap else 0.0,
+        "baseline_s": baseline_s,
+        "tiered_s": tiered_s,
+        "tiers": stats.stats(),
+    }
+
+
+async def calibrate(fixture: dict) -> None:
+    turns = fixture["turns"]
+    scorer = EmbeddingScorer(HashingEmbeddingBackend())
+    rows = await scorer.score_turns(turns, fixture["job_title"], fixture["job_description"])
+    pairs = [(row, t["reference_score"]) for row, t in zip(rows, turns)]
+
+    def mae(floor: float, ceil: float) -> float:
+        return statistics.mean(abs(prescreen_score(row, floor, ceil) - ref) for row, ref in pairs)
+
+    current = scorer.sim_range()
+    floor = statistics.median(row["similarity"] for row, ref in pairs if ref <= 30)
+    ceil = statistics.median(row["similarity"] for row, ref in pairs if ref >= 75)
+    print(f"backend={scorer.backend.name}  turns={len(turns)}")
+    print(f"current:   floor={current[0]:.2f}  ceil={current[1]:.2f}  pre-screen MAE {mae(*current):.1f}")
+    print(f"suggested: floor={floor:.2f}  ceil={ceil:.2f}  pre-screen MAE {mae(floor, ceil):.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--low", type=int, default=20)
+    parser.add_argument("--high", type=int, default=85)
+    parser.add_argument("--min-reduction", type=float, default=0.5)
+    parser.add_argument("--tolerance", type=float, default=5.0, help="max change in average score (points)")
+    parser.add_argument("--calibrate", action="store_true", help="print the similarity range the fixtures suggest")
+    args = parser.parse_args()
+
+    fixture = json.loads(FIXTURES.read_text(encoding="utf-8"))
+    if args.calibrate:
+        asyncio.run(calibrate(fixture))
+        return
+
+    r = asyncio.run(run(fixture, args))
+    reduction = 1 - r["tiered_calls"] / r["baseline_calls"]
+    delta = r["tiered_avg"] - r["baseline_avg"]
+    floor, ceil = EmbeddingScorer(HashingEmbeddingBackend()).sim_range()
+    print(f"turns={r['turns']}  band=[{args.low}, {args.high}]  similarity range=[{floor:.2f}, {ceil:.2f}]")
+    print(f"LLM calls: all-LLM={r['baseline_calls']}  tiered={r['tiered_calls']}  reduction={reduction:.0%}")
+    print(f"average score: all-LLM={r['baseline_avg']:.1f}  tiered={r['tiered_avg']:.1f}  delta={delta:+.1f}  "
+          f"(pre-screened answers: MAE {r['prescreen_mae']:.1f})")
+    print(f"wall time: all-LLM={r['baseline_s'] * 1e3:.0f} ms  tiered={r['tiered_s'] * 1e3:.0f} ms")
+    print("tiers:", json.dumps(r["tiers"]))
+
+    ok = reduction >= args.min_reduction and abs(delta) <= args.tolerance
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
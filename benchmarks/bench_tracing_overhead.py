@@ -0,0 +1,75 @@
+"""
+Per-span cost of request tracing, and what a sampling profile costs the app.
+
+Times `with span(...)` for a trace of `--depth` nested spans with tracing
+off, on, and on but unsampled (an incoming traceparent with the sampled
+flag cleared), exporting to a temporary file. Then runs the same CPU-bound
+coroutine workload bare and while profile() samples the process.
+
+    python -m benchmarks.bench_tracing_overhead --traces 20000 --depth 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from app import tracing
+from app.profiling import profile
+
+
+def run_traces(traces: int, depth: int, traceparent=None) -> float:
+    t0 = time.perf_counter()
+    for _ in range(traces):
+        with tracing.start_trace("bench", traceparent):
+            for d in range(depth - 1):
+                with tracing.span("child", depth=d):
+                    pass
+    return (time.perf_counter() - t0) / (traces * depth) * 1e9
+
+
+async def workload(tasks: int) -> float:
+    async def work():
+        for _ in range(200):
+            sum(i * i for i in range(200))
+            await asyncio.sleep(0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(work() for _ in range(tasks)))
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--traces", type=int, default=20000)
+    parser.add_argument("--depth", type=int, default=5, help="spans per trace")
+    parser.add_argument("--tasks", type=int, default=50, help="coroutines in the profiled workload")
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    tracing._exporter = tracing.FileExporter(path)
+
+    tracing.TRACING_ENABLED = False
+    off = run_traces(args.traces, args.depth)
+    tracing.TRACING_ENABLED = True
+    unsampled = run_traces(args.traces, args.depth, "00-" + "1" * 32 + "-" + "2" * 16 + "-00")
+    on = run_traces(args.traces, args.depth)
+    size = os.path.getsize(path)
+    print(f"per span: off {off:6.0f} ns   unsampled {unsampled:6.0f} ns   sampled+exported {on:6.0f} ns   "
+          f"({tracing.get_exporter().exported} spans, {size / tracing.get_exporter().exported:.0f} B/span)")
+
+    bare = asyncio.run(workload(args.tasks))
+
+    async def profiled_run():
+        sampling = asyncio.create_task(profile(bare * 2, args.interval_ms))
+        elapsed = await workload(args.tasks)
+        return elapsed, await sampling
+
+    profiled, stacks = asyncio.run(profiled_run())
+    print(f"workload: bare {bare * 1000:.0f} ms   while profiling every {args.interval_ms:g} ms {profiled * 1000:.0f} ms "
+          f"(+{profiled / bare - 1:.1%}), {sum(stacks.values())} samples in {len(stacks)} stacks")
+
+
+if __name__ == "__main__":
+    main()
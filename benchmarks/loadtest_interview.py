@@ -0,0 +1,393 @@
+"""
+Full interview flow under load: the real app, a mock LLM, many candidates.
+
+Starts the mock LLM server and `uvicorn app.main:app` on a fresh sessions
+directory, then drives `--candidates` simulated candidates, `--concurrency`
+at a time, through POST /start-interview (round-robin over the sample
+resumes in sessions/*/resume.pdf and a few job postings), every
+/submit-answer, and POST /finish-interview. Answers and injected LLM errors
+come from `--seed`, so two runs send the same traffic.
+
+Reports throughput, p50/p95/p99 per endpoint (client side), event-loop lag
+and storage I/O (from the app's /metrics, before vs after), bytes left on
+disk and the mock's LLM counters. `--out` saves them as JSON with the git
+commit; `--compare` a previous file prints the change per endpoint and exits
+1 if a p95 or the throughput regressed by more than `--max-regression`.
+App settings can be varied with `--env`, e.g. `--env EVAL_MODE=batched`.
+
+    python -m benchmarks.loadtest_interview --candidates 40 --concurrency 10 --latency 0.2 --out base.json
+    python -m benchmarks.loadtest_interview --candidates 40 --concurrency 10 --latency 0.2 --compare base.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.mock_openai import MockOpenAIServer, free_port
+
+REPO = Path(__file__).resolve().parent.parent
+RESUMES = sorted(REPO.glob("sessions/*/resume.pdf"))
+ENDPOINTS = ("/start-interview", "/submit-answer", "/finish-interview")
+
+JOBS = [
+    ("Machine Learning Engineer", "Build and deploy ML models in Python with PyTorch, Docker and AWS. Own data pipelines and model monitoring."),
+    ("Data Engineer", "Design batch and streaming pipelines with Airflow, Spark and Kafka. Model data in SQL and keep data quality high."),
+    ("Backend Engineer", "Build scalable APIs in Python and Go, run services on Kubernetes, and own on-call for production incidents."),
+]
+VOCAB = (
+    "model pipeline data features training deployed docker aws latency drift monitoring team stakeholders "
+    "metrics experiment rollout retraining airflow python sql accuracy customers churn dashboard alerts batch "
+    "streaming kafka api tests review incident postmortem ownership deadline scope mentoring design"
+).split()
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][\w:]*)(\{.*\})? (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def make_answer(rng: random.Random) -> str:
+    return " ".join(rng.choice(VOCAB) for _ in range(rng.randint(40, 120))).capitalize() + "."
+
+
+class Recorder:
+    """Client-side latency per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def post(self, client: httpx.AsyncClient, endpoint: str, **kwargs) -> Optional[dict]:
+        t0 = time.perf_counter()
+        try:
+            r = await client.post(endpoint, **kwargs)
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - t0)
+        if r.status_code != 200:
+            self.errors[endpoint] += 1
+            return None
+        return r.json()
+
+    def summary(self) -> dict:
+        out = {}
+        for endpoint in ENDPOINTS:
+            samples = self.latencies.get(endpoint, [])
+            row = {"count": len(samples), "errors": self.errors.get(endpoint, 0)}
+            if samples:
+                row.update({
+                    "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+                    "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+                    "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+                    "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+                })
+            out[endpoint] = row
+        return out
+
+
+async def candidate(n: int, client: httpx.AsyncClient, recorder: Recorder, args) -> bool:
+    rng = random.Random(args.seed * 100003 + n)
+    title, description = JOBS[n % len(JOBS)]
+    resume = RESUMES[n % len(RESUMES)]
+    data = await recorder.post(
+        client, "/start-interview",
+        data={"job_title": title, "job_description": description},
+        files={"resume_file": (resume.name, resume.read_bytes(), "application/pdf")},
+    )
+    if data is None:
+        return False
+    session_id, question = data["session_id"], data["question"]
+
+    while True:
+        if args.think:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think)
+        data = await recorder.post(
+            client, "/submit-answer",
+            json={"session_id": session_id, "question_id": question["id"], "answer": make_answer(rng)},
+        )
+        if data is None:
+            return False
+        if data["interview_complete"]:
+            break
+        question = data["question"]
+
+    return await recorder.post(client, "/finish-interview", data={"session_id": session_id}) is not None
+
+
+async def drive(base_url: str, first: int, count: int, recorder: Recorder, args) -> int:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        async def bounded(n: int) -> bool:
+            async with semaphore:
+                return await candidate(n, client, recorder, args)
+
+        results = await asyncio.gather(*(bounded(n) for n in range(first, first + count)))
+    return sum(results)
+
+
+def scrape(base_url: str) -> Dict[tuple, float]:
+    """{(metric name, ((label, value), ...)): value} from the app's /metrics."""
+    samples = {}
+    for line in httpx.get(f"{base_url}/metrics", timeout=30).text.splitlines():
+        m = _SAMPLE.match(line)
+        if m:
+            labels = tuple(sorted(_LABEL.findall(m.group(2) or "")))
+            samples[(m.group(1), labels)] = float(m.group(3))
+    return samples
+
+
+def histogram_delta(before: dict, after: dict, name: str) -> Dict[tuple, dict]:
+    """Per label set (without `le`): {"buckets": [(le, cumulative count)], "count", "sum"} observed between scrapes."""
+    series: Dict[tuple, dict] = defaultdict(lambda: {"buckets": [], "count": 0.0, "sum": 0.0})
+    for (metric, labels), value in after.items():
+        if not metric.startswith(name + "_"):
+            continue
+        diff = value - before.get((metric, labels), 0.0)
+        key = tuple(kv for kv in labels if kv[0] != "le")
+        if metric == name + "_bucket":
+            le = dict(labels)["le"]
+            series[key]["buckets"].append((float("inf") if le == "+Inf" else float(le), diff))
+        elif metric == name + "_count":
+            series[key]["count"] = diff
+        elif metric == name + "_sum":
+            series[key]["sum"] = diff
+    for s in series.values():
+        s["buckets"].sort()
+    return dict(series)
+
+
+def histogram_quantile(buckets: list, q: float) -> Optional[float]:
+    """Linear interpolation inside the bucket holding the q-th observation, like PromQL's histogram_quantile."""
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    rank = q * buckets[-1][1]
+    lower, below = 0.0, 0.0
+    for le, cumulative in buckets:
+        if cumulative >= rank:
+            if le == float("inf"):
+                return lower
+            return lower + (le - lower) * ((rank - below) / (cumulative - below) if cumulative > below else 1.0)
+        lower, below = le, cumulative
+    return lower
+
+
+def loop_lag(before: dict, after: dict) -> dict:
+    series = histogram_delta(before, after, "event_loop_lag_seconds").get((), {"buckets": [], "count": 0, "sum": 0})
+    count = series["count"]
+    within = dict(series["buckets"]).get(0.1, count)
+    return {
+        "samples": int(count),
+        "mean_ms": round(series["sum"] / count * 1000, 3) if count else None,
+        "p50_ms": round(histogram_quantile(series["buckets"], 0.50) * 1000, 3) if count else None,
+        "p99_ms": round(histogram_quantile(series["buckets"], 0.99) * 1000, 3) if count else None,
+        # every sample was at most this late (the smallest bucket holding them all; None if past the last)
+        "max_bucket_ms": next((le * 1000 for le, c in series["buckets"] if c >= count and le != float("inf")), None)
+        if count else None,
+        "samples_over_100ms": int(count - within),
+    }
+
+
+def disk_usage(path: Path) -> tuple:
+    files = [p for p in path.rglob("*") if p.is_file()] if path.exists() else []
+    return len(files), sum(p.stat().st_size for p in files)
+
+
+def storage_io(before: dict, after: dict) -> dict:
+    ops = {}
+    for labels, s in sorted(histogram_delta(before, after, "storage_operation_duration_seconds").items()):
+        if s["count"]:
+            ops[dict(labels)["op"]] = {
+                "count": int(s["count"]),
+                "total_s": round(s["sum"], 4),
+                "mean_ms": round(s["sum"] / s["count"] * 1000, 3),
+            }
+    return ops
+
+
+def git_commit() -> dict:
+    def git(*cmd: str) -> str:
+        return subprocess.run(["git", *cmd], cwd=REPO, capture_output=True, text=True, check=True).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def start_app(llm_url: str, sessions_dir: Path, extra_env: List[str]) -> tuple:
+    port = free_port()
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "mock",
+        "OPENAI_BASE_URL": llm_url,
+        "SESSIONS_DIR": str(sessions_dir),
+        "LLM_CACHE_PATH": "",
+        "QUESTION_BANK_PATH": "",
+        "METRICS_ENABLED": "1",
+    }
+    for item in extra_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(600):
+        try:
+            httpx.get(f"{base_url}/health")
+            return server, base_url
+        except httpx.TransportError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError("app did not start")
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> bool:
+    """Print the change per endpoint; True if anything regressed beyond max_regression."""
+    regressed = False
+    base_commit = (baseline["meta"].get("commit") or "?")[:10]
+    print(f"\nvs {base_commit} ({baseline['meta'].get('timestamp')}):")
+    for endpoint in ENDPOINTS:
+        old, new = baseline["endpoints"].get(endpoint, {}), current["endpoints"].get(endpoint, {})
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if not old.get(key) or key not in new:
+                continue
+            change = new[key] / old[key] - 1
+            flag = key == "p95_ms" and change > max_regression
+            regressed |= flag
+            print(f"  {endpoint:<18} {key:<7} {old[key]:10.1f} -> {new[key]:10.1f}  {change:+7.1%}{'  REGRESSION' if flag else ''}")
+    old_tp, new_tp = baseline["throughput"]["sessions_per_s"], current["throughput"]["sessions_per_s"]
+    if old_tp:
+        change = new_tp / old_tp - 1
+        flag = change < -max_regression
+        regressed |= flag
+        print(f"  {'throughput':<18} {'sess/s':<7} {old_tp:10.3f} -> {new_tp:10.3f}  {change:+7.1%}{'  REGRESSION' if flag else ''}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=10, help="candidates in flight at once")
+    parser.add_argument("--warmup", type=int, default=2, help="candidates run first and not measured")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds a candidate takes per answer")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock seconds per completion")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="mock seconds per generated token")
+    parser.add_argument("--completion-tokens", type=int, default=0, help="mock completion size (0: from the content)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="mock share of completions answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="mock share answered with 429")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="app setting (repeatable)")
+    parser.add_argument("--out", help="write the results here as JSON")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p95 / throughput change")
+    args = parser.parse_args()
+    if not RESUMES:
+        sys.exit("no sample resumes in sessions/*/resume.pdf")
+
+    sessions_dir = Path(tempfile.mkdtemp(prefix="loadtest-")) / "sessions"
+    mock = MockOpenAIServer(
+        latency_s=args.latency, token_delay_s=args.token_delay, rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate, completion_tokens=args.completion_tokens, seed=args.seed
+    )
+    with mock as llm_url:
+        server, base_url = start_app(llm_url, sessions_dir, args.env)
+        try:
+            if args.warmup:
+                asyncio.run(drive(base_url, args.candidates, args.warmup, Recorder(), args))
+            state = mock.app.state
+            llm_before = (state.requests, state.errors, state.rate_limited, state.prompt_tokens)
+            before = scrape(base_url)
+            warm_files, warm_bytes = disk_usage(sessions_dir)
+
+            recorder = Recorder()
+            t0 = time.perf_counter()
+            completed = asyncio.run(drive(base_url, 0, args.candidates, recorder, args))
+            elapsed = time.perf_counter() - t0
+            after = scrape(base_url)
+        finally:
+            server.terminate()
+            server.wait()
+
+    endpoints = recorder.summary()
+    files, size = disk_usage(sessions_dir)
+    storage = {
+        "ops": storage_io(before, after),
+        "files": files - warm_files,
+        "bytes_on_disk": size - warm_bytes,
+        "bytes_per_session": (size - warm_bytes) // completed if completed else None,
+    }
+    results = {
+        "meta": {
+            **git_commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "resumes": len(RESUMES),
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        },
+        "throughput": {
+            "elapsed_s": round(elapsed, 3),
+            "sessions_completed": completed,
+            "sessions_failed": args.candidates - completed,
+            "sessions_per_s": round(completed / elapsed, 4),
+            "requests_per_s": round(sum(e["count"] for e in endpoints.values()) / elapsed, 2),
+        },
+        "endpoints": endpoints,
+        "event_loop_lag": loop_lag(before, after),
+        "storage": storage,
+        "llm": {
+            "requests": state.requests - llm_before[0],
+            "errors_injected": state.errors - llm_before[1],
+            "rate_limited": state.rate_limited - llm_before[2],
+            "prompt_tokens": state.prompt_tokens - llm_before[3],
+        },
+    }
+
+    tp = results["throughput"]
+    print(f"{completed}/{args.candidates} sessions in {elapsed:.1f}s: {tp['sessions_per_s']:.2f} sessions/s, "
+          f"{tp['requests_per_s']:.1f} requests/s")
+    for endpoint, row in endpoints.items():
+        if row["count"]:
+            print(f"  {endpoint:<18} n={row['count']:<5} err={row['errors']:<3} p50 {row['p50_ms']:8.1f} ms  "
+                  f"p95 {row['p95_ms']:8.1f} ms  p99 {row['p99_ms']:8.1f} ms")
+    lag = results["event_loop_lag"]
+    print(f"  event loop lag     samples={lag['samples']} mean {lag['mean_ms']} ms  p99 {lag['p99_ms']} ms  "
+          f"max <= {lag['max_bucket_ms']} ms")
+    print(f"  storage            {json.dumps(storage['ops'])}")
+    print(f"                     {storage['bytes_on_disk']} bytes in {storage['files']} files, "
+          f"{storage['bytes_per_session']} bytes/session")
+    print(f"  llm                {json.dumps(results['llm'])}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"results written to {args.out}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if compare(baseline, results, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Answers every request with a canned, well-formed payload chosen from the
+system prompt. `latency` is the time to first token and `token_delay` the time
+per generated chunk; `"stream": true` requests get the chunks as SSE, the way
+the real API sends them. /v1/embeddings returns a deterministic pseudo-random
+vector per input text. `rate_limit_rate` is the fraction of requests answered
+with a 429 and a Retry-After header instead. Like the real API, a request
+whose leading messages (all but the last) were seen before reports them as
+`cached_tokens` once they reach 1024 tokens (the longest such prefix, at
+message boundaries); `prefill` adds seconds per 1k
+uncached prompt tokens. `error_rate` is the fraction answered with a 500,
+and `completion_tokens` fixes the completion size reported in usage (and
+so the generation time under `token_delay`); `seed` makes the injected
+errors repeatable. Used by the benchmarks so they can run without
+network access or an API key:
+
+    python -m benchmarks.mock_openai --port 9999 --latency 0.2 --token-delay 0.01
+    OPENAI_BASE_URL=http://127.0.0.1:9999/v1 OPENAI_API_KEY=mock uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+QUESTIONS = {
+    "Machine Learning Engineering": [
+        {"id": "ml_q1", "text": "Tell me about a time you deployed a model to production."},
+        {"id": "ml_q2", "text": "Describe a situation where you optimized model performance."},
+    ],
+    "Data Engineering": [
+        {"id": "de_q1", "text": "Tell me about a data pipeline you built end to end."},
+        {"id": "de_q2", "text": "Describe a time you fixed a data quality problem."},
+    ],
+    "Software Engineering": [
+        {"id": "swe_q1", "text": "Walk me through how you designed a scalable service."},
+        {"id": "swe_q2", "text": "Tell me about a production incident you debugged."},
+    ],
+    "Collaboration": [
+        {"id": "col_q1", "text": "Describe a time you disagreed with a stakeholder."},
+        {"id": "col_q2", "text": "Tell me about a time you mentored a teammate."},
+    ],
+    "Ownership": [
+        {"id": "own_q1", "text": "Tell me about a project you drove without being asked."},
+        {"id": "own_q2", "text": "Describe a time you cut scope to hit a deadline."},
+    ],
+}
+
+EVALUATION = {
+    "relevancy_score": 78,
+    "strengths": ["Concrete example", "Clear ownership"],
+    "weaknesses": ["Impact not quantified"],
+    "improvement_tips": ["Add one measurable result"],
+    "justification": "The answer addresses the question with a relevant example.",
+}
+
+ANSWER = (
+    "In my last role I containerized a churn model with Docker, deployed it on AWS behind "
+    "FastAPI and added drift monitoring, which cut manual retraining work by half."
+)
+
+
+EMBEDDING_DIM = 256
+
+
+def request_kind(system: str) -> str:
+    if "interview evaluator" in system and '"evaluations"' in system:
+        return "evaluation_batch"
+    if "interview evaluator" in system:
+        return "evaluation"
+    if "follow-up" in system:
+        return "followup"
+    if "You are the candidate" in system:
+        return "answer"
+    if "resume-specific" in system:
+        return "resume_questions"
+    return "questions"
+
+
+def canned_content(system: str, user: str) -> str:
+    kind = request_kind(system)
+    if kind == "evaluation":
+        return json.dumps(EVALUATION)
+    if kind == "evaluation_batch":
+        turns = json.loads(user).get("turns", [])
+        return json.dumps({"evaluations": [{"turn": t["turn"], **EVALUATION} for t in turns]})
+    if kind == "followup":
+        n = json.loads(user).get("followup_number", 1) if user.startswith("{") else 1
+        return json.dumps({"id": f"followup_q{n}", "text": "What was the hardest trade-off in that project?"})
+    if kind == "answer":
+        return ANSWER
+    if kind == "resume_questions":
+        n = json.loads(user).get("count", 2)
+        return json.dumps({"questions": [
+            {"id": f"cv_q{i + 1}", "text": f"Your resume mentions project {i + 1}. Tell me about your role in it."}
+            for i in range(n)
+        ]})
+    return json.dumps(QUESTIONS)
+
+
+def chunk_text(content: str, size: int = 4) -> list:
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+def create_app(
+    latency_s: float = 0.0,
+    token_delay_s: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    retry_after_s: float = 0.2,
+    prefill_s_per_1k: float = 0.0,
+    error_rate: float = 0.0,
+    completion_tokens: int = 0,
+    seed: Optional[int] = None
+) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI")
+    rng = random.Random(seed)
+    app.state.requests = 0
+    app.state.rate_limited = 0
+    app.state.errors = 0
+    app.state.prompt_tokens = 0
+    app.state.cached_tokens = 0
+    app.state.prefixes = set()
+    app.state.calls = Counter()
+    app.state.traced = 0    # requests carrying a traceparent header
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        app.state.traced += "traceparent" in request.headers
+        if error_rate and rng.random() < error_rate:
+            app.state.errors += 1
+            return JSONResponse(
+                {"error": {"message": "The server had an error while processing your request.", "type": "server_error"}},
+                status_code=500
+            )
+        if rate_limit_rate and rng.random() < rate_limit_rate:
+            app.state.rate_limited += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": str(retry_after_s)}
+            )
+        messages = body.get("messages", [])
+        system = next((m["content"] for m in reversed(messages) if m["role"] == "system"), "")  # the task prompt
+        user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        app.state.calls[request_kind(system)] += 1
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        app.state.prompt_tokens += prompt_tokens
+        cached_tokens = cached_prefix_tokens(app.state.prefixes, messages)
+        app.state.cached_tokens += cached_tokens
+        content = canned_content(system, user)
+        chunks = chunk_text(content)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "gpt-4o-mini")
+
+        delay = latency_s + prefill_s_per_1k * (prompt_tokens - cached_tokens) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+
+        if body.get("stream"):
+            async def events():
+                for i, piece in enumerate(chunks):
+                    if i and token_delay_s:
+                        await asyncio.sleep(token_delay_s)
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                done = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                yield f"data: {json.dumps(done)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        generated = completion_tokens or len(content) // 4
+        if token_delay_s:
+            await asyncio.sleep(token_delay_s * ((generated if completion_tokens else len(chunks)) - 1))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": generated,
+                "total_tokens": prompt_tokens + generated,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        app.state.calls["embeddings"] += 1
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        if latency_s:
+            await asyncio.sleep(latency_s)
+        return {
+            "object": "list",
+            "model": body.get("model", "text-embedding-3-small"),
+            "data": [{"object": "embedding", "index": i, "embedding": embedding_for(text)} for i, text in enumerate(inputs)],
+            "usage": {"prompt_tokens": sum(len(t) for t in inputs) // 4, "total_tokens": sum(len(t) for t in inputs) // 4},
+        }
+
+    return app
+
+
+def cached_prefix_tokens(seen: set, messages: list) -> int:
+    """Tokens of the longest run of leading messages sent before (in 128-token steps, from 1024)."""
+    cached, tokens, digest = 0, 0, hashlib.sha256()
+    for m in messages[:-1]:
+        digest.update(json.dumps(m, sort_keys=True).encode("utf-8"))
+        tokens += len(m["content"]) // 4
+        key = digest.hexdigest()
+        if key in seen:
+            cached = tokens
+        elif tokens >= 1024:
+            seen.add(key)
+    return cached // 128 * 128 if cached >= 1024 else 0
+
+
+def embedding_for(text: str, dim: int = EMBEDDING_DIM) -> list:
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    return [rng.gauss(0, 1) for _ in range(dim)]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class BackgroundServer:
+    """Runs an ASGI app under uvicorn in a daemon thread: `with BackgroundServer(app) as base_url: ...`"""
+
+    def __init__(self, app, port: int = 0):
+        self.app = app
+        self.port = port or free_port()
+        self.server = uvicorn.Server(uvicorn.Config(
+            self.app, host="127.0.0.1", port=self.port, log_level="warning", backlog=4096
+        ))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> str:
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self.base_url
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+class MockOpenAIServer(BackgroundServer):
+    """`with MockOpenAIServer(latency_s=0.1) as base_url: ...` yields an OpenAI-style /v1 base URL."""
+
+    def __init__(
+        self,
+        latency_s: float = 0.0,
+        token_delay_s: float = 0.0,
+        port: int = 0,
+        rate_limit_rate: float = 0.0,
+        prefill_s_per_1k: float = 0.0,
+        error_rate: float = 0.0,
+        completion_tokens: int = 0,
+        seed: Optional[int] = None
+    ):
+        super().__init__(create_app(
+            latency_s, token_delay_s, rate_limit_rate,
+            prefill_s_per_1k=prefill_s_per_1k, error_rate=error_rate, completion_tokens=completion_tokens, seed=seed
+        ), port)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to first token")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds per generated chunk")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--prefill", type=float, default=0.0, help="seconds per 1k uncached prompt tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--completion-tokens", type=int, default=0, help="completion size to report (0: from the content)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    app = create_app(
+        args.latency, args.token_delay, args.rate_limit_rate, prefill_s_per_1k=args.prefill,
+        error_rate=args.error_rate, completion_tokens=args.completion_tokens, seed=args.seed
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
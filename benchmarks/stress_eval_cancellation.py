@@ -0,0 +1,90 @@
+"""
+Regression check: abandoning /finish-interview/stream must not wedge a session.
+
+Plays `--sessions` interviews whose turns are all still queued in an
+EvaluationWorkerPool (no workers running, slow stub LLM), starts
+iter_collect() the way /finish-interview/stream does, closes it after the
+first evaluation as a disconnecting client would, then checks that a
+following collect() finishes within `--timeout` seconds, that nothing is
+left claimed or in flight, and that the evaluation that was already
+yielded was stored rather than paid for twice.
+
+    python -m benchmarks.stress_eval_cancellation --sessions 20 --turns 6
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+os.environ.setdefault("SESSIONS_DIR", tempfile.mkdtemp(prefix="stress-eval-cancel-"))
+
+from app.evaluation import EvaluationWorkerPool, eval_record    # noqa: E402
+from app.storage import load_conversation_state, new_session_id, save_conversation_state    # noqa: E402
+
+
+class SlowLLM:
+    """Scores every answer 70 after a delay; turn 0 answers fastest."""
+
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+        self.calls = 0
+
+    async def evaluate_with_tools(self, question, answer, job_title, job_description, resume_text):
+        self.calls += 1
+        await asyncio.sleep(self.delay_s * (1 + int(answer.split()[-1])))
+        return {"relevancy_score": 70, "justification": "ok"}
+
+
+def interview(turns: int) -> dict:
+    return {
+        "job_title": "ML Engineer",
+        "job_description": "Build and deploy ML models in Python.",
+        "resume_text": "Python, PyTorch.",
+        "conversation_history": [
+            {"question_id": f"q{i}", "question": f"Question {i}?", "answer": f"Answer {i}", "is_followup": False}
+            for i in range(turns)
+        ],
+        "evaluations": {str(i): eval_record("pending") for i in range(turns)},
+    }
+
+
+async def check_session(pool: EvaluationWorkerPool, llm: SlowLLM, turns: int, timeout: float) -> None:
+    sid = new_session_id()
+    save_conversation_state(sid, interview(turns))
+    for i in range(turns):
+        pool.enqueue(sid, i)
+
+    stream = pool.iter_collect(sid, load_conversation_state(sid))
+    first, _ = await stream.__anext__()
+    await stream.aclose()
+    calls = llm.calls
+
+    state = load_conversation_state(sid)
+    assert state["evaluations"][str(first)]["status"] == "done", f"{sid}: yielded evaluation was not stored"
+    results = await asyncio.wait_for(pool.collect(sid, state), timeout)
+    assert all(r.status != "failed" for r in results), f"{sid}: {results}"
+    assert llm.calls - calls == turns - 1, f"{sid}: {llm.calls - calls} re-evaluations, expected {turns - 1}"
+    assert not any(key[0] == sid for key in pool._inflight), f"{sid}: left in flight"
+    assert not any(key[0] == sid for key in pool._claimed), f"{sid}: left claimed"
+
+
+async def run(sessions: int, turns: int, delay_s: float, timeout: float) -> None:
+    llm = SlowLLM(delay_s)
+    pool = EvaluationWorkerPool(llm, mode="per_turn")    # never start()ed: collect() claims every turn
+    for _ in range(sessions):
+        await check_session(pool, llm, turns, timeout)
+    print(f"ok: {sessions} abandoned streams, {llm.calls} evaluations, nothing left claimed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--delay", type=float, default=0.01, help="stub LLM latency per turn index, seconds")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds the follow-up collect() may take")
+    args = parser.parse_args()
+    asyncio.run(run(args.sessions, args.turns, args.delay, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Concurrency stress test for /submit-answer across several uvicorn workers.
+
+Runs `uvicorn app.main:app --workers N` on a shared sessions directory with
+the mock LLM, then for every simulated candidate:
+
+  1. submits each answer R times at once with one Idempotency-Key
+     (mobile-style retries) and checks every copy got the same response;
+  2. fires K *different* answers at once and checks all K turns were stored.
+
+At the end the stored history is checked turn by turn and the mock LLM's
+follow-up count must equal exactly two per candidate — i.e. no lost turns
+and no follow-up generated (and paid for) twice.
+
+    python -m benchmarks.stress_submit_answer --candidates 20 --retries 4 --workers 2
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+from benchmarks.mock_openai import MockOpenAIServer, free_port
+
+REPO = Path(__file__).resolve().parent.parent
+SAMPLE_RESUME = next(REPO.glob("sessions/*/resume.pdf"))
+
+
+async def candidate(client: httpx.AsyncClient, retries: int, burst: int) -> tuple:
+    r = await client.post(
+        "/start-interview",
+        data={"job_title": "ML Engineer", "job_description": "Build and deploy ML models in Python."},
+        files={"resume_file": ("resume.pdf", SAMPLE_RESUME.read_bytes(), "application/pdf")},
+    )
+    r.raise_for_status()
+    sid, q = r.json()["session_id"], r.json()["question"]
+    expected = []
+
+    while True:
+        body = {"session_id": sid, "question_id": q["id"], "answer": f"Answer to {q['id']}."}
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+        responses = await asyncio.gather(*[
+            client.post("/submit-answer", json=body, headers=headers) for _ in range(retries)
+        ])
+        for resp in responses:
+            resp.raise_for_status()
+        payloads = [resp.json() for resp in responses]
+        assert all(p == payloads[0] for p in payloads), f"{sid}: retries disagreed: {payloads}"
+        expected.append(q["id"])
+        if payloads[0]["interview_complete"]:
+            break
+        q = payloads[0]["question"]
+
+    # Distinct concurrent answers: every one must land
+    responses = await asyncio.gather(*[
+        client.post("/submit-answer", json={"session_id": sid, "question_id": f"extra_{i}", "answer": f"Extra {i}."})
+        for i in range(burst)
+    ])
+    for resp in responses:
+        resp.raise_for_status()
+    expected.extend(f"extra_{i}" for i in range(burst))
+    return sid, expected
+
+
+async def run(base_url: str, candidates: int, retries: int, burst: int) -> list:
+    limits = httpx.Limits(max_connections=200)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        return await asyncio.gather(*[candidate(client, retries, burst) for _ in range(candidates)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--retries", type=int, default=4, help="copies of each submission sent at once")
+    parser.add_argument("--burst", type=int, default=5, help="distinct answers sent at once at the end")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--store", default="file", choices=("file", "sqlite"))
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="stress-submit-"))
+    mock = MockOpenAIServer(latency_s=0.05)
+    with mock as llm_url:
+        port = free_port()
+        env = {
+            **os.environ,
+            "OPENAI_API_KEY": "mock",
+            "OPENAI_BASE_URL": llm_url,
+            "SESSIONS_DIR": str(tmp / "sessions"),
+            "SESSION_STORE": args.store,
+            "LLM_CACHE_PATH": "",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=REPO, env=env,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            for _ in range(200):
+                try:
+                    httpx.get(f"{base_url}/health")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.05)
+
+            t0 = time.perf_counter()
+            results = asyncio.run(run(base_url, args.candidates, args.retries, args.burst))
+            elapsed = time.perf_counter() - t0
+        finally:
+            server.terminate()
+            server.wait()
+
+        os.environ["SESSIONS_DIR"] = env["SESSIONS_DIR"]
+        from app.storage import create_session_store
+        store = create_session_store(args.store)
+
+        lost = 0
+        for sid, expected in results:
+            stored = [t["question_id"] for t in store.load(sid)["conversation_history"]]
+            main_part, extras = stored[:-args.burst], stored[-args.burst:]
+            if main_part != expected[:-args.burst] or sorted(extras) != sorted(expected[-args.burst:]):
+                lost += 1
+                print(f"MISMATCH {sid}: stored={stored} expected={expected}")
+
+        followups = mock.app.state.calls["followup"]
+        print(f"candidates={args.candidates} workers={args.workers} retries={args.retries} elapsed={elapsed:.1f}s")
+        print(f"sessions with lost or duplicated turns: {lost}")
+        print(f"follow-up LLM calls: {followups} (expected {2 * args.candidates})")
+        if lost or followups != 2 * args.candidates:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()